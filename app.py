@@ -5,6 +5,8 @@ from fastapi import FastAPI
 from vital_agent_container.agent_container_app import AgentContainerApp
 from vital_ai_vitalsigns.vitalsigns import VitalSigns
 from slxx_agent.agent.agent_impl import AgentImpl
+from slxx_agent.executors import executor_stats, start_stats_logger
+from slxx_agent.prewarm import prewarm, start_prewarm
 from slxx_agent.slxx_message_handler import slxxMessageHandler
 from dotenv import load_dotenv
 
@@ -36,9 +38,20 @@ def create_app():
 
     handler = slxxMessageHandler(agent=agent, app_home=app_home)
 
+    local_config = handler.local_config
+    if local_config.startup_mode == 'eager':
+        prewarm(local_config)
+
     # Create a FastAPI app
     fastapi_app = FastAPI()
 
+    @fastapi_app.on_event("startup")
+    async def start_background_prewarm():
+        # heavy imports load once the server is accepting requests
+        if local_config.startup_mode != 'eager':
+            start_prewarm(local_config)
+        start_stats_logger(local_config)
+
     # Add health check route
     @fastapi_app.get("/health")
     async def health_check():
@@ -51,6 +64,13 @@ def create_app():
             "message": "slxx RequestHandler Agent is up and running"
         }
 
+    @fastapi_app.get("/metrics/executors")
+    async def executor_metrics():
+        """
+        Queue depth, running tasks and wait times of the named executors.
+        """
+        return executor_stats()
+
     # Wrap the AgentContainerApp with FastAPI
     container_app = AgentContainerApp(handler, app_home)
     
@@ -64,5 +84,5 @@ app = create_app()
 
 
 if __name__ == "__main__":
-    uvicorn.run(host="0.0.0.0", port=7009, app=app)
+    uvicorn.run(host="0.0.0.0", port=7009, app=app, ws_per_message_deflate=True)
 
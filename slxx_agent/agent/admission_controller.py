@@ -0,0 +1,159 @@
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+
+
+# admission control for chat turns
+# a turn must hold a global slot and a slot for its alias (tenant) while running
+# turns that cannot start right away wait in a bounded per-alias queue,
+# freed slots are handed to the waiting alias with the lowest virtual time
+# (start-time fair queueing), so a busy tenant cannot starve the others
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class AdmissionController:
+    def __init__(self, *,
+                 max_concurrent: int = 16,
+                 max_per_alias: int = 4,
+                 max_queued: int = 64,
+                 max_queued_per_alias: int = 8,
+                 queue_timeout: float = 20.0,
+                 weights: dict = None):
+        self.max_concurrent = max_concurrent
+        self.max_per_alias = max_per_alias
+        self.max_queued = max_queued
+        self.max_queued_per_alias = max_queued_per_alias
+        self.queue_timeout = queue_timeout
+        self.weights = weights or {}
+
+        self._active = 0
+        self._active_by_alias = {}
+        self._queued = 0
+        self._waiting = {}
+        self._vtime = {}
+        self._vclock = 0.0
+
+    @classmethod
+    def from_config(cls, local_config):
+        return cls(
+            max_concurrent=local_config.max_concurrent_turns,
+            max_per_alias=local_config.max_concurrent_turns_per_alias,
+            max_queued=local_config.max_queued_turns,
+            max_queued_per_alias=local_config.max_queued_turns_per_alias,
+            queue_timeout=local_config.turn_queue_timeout,
+            weights=local_config.alias_weights
+        )
+
+    @asynccontextmanager
+    async def admit(self, alias: str, timeout: float = None):
+        """
+        Hold a turn slot for alias for the duration of the block.
+        Raises AdmissionRejected when the queue is full or the wait times out.
+        """
+        await self._acquire(alias, timeout)
+        try:
+            yield
+        finally:
+            self._release(alias)
+
+    def stats(self) -> dict:
+        return {
+            "active": self._active,
+            "queued": self._queued,
+            "active_by_alias": dict(self._active_by_alias),
+            "queued_by_alias": {a: len(q) for a, q in self._waiting.items() if q}
+        }
+
+    def _can_run(self, alias):
+        return (self._active < self.max_concurrent and
+                self._active_by_alias.get(alias, 0) < self.max_per_alias)
+
+    def _grant(self, alias):
+        self._active += 1
+        self._active_by_alias[alias] = self._active_by_alias.get(alias, 0) + 1
+
+        # idle aliases restart at the current virtual clock instead of banking credit
+        start = max(self._vtime.get(alias, 0.0), self._vclock)
+        self._vclock = start
+        weight = float(self.weights.get(alias, 1.0)) or 1.0
+        self._vtime[alias] = start + 1.0 / weight
+
+    async def _acquire(self, alias, timeout):
+        logger = logging.getLogger(__name__)
+
+        # waiters left in the queues are blocked by a limit, so a turn that
+        # fits right now does not jump ahead of anyone who could run
+        if self._can_run(alias):
+            self._grant(alias)
+            return
+
+        queue = self._waiting.setdefault(alias, deque())
+
+        if self._queued >= self.max_queued or len(queue) >= self.max_queued_per_alias:
+            logger.warning(f"Admission rejected for alias {alias}: queue full {self.stats()}")
+            raise AdmissionRejected("queue full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        self._queued += 1
+
+        if timeout is None:
+            timeout = self.queue_timeout
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except asyncio.TimeoutError:
+            if waiter.done():
+                # granted in the same tick the timer fired
+                return
+            self._remove_waiter(alias, waiter)
+            logger.warning(f"Admission rejected for alias {alias}: waited {timeout}s")
+            raise AdmissionRejected("queue timeout")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release(alias)
+            else:
+                self._remove_waiter(alias, waiter)
+            raise
+
+    def _remove_waiter(self, alias, waiter):
+        queue = self._waiting.get(alias)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            self._queued -= 1
+        if not waiter.done():
+            waiter.cancel()
+
+    def _release(self, alias):
+        self._active -= 1
+        remaining = self._active_by_alias.get(alias, 1) - 1
+        if remaining > 0:
+            self._active_by_alias[alias] = remaining
+        else:
+            self._active_by_alias.pop(alias, None)
+        self._dispatch()
+
+    def _dispatch(self):
+        while self._active < self.max_concurrent:
+            eligible = [
+                a for a, q in self._waiting.items()
+                if q and self._active_by_alias.get(a, 0) < self.max_per_alias
+            ]
+            if not eligible:
+                break
+            alias = min(eligible, key=lambda a: self._vtime.get(a, 0.0))
+            waiter = self._waiting[alias].popleft()
+            self._queued -= 1
+            if waiter.done():
+                continue
+            self._grant(alias)
+            waiter.set_result(None)
+
+        for alias in [a for a, q in self._waiting.items() if not q]:
+            del self._waiting[alias]
@@ -1,3 +1,5 @@
+import itertools
+
 
 class AgentContext:
     def __init__(self, *,
@@ -8,7 +10,10 @@ class AgentContext:
                  username: str = None,
                  org_level_id: int = None,
                  orgleveltype: int = None,
-                 context_data: int = None):
+                 context_data: int = None,
+                 deadline=None,
+                 server_session: bool = False,
+                 accept_encoding: tuple = ()):
         self.alias = alias
         self.session_id = session_id
         self.account_id = account_id
@@ -17,6 +22,23 @@ class AgentContext:
         self.org_level_id = org_level_id
         self.orgleveltype = orgleveltype
         self.context_data = context_data
+        self.deadline = deadline
+        # conversation state lives in the session store instead of the messages
+        self.server_session = server_session
+        # payload encodings the client can read back, e.g. ("gzip",)
+        self.accept_encoding = accept_encoding
+        # tables rendered by the tools this turn, id -> markdown
+        self.rendered_tables = {}
+        self.table_ids = itertools.count(1)
+
+    def add_table(self, markdown: str) -> str:
+        """
+        Keep a rendered table for the final answer and return its id.
+        Tools of one step run in parallel, next() on the counter is atomic.
+        """
+        table_id = f"T{next(self.table_ids)}"
+        self.rendered_tables[table_id] = markdown
+        return table_id
 
 
 
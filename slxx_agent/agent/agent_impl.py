@@ -2,48 +2,41 @@ import asyncio
 import json
 import logging
 import time
-from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
+from datetime import datetime
 
 import httpx
-from ai_haley_kg_domain.model.KGChatBotMessage import KGChatBotMessage
-from ai_haley_kg_domain.model.KGChatUserMessage import KGChatUserMessage
-from ai_haley_kg_domain.model.KGToolRequest import KGToolRequest
-from ai_haley_kg_domain.model.KGToolResult import KGToolResult
-from ai_haley_kg_domain.model.KGAgent import KGAgent
 from com_vitalai_aimp_domain.model.AIMPIntent import AIMPIntent
 from com_vitalai_aimp_domain.model.AIMPResponseMessage import AIMPResponseMessage
 from com_vitalai_aimp_domain.model.AgentMessageContent import AgentMessageContent
 from com_vitalai_aimp_domain.model.UserMessageContent import UserMessageContent
-from com_vitalai_haleyai_question_domain.model.HaleyContainer import HaleyContainer
 from com_vitalai_haleyai_question_domain.model.KGPropertyMap import KGPropertyMap
-from kgraphplanner.agent.kg_planning_agent import KGPlanningAgent
-from kgraphplanner.checkpointer.memory_checkpointer import MemoryCheckpointer
-from kgraphplanner.tool_manager.tool_manager import ToolManager
-from langchain.callbacks.base import BaseCallbackHandler
-from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import AzureChatOpenAI
 from slxx_agent.agent.agent_context import AgentContext
+from slxx_agent.agent.date_resolver import resolve_date_phrases, shift_today, shift_week
+from slxx_agent.agent.chat_container import (
+    TransportEncoding, read_history, build_response_json, next_history, payload_size, decode_context
+)
+from slxx_agent.agent.response_cache import ResponseCache
+from slxx_agent.agent.session_store import SessionStore, SessionState
+from slxx_agent.agent.table_renderer import expand_message_tables
+from slxx_agent.api.resilience import slxxAPIError, DeadlineExceeded
 from slxx_agent.config.local_config import LocalConfig
+from slxx_agent.cpu_offload import run_cpu_async
+from slxx_agent.date_utils import display
+from slxx_agent.executors import run_in
+from slxx_agent.manager.cache_backend import get_cache_backend
 from slxx_agent.manager.slxx_manager import slxxManager
-from slxx_agent.tools.get_shift_requests import GetShiftRequests
-from slxx_agent.tools.search_employees_tool import SearchEmployeesTool
-from slxx_agent.tools.approve_deny_shift_request import ApproveDenyShiftRequest
-from slxx_agent.tools.get_pto_requests import GetPTORequests
-from slxx_agent.tools.approve_deny_pto_request import ApproveDenyPTORequest
-from slxx_agent.tools.get_pto_request_detail import GetPTORequestDetail
-from starlette.websockets import WebSocket
+from starlette.websockets import WebSocket, WebSocketState
 from vital_agent_container.handler.aimp_message_handler_inf import AIMPMessageHandlerInf
 from vital_agent_kg_utils.vitalsignsutils.vitalsignsutils import VitalSignsUtils
 from vital_ai_vitalsigns.utils.uri_generator import URIGenerator
 from vital_ai_vitalsigns.vitalsigns import VitalSigns
 import os
-import opik
-from opik.integrations.langchain import OpikTracer
 
-def print_stream(stream, messages_out: list = []):
+def print_stream(stream, messages_out: list = [], deadline=None):
     for s in stream:
+        # stop between graph steps once the turn is cancelled or out of time
+        if deadline is not None:
+            deadline.check()
         message = s["messages"][-1]
         messages_out.append(message)
         if isinstance(message, tuple):
@@ -57,28 +50,38 @@ def get_timestamp() -> str:
     return timestamp
 
 
-class LoggingHandler(BaseCallbackHandler):
-    def __init__(self):
-        self.logger = logging.getLogger(__name__)
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter('%(asctime)s - %(message)s')
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
-        self.logger.setLevel(logging.INFO)
-
-    def on_llm_start(self, serialized: dict, prompts: list, **kwargs):
-        self.logger.info(f"LLM Request: {prompts}")
-
-    def on_llm_end(self, response, **kwargs):
-        self.logger.info(f"LLM Response: {response.generations}")
-
-
 class AgentImpl:
     def __init__(self):
-        pass
+        self.response_cache = None
+        self.session_store = None
+
+    def get_response_cache(self, local_config: LocalConfig) -> ResponseCache:
+        if not local_config.response_cache_enabled:
+            return None
+        if not get_cache_backend(local_config).shared and int(os.environ.get("WEB_CONCURRENCY", 1)) > 1:
+            # an approve/deny in another worker could not invalidate this worker's answers
+            return None
+        if self.response_cache is None:
+            self.response_cache = ResponseCache(
+                local_config.response_cache_size, local_config.response_cache_ttl
+            )
+        return self.response_cache
+
+    def get_session_store(self, local_config: LocalConfig) -> SessionStore:
+        if not local_config.session_store_enabled:
+            return None
+        if self.session_store is None:
+            backend = None
+            if local_config.session_store_persistent:
+                cache = get_cache_backend(local_config)
+                # a process-local backend adds nothing to the store's own LRU
+                backend = cache if cache.shared else None
+            self.session_store = SessionStore(
+                local_config.session_store_size, local_config.session_store_ttl, backend
+            )
+        return self.session_store
 
     async def handle_error_message(self, websocket: WebSocket, started_event: asyncio.Event, auth_message):
-        logging_handler = LoggingHandler()
         logger = logging.getLogger(__name__)
 
         vs = VitalSigns()
@@ -100,6 +103,17 @@ class AgentImpl:
         started_event.set()
         logger.info("Completed Event.")
 
+    async def watch_turn(self, websocket: WebSocket, deadline):
+        """
+        Cancel the turn deadline when the websocket goes away.
+        """
+        while not deadline.cancelled:
+            if (websocket.client_state == WebSocketState.DISCONNECTED or
+                    websocket.application_state == WebSocketState.DISCONNECTED):
+                deadline.cancel("websocket closed")
+                return
+            await asyncio.sleep(min(0.5, deadline.remaining()))
+
     async def handle_chat_message(
         self,
         manager: slxxManager,
@@ -113,11 +127,15 @@ class AgentImpl:
         message_text = ""
 
         # load key and endpoint from slxsettings in database using JWT
-        loop = asyncio.get_running_loop()
         slxx_api = manager.api
         
-        # Fetch all app settings in one call (this runs in a thread pool executor)
-        settings_dict = await loop.run_in_executor(None, slxx_api.get_all_app_settings)
+        # Fetch all app settings in one call (this runs on the slxx-read executor)
+        try:
+            settings_dict = await run_in(manager.local_config, "slxx-read", slxx_api.get_all_app_settings)
+        except slxxAPIError as e:
+            logger.error(f"App settings fetch failed: {e}")
+            await self.handle_error_message(websocket, started_event, e.message)
+            return
         
         # Look for the required keys
         azure_key = settings_dict.get("AzureOpenAIKey")
@@ -136,7 +154,10 @@ class AgentImpl:
                 user_text = go.text
                 message_text = str(user_text)
             if isinstance(go, AgentMessageContent):
-                agent_context.context_data = json.loads(str(go.text))
+                context_text = str(go.text)
+                agent_context.context_data = await run_cpu_async(
+                    manager.local_config, decode_context, context_text, size=len(context_text)
+                )
                 if agent_context.context_data:
                     if len(agent_context.context_data) > 3:
                         agent_context.context_data = agent_context.context_data[-3:]
@@ -149,35 +170,91 @@ class AgentImpl:
         )
 
         history_list = []
+        history_count = []
+
+        local_config = manager.local_config
 
         if container and container._properties['http://vital.ai/ontology/haley-ai-question#hasSerializedContainer'].value != '':
         # if container:
-            container_list = VitalSignsUtils.unpack_container(container)
-            VitalSignsUtils.log_object_list("Container", container_list)
-
-            # for now, add tool requests/responses from previous history as raw JSON
-            # later, do so in a more clean way
-            history_count = []
-            message_count = 0
-            temp_conversation = []
-            for c in container_list:
-                if isinstance(c, KGAgent):
-                    agent_called_before = str(c.kGAgentName)
-                if isinstance(c, KGChatUserMessage):
-                    text = str(c.kGChatMessageText)
-                    temp_conversation.append(("human", text))
-                    message_count += 1
-                if isinstance(c, KGChatBotMessage):
-                    text = str(c.kGChatMessageText)
-                    temp_conversation.append(("ai", text))
-                    history_list.extend(temp_conversation)
-                    message_count += 1
-                    history_count.append(message_count)
-                    message_count = 0
-                    temp_conversation = []
+            serialized_container = str(container.serializedContainer)
+            history_list, history_count = await run_cpu_async(
+                local_config, read_history, serialized_container, size=len(serialized_container)
+            )
+
+        # clients that keep their state on the server send neither container nor context
+        session_key = None
+        session_store = self.get_session_store(local_config) if agent_context.server_session else None
+        if session_store is not None:
+            session_key = session_store.key(agent_context.alias, manager.api.user_id, agent_context.session_id)
+            state = session_store.get(session_key)
+            if state is None and session_store.backend is not None:
+                state = await run_in(local_config, "session", session_store.load, session_key)
+            if state is not None:
+                history_list = list(state.history_list)
+                history_count = list(state.history_count)
+                agent_context.context_data = state.context_data[-3:]
+            else:
+                logger.info(f"No stored state for session {agent_context.session_id}, starting a new conversation")
+        deadline = agent_context.deadline
+
+        # read-only questions already answered for this department replay without the llm
+        response_cache = self.get_response_cache(local_config)
+        cache_key = None
+        data_version = None
+        if response_cache is not None:
+            if get_cache_backend(local_config).shared:
+                data_version = await run_in(local_config, "session", manager.data_version)
+            else:
+                data_version = manager.data_version()
+        # an unknown version means another worker may have changed the data, no cached answers then
+        if data_version is not None:
+            cache_key = response_cache.key(
+                message_text=message_text,
+                today=display(shift_today()),
+                alias=agent_context.alias,
+                org_level_id=agent_context.org_level_id,
+                data_version=data_version,
+                context_data=agent_context.context_data,
+                history=history_list
+            )
+            # only users who read the department with their own token get its cached answers
+            cached = None
+            if manager.is_department_reader(agent_context.org_level_id):
+                cached = response_cache.get(cache_key)
+            if cached is not None:
+                from langchain_core.messages import HumanMessage
+                logger.info(f"Answering from cached response {cache_key}")
+                agent_context.context_data = (agent_context.context_data or []) + cached.context_data
+                messages_out = [HumanMessage(content=message_text)] + cached.messages
+                await self.send_chat_response(
+                    websocket, started_event, local_config, agent_context, history_list, history_count, messages_out,
+                    session_key
+                )
+                return
+        context_start = len(agent_context.context_data or [])
+
+        # heavy dependencies load on first use, prewarm() has usually done it already
+        import opik
+        from opik.integrations.langchain import OpikTracer
+        from kgraphplanner.agent.kg_planning_agent import KGPlanningAgent
+        from kgraphplanner.tool_manager.tool_manager import ToolManager
+        from langchain_openai import AzureChatOpenAI
+        from slxx_agent.agent.logging_handler import LoggingHandler
+        from slxx_agent.tools.get_shift_requests import GetShiftRequests
+        from slxx_agent.tools.search_employees_tool import SearchEmployeesTool
+        from slxx_agent.tools.approve_deny_shift_request import ApproveDenyShiftRequest
+        from slxx_agent.tools.get_pto_requests import GetPTORequests
+        from slxx_agent.tools.approve_deny_pto_request import ApproveDenyPTORequest
+        from slxx_agent.tools.get_pto_request_detail import GetPTORequestDetail
+        from slxx_agent.tools.get_employee_details import GetEmployeeDetails
+        from slxx_agent.tools.resolve_dates import ResolveDates
 
         logging_handler = LoggingHandler()
 
+        llm_timeout = local_config.llm_timeout
+        if deadline is not None:
+            llm_timeout = min(llm_timeout, deadline.remaining())
+
         llm = AzureChatOpenAI(
             azure_deployment=azure_deployment, 
             api_version=azure_api_version,
@@ -188,7 +265,9 @@ class AgentImpl:
             presence_penalty=0,
             frequency_penalty=0,
             openai_api_key=azure_key,
-            azure_endpoint=azure_endpoint
+            azure_endpoint=azure_endpoint,
+            timeout=llm_timeout,
+            max_retries=local_config.llm_max_retries
         )
 
         get_shift_requests_tool = GetShiftRequests({}, manager, agent_context)
@@ -197,6 +276,8 @@ class AgentImpl:
         get_pto_request_tool = GetPTORequests({}, manager, agent_context)
         approve_deny_pto_request_tool = ApproveDenyPTORequest({}, manager, agent_context)
         get_pto_request_details_tool = GetPTORequestDetail({}, manager, agent_context)
+        get_employee_details_tool = GetEmployeeDetails({}, manager, agent_context)
+        resolve_dates_tool = ResolveDates({}, manager, agent_context)
 
         tool_config = {}
         tool_manager = ToolManager(tool_config)
@@ -207,6 +288,8 @@ class AgentImpl:
         tool_manager.add_tool(get_pto_request_tool)
         tool_manager.add_tool(approve_deny_pto_request_tool)
         tool_manager.add_tool(get_pto_request_details_tool)
+        tool_manager.add_tool(get_employee_details_tool)
+        tool_manager.add_tool(resolve_dates_tool)
 
         # getting tools to use in agent into a function list
         get_shift_requests_tool_name = GetShiftRequests.get_tool_cls_name()
@@ -215,6 +298,8 @@ class AgentImpl:
         get_pto_request_tool_name = GetPTORequests.get_tool_cls_name()
         approve_deny_pto_request_tool_name = ApproveDenyPTORequest.get_tool_cls_name()
         get_pto_request_details_tool_name = GetPTORequestDetail.get_tool_cls_name()
+        get_employee_details_tool_name = GetEmployeeDetails.get_tool_cls_name()
+        resolve_dates_tool_name = ResolveDates.get_tool_cls_name()
 
         # function list
         tool_list = [
@@ -224,24 +309,38 @@ class AgentImpl:
             tool_manager.get_tool(get_pto_request_tool_name).get_tool_function(),
             tool_manager.get_tool(approve_deny_pto_request_tool_name).get_tool_function(),
             tool_manager.get_tool(get_pto_request_details_tool_name).get_tool_function(),
+            tool_manager.get_tool(get_employee_details_tool_name).get_tool_function(),
+            tool_manager.get_tool(resolve_dates_tool_name).get_tool_function(),
         ]
 
-        # today = datetime.today()
-        today = datetime.now(ZoneInfo('America/New_York'))
-
-        # Find the immediate Sunday before or equal to today's date
-        sunday_before = today - timedelta(days=today.weekday() + 1) if today.weekday() != 6 else today
+        today = shift_today()
 
-        # Find the following Saturday after the Sunday
-        saturday_after = sunday_before + timedelta(days=6)
+        # the shift week runs from the Sunday on or before today to the following Saturday
+        sunday_before, saturday_after = shift_week(today)
 
         # Format the dates as 'MM-DD-YYYY'
-        today_str = today.strftime('%m-%d-%Y')
-        sunday_before_str = sunday_before.strftime('%m-%d-%Y')
-        saturday_after_str = saturday_after.strftime('%m-%d-%Y')
+        today_str = display(today)
+        sunday_before_str = display(sunday_before)
+        saturday_after_str = display(saturday_after)
+
+        # dates of the user's message resolved in code, the model need not work them out
+        resolved_dates_prompt = ""
+        if local_config.resolve_dates_in_prompt:
+            resolved_dates = resolve_date_phrases(message_text, today)
+            if resolved_dates:
+                logger.info(f"Resolved dates: {[r.describe() for r in resolved_dates]}")
+                resolved_dates_prompt = "\n".join(
+                    ["**Resolved Dates** in the user's message, already computed with these rules; use them as given:"]
+                    + [f"        * {r.describe()}" for r in resolved_dates]
+                )
         agent = KGPlanningAgent(llm, tools=tool_list)
         graph = agent.compile()
 
+        if local_config.render_tables:
+            output_data_instructions = """* **Rendered Tables**: The request tools return a `table` placeholder such as `[[table:T1]]` next to the data. The server replaces it with the complete table, with dates already in MM-DD-YYYY. To present the data, write a short lead-in sentence and put the placeholder on its own line; **DO NOT** retype the rows or build your own table. This overrides the table layouts shown in the scenarios below."""
+        else:
+            output_data_instructions = """* **Output Full Data**: When presenting PTO request data, you **MUST** always provide the complete data from the tool; do not truncate any information."""
+
         # --- ReAct Prompt Template ---
         system_prompt = f"""
 
@@ -274,6 +373,9 @@ class AgentImpl:
         * "This week": Refers to the *current shift week*.
         * "Next week": Refers to the week *after* the current shift week.
         * "Last week": Refers to the week *before* the current shift week.
+        * For any other date phrase, call `resolve_dates` instead of working the date out yourself.
+
+        {resolved_dates_prompt}
 
         ---
 
@@ -285,6 +387,7 @@ class AgentImpl:
         * **Tool Parameters - Date Format**: **IMPORTANT**: Always use the date format **YYYY-MM-DD** for all tool calls. Only format dates as **MM-DD-YYYY** when presenting information directly to the user in your final response.
         * **Accuracy First**: You **MUST NOT** invent, assume, or guess values. You **MUST** use tools to get accurate and verified data.
         * **Default Date**: If a user doesn't specify a date for a request, use **today's date** by default for tool calls.
+        * **Batch Independent Calls**: When several tool calls do not depend on each other's results (details of several PTO requests, shift requests for several dates), request them all in the same step. They run in parallel; spreading them over several steps makes the user wait for each one in turn.
         * **Tool Verification**: You **MUST** always call the appropriate tool to perform a task. **NEVER** state something is completed or provide information without tool verification, even if similar information seems present in previous conversation history.
 
         ### Using Previous Context & History
@@ -295,9 +398,11 @@ class AgentImpl:
 
         ### Specific Tool Instructions
 
-        * **get_shift_requests**: This tool gets requests for one date. To get data for a whole week or multiple days, you **MUST** call this tool multiple times with different dates.
+        * **get_shift_requests**: This tool gets requests for one date. To get data for a whole week or multiple days, you **MUST** call this tool once per date, with all the dates in the same step.
+        * **get_employee_details**: Pass every employee id you need in a single call; never call it once per employee.
+        * **resolve_dates**: Resolves date phrases against the shift week without calling the scheduling service. Pass all phrases in one call.
         * **PTO Approvals/Denials**: When approving or denying any PTO or leave request, you **MUST** always ask if the user wants to add a comment.
-        * **Output Full Data**: When presenting PTO request data, you **MUST** always provide the complete data from the tool; do not truncate any information.
+        {output_data_instructions}
 
         ---
 
@@ -310,7 +415,7 @@ class AgentImpl:
             * **Thought**: The user wants to see PTO requests. I need to call the `get_pto_requests` tool. Since no date is specified, I will use today's date to get requests for "tomorrow" by calculating tomorrow's date in YYYY-MM-DD format.
             * **Action**: `get_pto_requests({{"date": "YYYY-MM-DD_tomorrow"}})` (e.g., `get_pto_requests({{"date": "2025-05-31"}})` if today is 2025-05-30)
             * **Observation**: [Tool output, e.g., list of PTO requests with IDs]
-            * **Thought**: I have successfully retrieved the high-level PTO requests. I need to present them to the user in the specified table format and then prompt for further action.
+            * **Thought**: I have successfully retrieved the high-level PTO requests. Requests carry `shift_count` and `remaining_balance` when they are known; when they are null I leave those cells blank and make no detail calls just to fill them. I need to present them to the user in the specified table format and then prompt for further action.
             * **AI Response Format**: Display a high-level summary table (Employee, Date Range, Reason, Remaining Balance) using MM-DD-YYYY for dates, then ask if they need details or want to approve/deny any PTO request.
                 ```
                 Yes, here are the requests for tomorrow:
@@ -344,11 +449,9 @@ class AgentImpl:
             * **Thought**: The user wants to see all PTO requests for a specific employee. I will first call `get_pto_requests` for "John Smith" to get a list of high-level requests. Then, for each request returned, I will call `get_pto_request_details` to get its full details. Finally, I will display all collected details.
             * **Action**: `get_pto_requests({{"employee_name": "John Smith"}})`
             * **Observation**: [Tool output, e.g., list of PTO requests for John Smith with IDs]
-            * **Thought**: I have retrieved the high-level PTO requests for John Smith. Now, I need to get the full details for each of these requests by calling `get_pto_request_details` for each `request_id` from the previous observation.
-            * **Action**: `get_pto_request_details({{"request_id": "ID_1_from_previous_observation"}})`
-            * **Observation**: [Tool output for ID_1]
-            * **Action**: `get_pto_request_details({{"request_id": "ID_2_from_previous_observation"}})`
-            * **Observation**: [Tool output for ID_2]
+            * **Thought**: I have retrieved the high-level PTO requests for John Smith. The detail lookups do not depend on each other, so I will call `get_pto_request_details` for every `request_id` from the previous observation in this same step.
+            * **Action**: `get_pto_request_details({{"request_id": "ID_1_from_previous_observation"}})` and `get_pto_request_details({{"request_id": "ID_2_from_previous_observation"}})`, both in one step
+            * **Observation**: [Tool output for ID_1] [Tool output for ID_2]
             * **Thought**: I have retrieved all necessary details for John Smith's PTO requests. I will now present all the details in the specified tabular format.
             * **AI Response**: [Formatted table with all PTO details for John Smith using MM-DD-YYYY dates]
 
@@ -445,106 +548,111 @@ class AgentImpl:
                                 project_name=opik_request_handler_project)
 
         messages_out = []
-        print_stream(graph.stream(inputs, config={"callbacks":[opik_tracer]}, stream_mode="values"), messages_out)
-        history_out_list = []
-
-        if history_list:
-            if len(history_count) > 2:
-                history_list = history_list[history_count[0]:]
-
-            for role, message in history_list:
-                if role == 'assistant':
-                    agent_name_history = KGAgent()
-                    agent_name_history.URI = URIGenerator.generate_uri()
-                    agent_name_history.kGAgentName = message
-                    history_out_list.append(agent_name_history)
-                if role == 'human':
-                    user_message = KGChatUserMessage()
-                    user_message.URI = URIGenerator.generate_uri()
-                    user_message.kGChatMessageText = message
-                    history_out_list.append(user_message)
-                if role == 'ai':
-                    if message.startswith('** AI Prior Tool Request: '):
-                        tool_request = KGToolRequest()
-                        tool_request.URI = URIGenerator.generate_uri()
-                        tool_request.kGToolRequestType = "urn:langgraph_openai_tool_request"
-                        tool_request_string = message.split('** AI Prior Tool Request: ')[-1]
-                        tool_request.kGJSON = tool_request_string
-                        history_out_list.append(tool_request)
-                    elif message.startswith('** AI Prior Tool Result: '):
-                        tool_result = KGToolResult()
-                        tool_result.URI = URIGenerator.generate_uri()
-                        tool_result.kGToolResultType = "urn:langgraph_openai_tool_result"
-                        tool_result_json = message.split('** AI Prior Tool Result: ')[-1]
-                        tool_result.kGJSON = tool_result_json
-                        history_out_list.append(tool_result)
-                    else:
-                        bot_message = KGChatBotMessage()
-                        bot_message.URI = URIGenerator.generate_uri()
-                        bot_message.kGChatMessageText = message
-                        history_out_list.append(bot_message)
+        # max_concurrency bounds the thread pool the tool node runs one step's tool calls on
+        graph_config = {
+            "callbacks": [opik_tracer],
+            "recursion_limit": local_config.turn_recursion_limit,
+            "max_concurrency": local_config.tool_concurrency
+        }
+
+        # the graph blocks on llm and slxx calls, run it on the llm executor and
+        # stop it between steps when the deadline passes or the client leaves
+        watcher = asyncio.create_task(self.watch_turn(websocket, deadline)) if deadline else None
+        try:
+            await run_in(
+                local_config, "llm", print_stream, graph.stream(inputs, config=graph_config, stream_mode="values"),
+                messages_out, deadline
+            )
+        except DeadlineExceeded as e:
+            logger.warning(f"Chat turn stopped: {e}")
+            if deadline.cancel_reason == "websocket closed":
+                started_event.set()
+                return
+            await self.handle_error_message(websocket, started_event, e.message)
+            return
+        except asyncio.CancelledError:
+            if deadline is not None:
+                deadline.cancel("turn cancelled")
+            raise
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+        # swap the table placeholders of the answer for the tables the tools rendered
+        if agent_context.rendered_tables and messages_out:
+            messages_out[-1] = expand_message_tables(messages_out[-1], agent_context.rendered_tables)
+
+        # keep the turn for the next manager asking the same thing
+        if cache_key is not None:
+            if response_cache.store(cache_key, messages_out[1:], agent_context.context_data[context_start:]):
+                logger.info(f"Stored cached response {cache_key}")
+
+        await self.send_chat_response(
+            websocket, started_event, local_config, agent_context, history_list, history_count, messages_out,
+            session_key
+        )
 
+    async def send_chat_response(
+        self,
+        websocket: WebSocket,
+        started_event: asyncio.Event,
+        local_config: LocalConfig,
+        agent_context: AgentContext,
+        history_list: list,
+        history_count: list,
+        messages_out: list,
+        session_key: str = None
+    ):
+        """
+        With a session_key the conversation state is saved in the session
+        store and the response carries only the reply.
+        """
+        from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
+        logger = logging.getLogger(__name__)
+
+        # plain data for build_response_json, which may run in the cpu offload pool
+        turn_messages = []
         for m in messages_out:
             t = type(m)
             logger.info(f"History ({t}): {m}")
             if isinstance(m, HumanMessage):
-                agent_called = KGAgent()
-                agent_called.URI = URIGenerator.generate_uri()
-                agent_called.kGAgentName = 'AI_Agent_RequestHandler'
-                history_out_list.append(agent_called)
-                user_message = KGChatUserMessage()
-                user_message.URI = URIGenerator.generate_uri()
-                user_message.kGChatMessageText = m.content
-                history_out_list.append(user_message)
+                turn_messages.append(("human", m.content))
             if isinstance(m, AIMessage):
                 if m.tool_calls:
-                    tool_request = KGToolRequest()
-                    tool_request.URI = URIGenerator.generate_uri()
-                    tool_request.kGToolRequestType = "urn:langgraph_openai_tool_request"
-                    tool_request.kGJSON = m.tool_calls
-                    history_out_list.append(tool_request)
-                    logger.info(tool_request.to_json(pretty_print=False))
+                    turn_messages.append(("tool_request", m.tool_calls))
                 else:
-                    bot_message = KGChatBotMessage()
-                    bot_message.URI = URIGenerator.generate_uri()
-                    bot_message.kGChatMessageText = m.content
-                    history_out_list.append(bot_message)
+                    turn_messages.append(("ai", m.content))
             if isinstance(m, ToolMessage):
-                tool_result = KGToolResult()
-                tool_result.URI = URIGenerator.generate_uri()
-                tool_result.kGToolResultType = "urn:langgraph_openai_tool_result"
-                tool_result.kGJSON = m.content
-                history_out_list.append(tool_result)
-                logger.info(tool_result.to_json(pretty_print=False))
-
-        container = HaleyContainer()
-        container.URI = URIGenerator.generate_uri()
-
-        if len(history_out_list) > 0:
-            logger.info(f"Outgoing container size is: {len(history_out_list)}")
-            container = VitalSignsUtils.pack_container(container, history_out_list)
+                turn_messages.append(("tool_result", m.content))
 
         last_message = messages_out[-1]
         response_text = last_message.content
         logger.info(f"Response Text: {response_text}")
 
-        response_msg = AIMPResponseMessage()
-        response_msg.URI = URIGenerator.generate_uri()
-        response_msg.aIMPIntentType = "http://vital.ai/ontology/vital-aimp#AIMPIntentType_CHAT"
-
-        agent_msg_content = AgentMessageContent()
-        agent_msg_content.URI = URIGenerator.generate_uri()
-        agent_msg_content.text = response_text
-
-        context_data = AgentMessageContent()
-        context_data.URI = URIGenerator.generate_uri()
-        context_data.text = json.dumps(agent_context.context_data, indent=4)
-
-        message = [response_msg, agent_msg_content, container, context_data]
-        message_json = vs.to_json(message)
+        if session_key is not None:
+            session_history, session_count = next_history(history_list, history_count, turn_messages)
+            state = SessionState(session_history, session_count, list(agent_context.context_data or []))
+            if self.session_store.backend is None:
+                self.session_store.save(session_key, state)
+            else:
+                await run_in(local_config, "session", self.session_store.save, session_key, state)
+
+        include_state = session_key is None
+        encoding = TransportEncoding(
+            compact=local_config.transport_compact_json,
+            # only clients that advertised gzip can read it back
+            compression="gzip" if "gzip" in agent_context.accept_encoding else None,
+            level=local_config.transport_compress_level,
+            min_bytes=local_config.transport_compress_min_bytes
+        )
+        message_json = await run_cpu_async(
+            local_config, build_response_json,
+            history_list, history_count, turn_messages, response_text, agent_context.context_data, include_state,
+            encoding,
+            size=payload_size(history_list, turn_messages) if include_state else 0
+        )
 
         await websocket.send_text(message_json)
-        logger.info(f"Sent Message: {message_json}")
+        logger.info(f"Sent Message ({len(message_json)} chars): {message_json}")
 
         started_event.set()
         logger.info("Completed Event.")
@@ -0,0 +1,268 @@
+import base64
+import gzip
+import json
+import logging
+
+from ai_haley_kg_domain.model.KGChatBotMessage import KGChatBotMessage
+from ai_haley_kg_domain.model.KGChatUserMessage import KGChatUserMessage
+from ai_haley_kg_domain.model.KGToolRequest import KGToolRequest
+from ai_haley_kg_domain.model.KGToolResult import KGToolResult
+from ai_haley_kg_domain.model.KGAgent import KGAgent
+from com_vitalai_aimp_domain.model.AIMPResponseMessage import AIMPResponseMessage
+from com_vitalai_aimp_domain.model.AgentMessageContent import AgentMessageContent
+from com_vitalai_haleyai_question_domain.model.HaleyContainer import HaleyContainer
+from vital_agent_kg_utils.vitalsignsutils.vitalsignsutils import VitalSignsUtils
+from vital_ai_vitalsigns.utils.uri_generator import URIGenerator
+from vital_ai_vitalsigns.vitalsigns import VitalSigns
+
+# conversion between the chat history container and plain python data
+# the functions take and return only strings, lists and tuples so they can
+# run in the cpu offload pool as well as inline
+
+# ai history entries carrying raw tool json, sent back as tool objects
+PRIOR_TOOL_PREFIXES = ('** AI Prior Tool Request: ', '** AI Prior Tool Result: ')
+
+GZIP_MAGIC = b"\x1f\x8b"
+# gzip compressed context data is sent as this prefix and base64
+CONTEXT_GZIP_PREFIX = "gz:"
+
+
+class TransportEncoding:
+    """
+    How the container and context data are written. compression is "gzip"
+    for clients that asked for it, otherwise None; payloads shorter than
+    min_bytes are never compressed.
+    """
+    __slots__ = ("compact", "compression", "level", "min_bytes")
+
+    def __init__(self, compact=False, compression=None, level=6, min_bytes=1024):
+        self.compact = compact
+        self.compression = compression
+        self.level = level
+        self.min_bytes = min_bytes
+
+    def compress(self, data: bytes) -> bool:
+        return self.compression == "gzip" and len(data) >= self.min_bytes
+
+
+def encode_container(json_string: str, encoding: TransportEncoding) -> str:
+    data = json_string.encode('utf-8')
+    if encoding.compress(data):
+        data = gzip.compress(data, compresslevel=encoding.level, mtime=0)
+    return base64.b64encode(data).decode('ascii')
+
+
+def decode_container(serialized_container: str) -> str:
+    """
+    JSON of a serialized container, plain or gzip compressed.
+    """
+    data = base64.b64decode(serialized_container)
+    if data[:2] == GZIP_MAGIC:
+        data = gzip.decompress(data)
+    return data.decode('utf-8')
+
+
+def encode_context(context_data: list, encoding: TransportEncoding) -> str:
+    if encoding.compact:
+        text = json.dumps(context_data, separators=(',', ':'))
+    else:
+        text = json.dumps(context_data, indent=4)
+    data = text.encode('utf-8')
+    if encoding.compress(data):
+        return CONTEXT_GZIP_PREFIX + base64.b64encode(gzip.compress(data, compresslevel=encoding.level, mtime=0)).decode('ascii')
+    return text
+
+
+def decode_context(text: str):
+    """
+    Context data sent back by the client, plain or gzip compressed JSON.
+    """
+    if text.startswith(CONTEXT_GZIP_PREFIX):
+        text = gzip.decompress(base64.b64decode(text[len(CONTEXT_GZIP_PREFIX):])).decode('utf-8')
+    return json.loads(text)
+
+
+def read_history(serialized_container: str):
+    """
+    History of a serialized HaleyContainer.
+
+    Returns:
+        (history_list of (role, text), history_count of messages per exchange)
+    """
+    vs = VitalSigns()
+    container_list = vs.from_json_list(decode_container(serialized_container))
+    VitalSignsUtils.log_object_list("Container", container_list)
+
+    chat_messages = []
+    for c in container_list:
+        if isinstance(c, KGChatUserMessage):
+            chat_messages.append(("human", str(c.kGChatMessageText)))
+        if isinstance(c, KGChatBotMessage):
+            chat_messages.append(("ai", str(c.kGChatMessageText)))
+    return collect_history(chat_messages)
+
+
+def collect_history(chat_messages):
+    """
+    Group ("human" | "ai", text) messages into exchanges, an exchange ends
+    with an ai message and unanswered messages at the end are dropped.
+    """
+    # for now, add tool requests/responses from previous history as raw JSON
+    # later, do so in a more clean way
+    history_list = []
+    history_count = []
+    message_count = 0
+    temp_conversation = []
+    for role, text in chat_messages:
+        if role == "human":
+            temp_conversation.append(("human", text))
+            message_count += 1
+        if role == "ai":
+            temp_conversation.append(("ai", text))
+            history_list.extend(temp_conversation)
+            message_count += 1
+            history_count.append(message_count)
+            message_count = 0
+            temp_conversation = []
+    return history_list, history_count
+
+
+def next_history(history_list: list, history_count: list, turn_messages: list):
+    """
+    History the next turn reads back from the container build_response_json
+    makes of this turn, without building it.
+    """
+    if history_list and len(history_count) > 2:
+        history_list = history_list[history_count[0]:]
+    chat_messages = [
+        (role, text) for role, text in history_list or []
+        if role == 'human' or (role == 'ai' and not text.startswith(PRIOR_TOOL_PREFIXES))
+    ]
+    chat_messages.extend((kind, payload) for kind, payload in turn_messages if kind in ('human', 'ai'))
+    return collect_history(chat_messages)
+
+
+def build_response_json(history_list: list, history_count: list, turn_messages: list,
+                        response_text: str, context_data: list, include_state: bool = True,
+                        encoding: TransportEncoding = None) -> str:
+    """
+    Serialized response message: the reply, the history container and the context data.
+
+    turn_messages are (kind, payload) tuples for this turn, kind one of
+    human, ai, tool_request and tool_result. Without include_state the
+    container and context data go out empty, the session store keeps them.
+    """
+    encoding = encoding or TransportEncoding()
+    logger = logging.getLogger(__name__)
+    vs = VitalSigns()
+    history_out_list = []
+
+    if not include_state:
+        history_list = []
+        turn_messages = []
+        context_data = []
+
+    if history_list:
+        if len(history_count) > 2:
+            history_list = history_list[history_count[0]:]
+
+        for role, message in history_list:
+            if role == 'assistant':
+                agent_name_history = KGAgent()
+                agent_name_history.URI = URIGenerator.generate_uri()
+                agent_name_history.kGAgentName = message
+                history_out_list.append(agent_name_history)
+            if role == 'human':
+                user_message = KGChatUserMessage()
+                user_message.URI = URIGenerator.generate_uri()
+                user_message.kGChatMessageText = message
+                history_out_list.append(user_message)
+            if role == 'ai':
+                if message.startswith('** AI Prior Tool Request: '):
+                    tool_request = KGToolRequest()
+                    tool_request.URI = URIGenerator.generate_uri()
+                    tool_request.kGToolRequestType = "urn:langgraph_openai_tool_request"
+                    tool_request_string = message.split('** AI Prior Tool Request: ')[-1]
+                    tool_request.kGJSON = tool_request_string
+                    history_out_list.append(tool_request)
+                elif message.startswith('** AI Prior Tool Result: '):
+                    tool_result = KGToolResult()
+                    tool_result.URI = URIGenerator.generate_uri()
+                    tool_result.kGToolResultType = "urn:langgraph_openai_tool_result"
+                    tool_result_json = message.split('** AI Prior Tool Result: ')[-1]
+                    tool_result.kGJSON = tool_result_json
+                    history_out_list.append(tool_result)
+                else:
+                    bot_message = KGChatBotMessage()
+                    bot_message.URI = URIGenerator.generate_uri()
+                    bot_message.kGChatMessageText = message
+                    history_out_list.append(bot_message)
+
+    for kind, payload in turn_messages:
+        if kind == 'human':
+            agent_called = KGAgent()
+            agent_called.URI = URIGenerator.generate_uri()
+            agent_called.kGAgentName = 'AI_Agent_RequestHandler'
+            history_out_list.append(agent_called)
+            user_message = KGChatUserMessage()
+            user_message.URI = URIGenerator.generate_uri()
+            user_message.kGChatMessageText = payload
+            history_out_list.append(user_message)
+        if kind == 'tool_request':
+            tool_request = KGToolRequest()
+            tool_request.URI = URIGenerator.generate_uri()
+            tool_request.kGToolRequestType = "urn:langgraph_openai_tool_request"
+            tool_request.kGJSON = payload
+            history_out_list.append(tool_request)
+            logger.info(tool_request.to_json(pretty_print=False))
+        if kind == 'ai':
+            bot_message = KGChatBotMessage()
+            bot_message.URI = URIGenerator.generate_uri()
+            bot_message.kGChatMessageText = payload
+            history_out_list.append(bot_message)
+        if kind == 'tool_result':
+            tool_result = KGToolResult()
+            tool_result.URI = URIGenerator.generate_uri()
+            tool_result.kGToolResultType = "urn:langgraph_openai_tool_result"
+            tool_result.kGJSON = payload
+            history_out_list.append(tool_result)
+            logger.info(tool_result.to_json(pretty_print=False))
+
+    container = HaleyContainer()
+    container.URI = URIGenerator.generate_uri()
+
+    serialized_container = ''
+    if len(history_out_list) > 0:
+        serialized_container = encode_container(vs.to_json(history_out_list), encoding)
+        container.serializedContainer = serialized_container
+
+    response_msg = AIMPResponseMessage()
+    response_msg.URI = URIGenerator.generate_uri()
+    response_msg.aIMPIntentType = "http://vital.ai/ontology/vital-aimp#AIMPIntentType_CHAT"
+
+    agent_msg_content = AgentMessageContent()
+    agent_msg_content.URI = URIGenerator.generate_uri()
+    agent_msg_content.text = response_text
+
+    context = AgentMessageContent()
+    context.URI = URIGenerator.generate_uri()
+    context.text = encode_context(context_data, encoding)
+
+    logger.info(
+        f"Outgoing container size is: {len(history_out_list)} objects, {len(serialized_container)} chars; "
+        f"context data {len(context.text)} chars"
+    )
+
+    message = [response_msg, agent_msg_content, container, context]
+    return vs.to_json(message)
+
+
+def payload_size(history_list: list, turn_messages: list) -> int:
+    """
+    Rough character count of what build_response_json serializes.
+    """
+    size = sum(len(text) for _, text in history_list or [])
+    size += sum(len(str(payload)) for _, payload in turn_messages)
+    # context entries repeat the tool results of the turn
+    size += sum(len(str(payload)) for kind, payload in turn_messages if kind == 'tool_result')
+    return size
@@ -0,0 +1,167 @@
+import calendar
+import re
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from slxx_agent.date_utils import display
+
+# relative date phrases resolved in code against the shift week rules of the
+# system prompt, so the model reads concrete dates instead of reasoning them out.
+#
+# the shift week runs Sunday to Saturday. a bare day name is that day of the
+# current shift week, "last"/"previous" moves it a week back and "next" a
+# week forward; "this/next/last week" are whole shift weeks.
+
+SHIFT_TIMEZONE = ZoneInfo('America/New_York')
+
+DAY_NAMES = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+MONTH_NAMES = {name.lower(): index for index, name in enumerate(calendar.month_name) if name}
+MONTH_NAMES.update({name.lower(): index for index, name in enumerate(calendar.month_abbr) if name})
+MONTH_NAMES["sept"] = 9
+
+_BACK = ("last", "previous", "past", "prior")
+_MONTH_RE = "|".join(sorted(MONTH_NAMES, key=len, reverse=True))
+# a bare m/d followed by one of these is a fraction ("1/2 day", "3/4 of a shift")
+_UNIT_RE = r"(?:an?\s+|of\s+)?(?:days?|hours?|hrs?|shifts?|weeks?|time|pto)\b|of\b"
+
+DATE_PHRASE_RE = re.compile(
+    r"\b(?:"
+    r"(?P<offset_day>(?:the\s+)?day\s+after\s+tomorrow|(?:the\s+)?day\s+before\s+yesterday|today|tonight|tomorrow|yesterday)"
+    r"|(?:(?P<day_mod>this|next|last|previous|coming)\s+)?(?P<day_name>" + "|".join(DAY_NAMES) + r")s?"
+    r"|(?P<week_mod>this|current|next|coming|last|previous|past)\s+(?:shift\s+)?week"
+    r"|(?P<month_mod>this|current|next|last|previous|past)\s+month"
+    r"|in\s+(?P<in_days>\d{1,3})\s+days?"
+    r"|(?P<ago_days>\d{1,3})\s+days?\s+ago"
+    r"|(?P<iso>\d{4}-\d{1,2}-\d{1,2})"
+    # m/d/y and m-d-y always, a bare m/d only when it is not part of a longer
+    # number or followed by a unit word
+    r"|(?<![\d/.-])(?P<us>\d{1,2}(?P<us_sep>[/-])\d{1,2}(?P=us_sep)(?:\d{4}|\d{2})(?![/\d-])"
+    r"|\d{1,2}/\d{1,2}(?![/\d.])(?!\s*(?:" + _UNIT_RE + r")))"
+    r"|(?P<month_name>" + _MONTH_RE + r")\.?\s+(?P<month_day>\d{1,2})(?:st|nd|rd|th)?(?:,?\s+(?P<month_year>\d{4}))?"
+    r")\b",
+    re.IGNORECASE
+)
+
+
+def shift_today() -> date:
+    return datetime.now(SHIFT_TIMEZONE).date()
+
+
+def shift_week(day: date):
+    """
+    (Sunday, Saturday) of the shift week day falls in.
+    """
+    sunday = day - timedelta(days=(day.weekday() + 1) % 7)
+    return sunday, sunday + timedelta(days=6)
+
+
+class ResolvedDate:
+    __slots__ = ("phrase", "start", "end")
+
+    def __init__(self, phrase: str, start: date, end: date = None):
+        self.phrase = phrase
+        self.start = start
+        self.end = end or start
+
+    def to_dict(self) -> dict:
+        resolved = {"phrase": self.phrase, "start_date": display(self.start), "end_date": display(self.end)}
+        if self.start == self.end:
+            resolved["day"] = DAY_NAMES[self.start.weekday()].capitalize()
+        return resolved
+
+    def describe(self) -> str:
+        if self.start == self.end:
+            return f'"{self.phrase}": {display(self.start)} ({DAY_NAMES[self.start.weekday()].capitalize()})'
+        return f'"{self.phrase}": {display(self.start)} to {display(self.end)}'
+
+
+def _month_range(year: int, month: int):
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def _day(year, month, day_of_month):
+    try:
+        return date(year, month, day_of_month)
+    except ValueError:
+        return None
+
+
+def _resolve_match(match, today: date):
+    """
+    (start, end) of one DATE_PHRASE_RE match, None for an impossible date.
+    """
+    groups = {k: v.lower() for k, v in match.groupdict().items() if v is not None}
+    sunday, saturday = shift_week(today)
+
+    if "offset_day" in groups:
+        phrase = " ".join(groups["offset_day"].split()).removeprefix("the ")
+        offset = {
+            "today": 0, "tonight": 0, "tomorrow": 1, "yesterday": -1,
+            "day after tomorrow": 2, "day before yesterday": -2,
+        }[phrase]
+        return today + timedelta(days=offset), None
+
+    if "day_name" in groups:
+        # Sunday opens the shift week, Saturday closes it
+        day = sunday + timedelta(days=(DAY_NAMES.index(groups["day_name"]) + 1) % 7)
+        modifier = groups.get("day_mod")
+        if modifier in ("last", "previous"):
+            day -= timedelta(days=7)
+        elif modifier in ("next", "coming"):
+            day += timedelta(days=7)
+        return day, None
+
+    if "week_mod" in groups:
+        shift = -7 if groups["week_mod"] in _BACK else 7 if groups["week_mod"] in ("next", "coming") else 0
+        return sunday + timedelta(days=shift), saturday + timedelta(days=shift)
+
+    if "month_mod" in groups:
+        year, month = today.year, today.month
+        if groups["month_mod"] in _BACK:
+            year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+        elif groups["month_mod"] == "next":
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return _month_range(year, month)
+
+    if "in_days" in groups:
+        return today + timedelta(days=int(groups["in_days"])), None
+
+    if "ago_days" in groups:
+        return today - timedelta(days=int(groups["ago_days"])), None
+
+    if "iso" in groups:
+        year, month, day_of_month = (int(part) for part in groups["iso"].split("-"))
+        return _day(year, month, day_of_month), None
+
+    if "us" in groups:
+        parts = [int(part) for part in re.split(r"[-/]", groups["us"])]
+        year = parts[2] if len(parts) == 3 else today.year
+        if year < 100:
+            year += 2000
+        return _day(year, parts[0], parts[1]), None
+
+    year = int(groups["month_year"]) if "month_year" in groups else today.year
+    return _day(year, MONTH_NAMES[groups["month_name"]], int(groups["month_day"])), None
+
+
+def resolve_date_phrases(text: str, today: date = None) -> list:
+    """
+    Dates and ranges of the date phrases in text, in order of appearance.
+
+    Args:
+        text: a user message or a single phrase such as "next monday"
+        today: the shift day to resolve against, today in the shift time zone by default
+
+    Returns:
+        List[ResolvedDate], one per distinct phrase
+    """
+    today = today or shift_today()
+    resolved = {}
+    for match in DATE_PHRASE_RE.finditer(text or ""):
+        phrase = " ".join(match.group(0).lower().split())
+        if phrase in resolved:
+            continue
+        start, end = _resolve_match(match, today)
+        if start is not None:
+            resolved[phrase] = ResolvedDate(phrase, start, end)
+    return list(resolved.values())
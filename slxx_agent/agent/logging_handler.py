@@ -0,0 +1,19 @@
+import logging
+
+from langchain.callbacks.base import BaseCallbackHandler
+
+
+class LoggingHandler(BaseCallbackHandler):
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('%(asctime)s - %(message)s')
+        handler.setFormatter(formatter)
+        self.logger.addHandler(handler)
+        self.logger.setLevel(logging.INFO)
+
+    def on_llm_start(self, serialized: dict, prompts: list, **kwargs):
+        self.logger.info(f"LLM Request: {prompts}")
+
+    def on_llm_end(self, response, **kwargs):
+        self.logger.info(f"LLM Response: {response.generations}")
@@ -0,0 +1,85 @@
+import hashlib
+import json
+import re
+import unicodedata
+
+from slxx_agent.manager.lru_cache import LRUCache
+
+# answers to read-only questions, shared by the managers of a department
+# a hit replays the turn's messages and context data without calling the llm
+# keys carry the alias data version, so any approve/deny makes older answers unreachable
+
+# tools that only read, a turn that called anything else is never cached
+READ_ONLY_TOOLS = frozenset({
+    "get_shift_requests",
+    "get_pto_requests",
+    "get_pto_request_details",
+    "search_employees",
+    "get_employee_details",
+    "resolve_dates",
+})
+
+# words that do not change what is being asked
+FILLER_WORDS = frozenset({
+    "a", "an", "the", "please", "pls", "can", "could", "would", "you", "me", "show", "list",
+    "give", "get", "tell", "what", "whats", "which", "are", "is", "there", "any", "all", "of",
+    "for", "i", "we", "to", "see", "do", "have", "us", "my", "our", "some", "kindly",
+})
+
+_WORD_RE = re.compile(r"[a-z0-9]+(?:[-/][a-z0-9]+)*")
+
+
+def normalize_intent(text: str) -> str:
+    """
+    Lowercased content words of a question, so "Show me the open shift
+    requests for today?" and "open shift requests today" share a key.
+    """
+    folded = unicodedata.normalize("NFKC", text or "").lower().replace("'", "")
+    return " ".join(word for word in _WORD_RE.findall(folded) if word not in FILLER_WORDS)
+
+
+def fingerprint(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+class CachedTurn:
+    __slots__ = ("messages", "context_data")
+
+    def __init__(self, messages: list, context_data: list):
+        self.messages = messages
+        self.context_data = context_data
+
+
+class ResponseCache:
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.entries = LRUCache(maxsize, ttl)
+
+    def key(self, *, message_text, today, alias, org_level_id, data_version, context_data, history) -> str:
+        # prior context and the last exchange change what a follow-up means
+        return fingerprint([
+            normalize_intent(message_text), today, alias, org_level_id, data_version,
+            fingerprint(context_data or []), fingerprint(history[-2:] if history else [])
+        ])
+
+    def get(self, key) -> CachedTurn:
+        return self.entries.get(key)
+
+    def store(self, key, messages: list, context_data: list) -> bool:
+        """
+        Keep the turn when every tool call was read-only and succeeded.
+        messages are the turn's messages after the user message.
+        """
+        called = False
+        for message in messages:
+            for call in getattr(message, "tool_calls", None) or []:
+                if call.get("name") not in READ_ONLY_TOOLS:
+                    return False
+                called = True
+            if getattr(message, "type", None) == "tool" and '"status": "error"' in str(message.content):
+                return False
+        # answers that used no tool are not grounded in slxx data
+        if not called or not messages or getattr(messages[-1], "tool_calls", None):
+            return False
+        self.entries.set(key, CachedTurn(list(messages), list(context_data)))
+        return True
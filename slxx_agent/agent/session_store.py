@@ -0,0 +1,86 @@
+import logging
+
+from slxx_agent.manager.cache_backend import CacheBackend
+from slxx_agent.manager.lru_cache import LRUCache
+
+# conversation state kept on the server for clients that opt in, so a turn
+# carries only the new user message and the session id instead of the whole
+# history container and context data.
+#
+# state is plain data: the (role, text) history, the messages per exchange
+# and the context data list. the in-process LRU answers most turns, a shared
+# cache backend keeps sessions across workers and restarts.
+
+
+class SessionState:
+    __slots__ = ("history_list", "history_count", "context_data")
+
+    def __init__(self, history_list: list, history_count: list, context_data: list):
+        self.history_list = history_list
+        self.history_count = history_count
+        self.context_data = context_data
+
+    def to_dict(self) -> dict:
+        return {
+            "history": self.history_list,
+            "history_count": self.history_count,
+            "context_data": self.context_data
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(
+            [tuple(entry) for entry in data.get("history") or []],
+            list(data.get("history_count") or []),
+            data.get("context_data") or []
+        )
+
+
+class SessionStore:
+
+    def __init__(self, maxsize: int, ttl: float, backend: CacheBackend = None):
+        self.ttl = ttl
+        self.entries = LRUCache(maxsize, ttl)
+        # None keeps sessions in this process only
+        self.backend = backend
+
+    @staticmethod
+    def key(alias, user_id, session_id) -> str:
+        # the user comes from the jwt, a session id alone never reads another user's state
+        return f"slxx:{alias}:session:{user_id}:{session_id}"
+
+    def get(self, key) -> SessionState:
+        """
+        State held by this process, no I/O.
+        """
+        return self.entries.get(key)
+
+    def load(self, key) -> SessionState:
+        """
+        State from this process or the backend, None for an unknown or expired session.
+        """
+        logger = logging.getLogger(__name__)
+        state = self.entries.get(key)
+        if state is not None or self.backend is None:
+            return state
+        data = self.backend.get_json(key)
+        if data is None:
+            return None
+        try:
+            state = SessionState.from_dict(data)
+        except (TypeError, ValueError, AttributeError) as e:
+            logger.warning(f"Dropping unreadable session state {key}: {e}")
+            self.backend.delete(key)
+            return None
+        self.entries.set(key, state)
+        return state
+
+    def save(self, key, state: SessionState):
+        self.entries.set(key, state)
+        if self.backend is not None:
+            self.backend.set_json(key, state.to_dict(), self.ttl)
+
+    def delete(self, key):
+        self.entries.delete(key)
+        if self.backend is not None:
+            self.backend.delete(key)
@@ -0,0 +1,154 @@
+import re
+
+from slxx_agent.date_utils import parse_day, display
+
+# markdown tables for request tool results, rendered on the server so the
+# model answers with a short lead-in and a [[table:T1]] placeholder instead
+# of re-typing every row. expand_tables() swaps the placeholders for the
+# tables in the final answer.
+
+TABLE_REF_RE = re.compile(r"`?\[\[table:(T\d+)\]\]`?")
+
+EMPTY_CELL = "-"
+
+
+def table_ref(table_id: str) -> str:
+    return f"[[table:{table_id}]]"
+
+
+def display_date(value) -> str:
+    day = parse_day(value)
+    return display(day) if day else (str(value) if value else EMPTY_CELL)
+
+
+def cell(value) -> str:
+    if value is None or value == "":
+        return EMPTY_CELL
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).replace("|", "/").replace("\n", " ")
+
+
+def markdown_table(headers, rows) -> str:
+    lines = [
+        "| " + " | ".join(headers) + " |",
+        "|" + "|".join("---" for _ in headers) + "|",
+    ]
+    lines.extend("| " + " | ".join(cell(value) for value in row) + " |" for row in rows)
+    return "\n".join(lines)
+
+
+def date_range(start, end) -> str:
+    start_text, end_text = display_date(start), display_date(end)
+    if end_text in (EMPTY_CELL, start_text):
+        return start_text
+    return f"{start_text} - {end_text}"
+
+
+def render_pto_requests(requests: list) -> str:
+    """
+    requests are PTORequest.to_dict() records.
+    """
+    if not requests:
+        return "No PTO requests found."
+    rows = []
+    for index, request in enumerate(requests, 1):
+        dates = date_range(request.get("start"), request.get("end"))
+        if request.get("shift_count") is not None:
+            dates = f"{dates} ({request['shift_count']})"
+        rows.append((
+            index,
+            request.get("employee_name"),
+            dates,
+            request.get("reason"),
+            request.get("status"),
+            request.get("remaining_balance"),
+        ))
+    headers = ("#", "Employee", "Date Range (Count of Shifts)", "Reason", "Status", "Remaining Balance")
+    return markdown_table(headers, rows)
+
+
+def render_pto_request_detail(detail: dict) -> str:
+    """
+    detail is the get_pto_request_details result: metadata and PTORequestDetail.to_dict() days.
+    """
+    days = detail.get("pto_request_details") or []
+    if not days:
+        return "No details found for this PTO request."
+    employee_name = (detail.get("metadata") or {}).get("employee_name")
+    rows = []
+    for day in days:
+        shift = day.get("shift_name")
+        if day.get("shift_start") and day.get("shift_end"):
+            shift = f"{day['shift_start']} - {day['shift_end']}"
+        rows.append((
+            employee_name,
+            display_date(day.get("date")),
+            shift,
+            day.get("unit_name"),
+            day.get("absence_description") or day.get("absence_code"),
+            day.get("accrualBalance") if day.get("isAccruaBalanceAvailable") is not False else None,
+        ))
+    return markdown_table(("Employee", "Date Requested", "Shift", "Unit", "Absence", "Remaining Balance"), rows)
+
+
+def message_employee(message: dict):
+    employee = message.get("employee")
+    if isinstance(employee, dict):
+        return employee.get("name") or employee.get("fullName")
+    return message.get("employeeName") or message.get("senderName")
+
+
+def render_shift_requests(requests: list) -> str:
+    """
+    requests are ShiftRequest.to_dict() records.
+    """
+    if not requests:
+        return "No open shift requests found."
+    rows = []
+    for index, request in enumerate(requests, 1):
+        metadata = request.get("metadata") or {}
+        message = request.get("request messages") or {}
+        rows.append((
+            index,
+            message_employee(message),
+            display_date(metadata.get("request date")),
+            metadata.get("shift_name"),
+            metadata.get("position_name"),
+            metadata.get("unit_name"),
+            message.get("status"),
+        ))
+    return markdown_table(("#", "Employee", "Date", "Shift", "Position", "Unit", "Status"), rows)
+
+
+def expand_tables(text: str, tables: dict) -> str:
+    """
+    Replace [[table:Tn]] placeholders with their rendered tables, each on its own lines.
+    Unknown ids are left as they are.
+    """
+    if not text or not tables:
+        return text
+
+    def replace(match):
+        table = tables.get(match.group(1))
+        if table is None:
+            return match.group(0)
+        return f"\n\n{table}\n\n"
+
+    expanded = TABLE_REF_RE.sub(replace, text)
+    return re.sub(r"\n{3,}", "\n\n", expanded).strip()
+
+
+def expand_message_tables(message, tables: dict):
+    """
+    Copy of a langchain message with its placeholders expanded, the message
+    itself when it has none or its content is not plain text.
+    copy(update=...) works on both the pydantic v1 messages of langchain-core
+    0.2 and later versions, model_copy does not exist on the former.
+    """
+    if not tables or not isinstance(message.content, str):
+        return message
+    content = expand_tables(message.content, tables)
+    if content == message.content:
+        return message
+    return message.copy(update={"content": content})
@@ -0,0 +1,42 @@
+import time
+
+from slxx_agent.api.resilience import DeadlineExceeded
+
+
+# deadline for processing a single chat turn
+# shared by the admission wait, slxx calls, llm calls and the graph loop
+# cancel() is called when the websocket goes away so work stops early
+
+
+class TurnDeadline:
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        self.cancel_reason = None
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def cancel(self, reason: str):
+        if self.cancel_reason is None:
+            self.cancel_reason = reason
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_reason is not None or self.remaining() <= 0
+
+    def check(self):
+        if self.cancel_reason is not None:
+            raise DeadlineExceeded(f"Request cancelled: {self.cancel_reason}.")
+        if self.remaining() <= 0:
+            raise DeadlineExceeded(
+                f"The request did not complete within {self.seconds:.0f} seconds. Please try again.",
+                status_code=504
+            )
+
+    def timeout(self, cap: float) -> float:
+        """
+        Timeout for the next blocking call, capped by the time left in the turn.
+        """
+        self.check()
+        return min(cap, self.remaining())
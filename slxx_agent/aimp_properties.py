@@ -0,0 +1,25 @@
+# optional properties clients may add to the AIMP message, an extension of
+# the vital-aimp protocol owned by this agent (see "AIMP protocol extensions"
+# in the README). the ontology does not define them, so they are read from
+# the message's JSON object as sent, not from the parsed AIMPMessage
+
+EXTENSION_NAMESPACE = "http://vital.ai/ontology/vital-aimp-slxx#"
+
+# turn timeout in seconds, capped by turn.max_timeout_seconds
+TURN_TIMEOUT_PROPERTY = EXTENSION_NAMESPACE + "hasTimeoutSeconds"
+# "server" opts in to server-side session state
+SESSION_STATE_PROPERTY = EXTENSION_NAMESPACE + "hasSessionState"
+# comma separated payload encodings the client accepts, e.g. "gzip"
+ACCEPT_ENCODING_PROPERTY = EXTENSION_NAMESPACE + "hasAcceptEncoding"
+
+
+def message_property(message_json: dict, property_uri: str) -> str:
+    """
+    Value of an extension property as a string, None when the client did not send it.
+    """
+    value = (message_json or {}).get(property_uri)
+    if isinstance(value, dict):
+        value = value.get("value")
+    if value is None:
+        return None
+    return str(value)
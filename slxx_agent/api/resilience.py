@@ -0,0 +1,202 @@
+import email.utils
+import logging
+import random
+import threading
+import time
+
+
+# client-side resilience for slxx backend calls
+# each endpoint gets a token bucket (adaptive: halves its rate on 429, creeps back
+# up on success) and a circuit breaker that fails fast after repeated 5xx/timeouts
+# guards are process wide so that every slxxAPI instance shares the same view
+# of the backend
+
+
+class slxxAPIError(Exception):
+    def __init__(self, message, *, endpoint=None, status_code=None, retry_after=None):
+        super().__init__(message)
+        self.message = message
+        self.endpoint = endpoint
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    def to_tool_error(self) -> dict:
+        """
+        Structured error returned as a tool result so the agent can relay it
+        instead of retrying the tool.
+        """
+        error = {
+            "status": "error",
+            "data": None,
+            "message": self.message,
+            "status_code": self.status_code
+        }
+        if self.retry_after is not None:
+            error["retry_after"] = round(self.retry_after, 1)
+        return error
+
+
+class CircuitOpenError(slxxAPIError):
+    pass
+
+
+class DeadlineExceeded(slxxAPIError):
+    pass
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float, min_rate: float = 0.5):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def throttle(self, retry_after: float = None):
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            if retry_after:
+                # no tokens until the server says we may come back
+                self.tokens = min(self.tokens, 1 - retry_after * self.rate)
+
+    def recover(self):
+        with self.lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        # thread holding the half-open probe, only it may release the probe
+        self.probe_owner = None
+        self.lock = threading.Lock()
+
+    def is_open(self) -> bool:
+        """
+        True while calls are rejected outright, without taking a probe.
+        """
+        with self.lock:
+            return self.state == self.OPEN and time.monotonic() - self.opened_at < self.reset_timeout
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self.probing = False
+            # half open: let a single probe through
+            if self.probing:
+                return False
+            self.probing = True
+            self.probe_owner = threading.get_ident()
+            return True
+
+    def release(self):
+        """
+        End the calling thread's probe for an outcome that says nothing about
+        the backend (throttled, cancelled, a client-side error), so the next
+        call may probe again. Does nothing for a thread that holds no probe.
+        """
+        with self.lock:
+            if self.probing and self.probe_owner == threading.get_ident():
+                self.probing = False
+                self.probe_owner = None
+
+    def retry_after(self) -> float:
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        with self.lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.probing = False
+            self.probe_owner = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logging.getLogger(__name__).warning(f"Circuit opened after {self.failures} failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.probing = False
+                self.probe_owner = None
+
+
+class EndpointGuard:
+    def __init__(self, name, local_config):
+        self.name = name
+        self.bucket = TokenBucket(local_config.slxx_rate_per_second, local_config.slxx_rate_burst)
+        self.breaker = CircuitBreaker(local_config.slxx_breaker_failure_threshold,
+                                      local_config.slxx_breaker_reset_seconds)
+
+
+_guards = {}
+_guards_lock = threading.Lock()
+
+
+def get_endpoint_guard(name, local_config) -> EndpointGuard:
+    guard = _guards.get(name)
+    if guard is None:
+        with _guards_lock:
+            guard = _guards.get(name)
+            if guard is None:
+                guard = EndpointGuard(name, local_config)
+                _guards[name] = guard
+    return guard
+
+
+def parse_retry_after(value) -> float:
+    """
+    Retry-After is either delta-seconds or an HTTP date.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def backoff_delay(attempt, backoff_factor, max_backoff) -> float:
+    # full jitter
+    return random.uniform(0, min(max_backoff, backoff_factor * (2 ** attempt)))
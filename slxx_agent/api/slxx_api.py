@@ -1,9 +1,58 @@
+import functools
+import logging
+import threading
+import time
+from array import array
+
+import ijson
 import requests
 from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from slxx_agent.api.resilience import (
+    slxxAPIError, CircuitOpenError, get_endpoint_guard, parse_retry_after, backoff_delay
+)
 from slxx_agent.config.local_config import LocalConfig
+from slxx_agent.executors import ExecutorSaturated, get_executor
+from slxx_agent.manager.cache_backend import get_cache_backend
+from slxx_agent.manager.lru_cache import LRUCache
 from slxx_agent.websocket_validate import jwt_decode
 
+# statuses worth retrying for idempotent calls
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# one connection pool per worker, sessions stay per client so cookies
+# never cross tenants
+_shared_adapter = None
+_shared_adapter_lock = threading.Lock()
+
+
+def get_shared_adapter(local_config: LocalConfig) -> HTTPAdapter:
+    global _shared_adapter
+    if _shared_adapter is None:
+        with _shared_adapter_lock:
+            if _shared_adapter is None:
+                _shared_adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=local_config.slxx_pool_size,
+                    max_retries=0
+                )
+    return _shared_adapter
+
+
+# app settings carry credentials such as AzureOpenAIKey, so they are cached
+# in process memory only and never written to a shared cache backend
+_app_settings = None
+_app_settings_lock = threading.Lock()
+
+
+def get_app_settings_cache(local_config: LocalConfig) -> LRUCache:
+    global _app_settings
+    if _app_settings is None:
+        with _app_settings_lock:
+            if _app_settings is None:
+                _app_settings = LRUCache(local_config.cache_max_entries, local_config.cache_settings_ttl)
+    return _app_settings
+
+
 class slxxAPI:
     def __init__(self, local_config: LocalConfig, jwt):
         self.local_config = local_config
@@ -24,17 +73,18 @@ class slxxAPI:
         # We'll store the token if needed
         self.token = None
 
+        # TurnDeadline of the chat turn this client serves, set by the message handler
+        self.deadline = None
+
+        # settings and reference reads shared with other workers when the backend allows
+        self.cache = get_cache_backend(local_config)
+
         # Create a session
         self.session = requests.Session()
 
-        # Define retry strategy
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=0.3,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["HEAD", "GET", "OPTIONS", "POST"]
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        # Retries are handled in _request so that only idempotent calls are
+        # retried and every attempt goes through the rate limiter and breaker
+        adapter = get_shared_adapter(local_config)
         self.session.mount("https://", adapter)
         self.session.mount("http://", adapter)
 
@@ -47,60 +97,233 @@ class slxxAPI:
             self.headers['Authorization'] = f"Bearer {self.token}"
         else:
             raise Exception("Failed to authenticate.")
-        
+
+    def _request(self, method, endpoint, url, *, idempotent, **kwargs):
+        """
+        Send a request through the endpoint's rate limiter and circuit breaker.
+        Idempotent calls are retried on connection errors and retryable statuses,
+        honoring Retry-After. Raises slxxAPIError when the backend is unavailable.
+        """
+        logger = logging.getLogger(__name__)
+        config = self.local_config
+        guard = get_endpoint_guard(endpoint, config)
+        attempts = config.slxx_max_retries + 1 if idempotent else 1
+        # reads and writes queue separately, a burst of reads never delays an approval;
+        # idempotent marks the reads, including POSTs that only query
+        executor = get_executor(config, "slxx-read" if idempotent else "slxx-write")
+
+        for attempt in range(attempts):
+            read_timeout = config.slxx_read_timeout
+            max_wait = config.slxx_max_backoff
+            if self.deadline is not None:
+                read_timeout = self.deadline.timeout(read_timeout)
+                max_wait = min(max_wait, self.deadline.remaining())
+
+            if guard.breaker.is_open():
+                raise self._circuit_open_error(endpoint, guard)
+
+            if not guard.bucket.acquire(timeout=max_wait):
+                raise slxxAPIError(
+                    f"Too many requests to the scheduling service ({endpoint}). Please try again shortly.",
+                    endpoint=endpoint,
+                    status_code=429
+                )
+
+            try:
+                # the breaker is consulted only once the call holds a token and a thread,
+                # a half-open probe never waits in a queue it could be dropped from
+                response = executor.run(
+                    functools.partial(
+                        self._send, guard, endpoint, method, url,
+                        timeout=(min(config.slxx_connect_timeout, read_timeout), read_timeout),
+                        **kwargs
+                    ),
+                    queue_timeout=read_timeout
+                )
+            except ExecutorSaturated as e:
+                logger.warning(f"{method} {endpoint} not started: {e}")
+                raise slxxAPIError(
+                    f"Too many requests to the scheduling service ({endpoint}). Please try again shortly.",
+                    endpoint=endpoint,
+                    status_code=429
+                ) from e
+            except (requests.ConnectionError, requests.Timeout) as e:
+                logger.warning(f"{method} {endpoint} attempt {attempt + 1}/{attempts} failed: {e}")
+                if attempt + 1 < attempts:
+                    time.sleep(backoff_delay(attempt, config.slxx_backoff_factor, max_wait))
+                    continue
+                raise slxxAPIError(
+                    f"The scheduling service ({endpoint}) did not respond. Please try again shortly.",
+                    endpoint=endpoint
+                ) from e
+
+            if response.status_code not in RETRY_STATUSES:
+                guard.bucket.recover()
+                return response
+
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if response.status_code == 429:
+                guard.bucket.throttle(retry_after)
+
+            logger.warning(f"{method} {endpoint} attempt {attempt + 1}/{attempts} returned {response.status_code}")
+
+            if not idempotent:
+                # writes are never replayed, the caller reports the status
+                return response
+
+            # a streamed response holds its pooled connection until closed
+            response.close()
+
+            if attempt + 1 < attempts:
+                delay = backoff_delay(attempt, config.slxx_backoff_factor, max_wait)
+                if retry_after is not None:
+                    if retry_after > max_wait:
+                        break
+                    delay = retry_after
+                time.sleep(delay)
+                continue
+
+        raise slxxAPIError(
+            f"The scheduling service ({endpoint}) returned {response.status_code}. Please try again shortly.",
+            endpoint=endpoint,
+            status_code=response.status_code,
+            retry_after=retry_after
+        )
+
+    def _send(self, guard, endpoint, method, url, **kwargs):
+        """
+        One attempt on an executor thread. Takes the breaker's half-open probe
+        when there is one and always gives it back: the outcome is recorded
+        for a response or a connection error, anything else releases it.
+        """
+        if not guard.breaker.allow():
+            raise self._circuit_open_error(endpoint, guard)
+        recorded = False
+        try:
+            response = self.session.request(method, url, headers=self.headers, **kwargs)
+            if response.status_code not in RETRY_STATUSES:
+                guard.breaker.record_success()
+                recorded = True
+            elif response.status_code != 429:
+                guard.breaker.record_failure()
+                recorded = True
+            return response
+        except (requests.ConnectionError, requests.Timeout):
+            guard.breaker.record_failure()
+            recorded = True
+            raise
+        finally:
+            if not recorded:
+                guard.breaker.release()
+
+    @staticmethod
+    def _circuit_open_error(endpoint, guard) -> CircuitOpenError:
+        return CircuitOpenError(
+            f"The scheduling service ({endpoint}) is temporarily unavailable. Please try again shortly.",
+            endpoint=endpoint,
+            status_code=503,
+            retry_after=guard.breaker.retry_after()
+        )
+
     def get_all_app_settings(self) -> dict:
         """
-        Get all app settings
+        Get all app settings, cached per alias in this process for cache.settings_ttl_seconds
         """
-        
+        cache = get_app_settings_cache(self.local_config)
+        cached = cache.get(self.alias)
+        if cached is not None:
+            return cached
+
         self.authenticate()
         base_url = self.local_config.base_endpoint
         url = f"{base_url}/api/v1/app/settings"
-        response = self.session.get(url, headers=self.headers, timeout=10)
+        response = self._request("GET", "app.settings", url, idempotent=True)
         response.raise_for_status()
         settings = response.json()
-        
-        return {
+
+        app_settings = {
             item["key"]: item["value"]
             for item in settings.get("data", [])
             if "key" in item and "value" in item
         }
-    
+        cache.set(self.alias, app_settings)
+        return app_settings
+
     def get_employee_short_info(self, *, employee_id):
         """
         Get a single employee's short info using the new endpoint:
         GET /api/v1/employees/{employeeId}/shortInfo
+        Shared backends keep the response for other workers, the in-process
+        cache lives in slxxManager.
         """
+        cache_key = f"slxx:{self.alias}:employees.shortInfo:{employee_id}"
+        if self.cache.shared:
+            cached = self.cache.get_json(cache_key)
+            if cached is not None:
+                return cached
+
         self.authenticate()
         base_url = self.local_config.base_endpoint
         url = f"{base_url}/api/v1/employees/{employee_id}/shortInfo"
-        response = self.session.get(url, headers=self.headers, timeout=10)
+        response = self._request("GET", "employees.shortInfo", url, idempotent=True)
         if response.status_code == 200:
-            return response.json()
+            short_info = response.json()
+            if self.cache.shared:
+                self.cache.set_json(cache_key, short_info, self.local_config.employee_detail_cache_ttl)
+            return short_info
         else:
             return None
-    
-    def get_all_employee_list(self, *, active_only=True):
+
+    def get_employee_names(self, *, org_level_id=1, active_only=True):
         """
-        Retrieve a list of employees for corporate level
+        Stream the employee lookup for an org level (corporate by default) and keep only id and fullName.
+        The payload is parsed incrementally instead of materializing every employee dict.
+
+        Returns:
+            (array('q') of ids, list of names) in response order
         """
         self.authenticate()
         base_url = self.local_config.base_endpoint
         url = f"{base_url}/api/v1/lookup/employees"
         params = {
-            "orgLevelId": 1,
+            "orgLevelId": org_level_id,
             "isActive": str(active_only).lower()
         }
-        response = self.session.get(url, headers=self.headers, params=params, timeout=10)
-        return response.json()
-    
+        response = self._request("GET", "lookup.employees", url, idempotent=True, params=params, stream=True)
+
+        ids = array('q')
+        names = []
+        emp_id = None
+        emp_name = None
+        try:
+            response.raise_for_status()
+            # let urllib3 undo gzip/deflate before ijson sees the bytes
+            response.raw.decode_content = True
+            for prefix, event, value in ijson.parse(response.raw, buf_size=64 * 1024):
+                if prefix == "data.item.id":
+                    emp_id = value
+                elif prefix == "data.item.fullName":
+                    emp_name = value
+                elif prefix == "data.item" and event == "end_map":
+                    if emp_id is not None:
+                        ids.append(int(emp_id))
+                        names.append(emp_name or "")
+                        if self.deadline is not None and len(ids) % 10000 == 0:
+                            self.deadline.check()
+                    emp_id = None
+                    emp_name = None
+        finally:
+            response.close()
+        return ids, names
+
     def get_shift_requests(self, date_on, org_level_id):
         self.authenticate()
         base_url = self.local_config.base_endpoint
         url = f"{base_url}/api/v1/schedule/{date_on}/orglevel/{org_level_id}/openShift"
-        response = self.session.post(url, headers=self.headers, timeout=10)
+        # POST but read only, safe to retry
+        response = self._request("POST", "schedule.openShift", url, idempotent=True)
         return response.json()
-    
+
     def approve_shift_request(self, date_on, employee_id, shift_id, unit_id, position_id, message_id):
         self.authenticate()
         base_url = self.local_config.base_endpoint
@@ -112,9 +335,9 @@ class slxxAPI:
             "UnitId": unit_id,
             "PositionId": position_id
         }
-        response = self.session.post(url, headers=self.headers, json=payload, timeout=10)
+        response = self._request("POST", "messages.approveShift", url, idempotent=False, json=payload)
         return response
-    
+
     def deny_shift_request(self, date_on, employee_id, shift_id, unit_id, position_id, message_id):
         self.authenticate()
         base_url = self.local_config.base_endpoint
@@ -126,27 +349,79 @@ class slxxAPI:
             "UnitId": unit_id,
             "PositionId": position_id
         }
-        response = self.session.post(url, headers=self.headers, json=payload, timeout=10)
+        response = self._request("POST", "messages.denyShift", url, idempotent=False, json=payload)
         return response
-    
-    def get_pto_requests(self, org_level_id, start_date, end_date):
-        self.authenticate()
-        base_url = self.local_config.base_endpoint
-        url = f"{base_url}/api/v1/schedule/orglevel/{org_level_id}/leaveRequests"
+
+    @staticmethod
+    def _pto_request_params(start_date, end_date, statuses, exclude_statuses, page, page_size):
         params = {
             "startDate": start_date,
             "endDate": end_date
         }
-        response = self.session.get(url, headers=self.headers, params=params, timeout=10)
+        if statuses:
+            params["status"] = ",".join(statuses)
+        if exclude_statuses:
+            params["excludeStatus"] = ",".join(exclude_statuses)
+        if page_size:
+            params["pageNumber"] = page or 1
+            params["pageSize"] = page_size
+        return params
+
+    def get_pto_requests(self, org_level_id, start_date, end_date, *, statuses=None, exclude_statuses=None,
+                         page=None, page_size=None):
+        self.authenticate()
+        base_url = self.local_config.base_endpoint
+        url = f"{base_url}/api/v1/schedule/orglevel/{org_level_id}/leaveRequests"
+        params = self._pto_request_params(start_date, end_date, statuses, exclude_statuses, page, page_size)
+        response = self._request("GET", "schedule.leaveRequests", url, idempotent=True, params=params)
         return response.json()
-    
+
+    def iter_pto_requests(self, org_level_id, start_date, end_date, *, statuses=None, exclude_statuses=None,
+                          page_size=50):
+        """
+        Yield leave requests one page at a time, each page parsed incrementally.
+        Status filters are sent to the server; closing the generator early stops paging.
+
+        A short page ends the iteration. A server that ignores paging returns
+        everything on the first page, which is longer than page_size and ends it too.
+        """
+        self.authenticate()
+        base_url = self.local_config.base_endpoint
+        url = f"{base_url}/api/v1/schedule/orglevel/{org_level_id}/leaveRequests"
+
+        seen = set()
+        page = 1
+        while True:
+            params = self._pto_request_params(start_date, end_date, statuses, exclude_statuses, page, page_size)
+            response = self._request("GET", "schedule.leaveRequests", url, idempotent=True, params=params, stream=True)
+            count = 0
+            fresh = 0
+            try:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                for request in ijson.items(response.raw, "data.requests.item", use_float=True):
+                    count += 1
+                    request_id = request.get("id")
+                    if request_id in seen:
+                        continue
+                    seen.add(request_id)
+                    fresh += 1
+                    yield request
+            finally:
+                response.close()
+            if count != page_size or fresh == 0:
+                return
+            if self.deadline is not None:
+                self.deadline.check()
+            page += 1
+
     def get_pto_request_detail(self, org_level_id, leave_request_id):
         self.authenticate()
         base_url = self.local_config.base_endpoint
         url = f"{base_url}/api/v1/schedule/orglevel/{org_level_id}/leaveRequests/{leave_request_id}/details"
-        response = self.session.get(url, headers=self.headers, timeout=10)
+        response = self._request("GET", "schedule.leaveRequestDetails", url, idempotent=True)
         return response.json()
-    
+
     def approve_pto_request(self, org_level_id, leave_request_id, comment):
         self.authenticate()
         base_url = self.local_config.base_endpoint
@@ -155,9 +430,9 @@ class slxxAPI:
             payload = {}
         else:
             payload = {"comment": comment}
-        response = self.session.post(url, headers=self.headers, json=payload, timeout=10)
+        response = self._request("POST", "schedule.leaveRequestApprove", url, idempotent=False, json=payload)
         return response
-    
+
     def deny_pto_request(self, org_level_id, leave_request_id, comment):
         self.authenticate()
         base_url = self.local_config.base_endpoint
@@ -166,5 +441,5 @@ class slxxAPI:
             payload = {}
         else:
             payload = {"comment": comment}
-        response = self.session.post(url, headers=self.headers, json=payload, timeout=10)
-        return response
\ No newline at end of file
+        response = self._request("POST", "schedule.leaveRequestDeny", url, idempotent=False, json=payload)
+        return response
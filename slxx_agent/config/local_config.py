@@ -12,5 +12,150 @@ class LocalConfig:
             config = yaml.safe_load(file)
             self.base_endpoint = config['slxx']['base_endpoint']
 
+            # optional sections, defaults apply when missing
+            admission = config.get('admission') or {}
 
+            self.max_concurrent_turns = int(admission.get('max_concurrent_turns', 16))
+            self.max_concurrent_turns_per_alias = int(admission.get('max_concurrent_turns_per_alias', 4))
+            self.max_queued_turns = int(admission.get('max_queued_turns', 64))
+            self.max_queued_turns_per_alias = int(admission.get('max_queued_turns_per_alias', 8))
+            self.turn_queue_timeout = float(admission.get('queue_timeout_seconds', 20))
+            self.alias_weights = admission.get('alias_weights') or {}
 
+            resilience = config.get('resilience') or {}
+
+            self.slxx_connect_timeout = float(resilience.get('connect_timeout_seconds', 3.05))
+            self.slxx_read_timeout = float(resilience.get('read_timeout_seconds', 10))
+            self.slxx_max_retries = int(resilience.get('max_retries', 2))
+            self.slxx_backoff_factor = float(resilience.get('backoff_factor', 0.3))
+            self.slxx_max_backoff = float(resilience.get('max_backoff_seconds', 5))
+            self.slxx_rate_per_second = float(resilience.get('rate_per_second', 20))
+            self.slxx_rate_burst = float(resilience.get('rate_burst', 40))
+            self.slxx_breaker_failure_threshold = int(resilience.get('breaker_failure_threshold', 5))
+            self.slxx_breaker_reset_seconds = float(resilience.get('breaker_reset_seconds', 30))
+            self.slxx_pool_size = int(resilience.get('pool_size', 20))
+
+            turn = config.get('turn') or {}
+
+            self.turn_timeout = float(turn.get('timeout_seconds', 90))
+            self.turn_max_timeout = float(turn.get('max_timeout_seconds', 300))
+            self.llm_timeout = float(turn.get('llm_timeout_seconds', 60))
+            self.llm_max_retries = int(turn.get('llm_max_retries', 1))
+            self.turn_recursion_limit = int(turn.get('recursion_limit', 25))
+            # tool calls of one step that run at the same time
+            self.tool_concurrency = int(turn.get('tool_concurrency', 4))
+
+            employee_index = config.get('employee_index') or {}
+
+            self.employee_index_ttl_minutes = float(employee_index.get('ttl_minutes', 60))
+            # empty disables snapshots
+            self.employee_snapshot_dir = employee_index.get('snapshot_dir') or ''
+            # tmpfs folder the workers of one host map their directories from, empty keeps a copy per worker
+            self.employee_shared_memory_dir = employee_index.get('shared_memory_dir') or ''
+            self.employee_shared_check_seconds = float(employee_index.get('shared_check_seconds', 5))
+            self.employee_department_scope = bool(employee_index.get('department_scope', True))
+            # best department match below this falls back to the corporate directory
+            self.employee_scope_min_score = float(employee_index.get('scope_min_score', 85))
+            self.employee_phonetic_search = bool(employee_index.get('phonetic_search', True))
+            self.employee_detail_cache_size = int(employee_index.get('detail_cache_size', 2000))
+            self.employee_detail_cache_ttl = float(employee_index.get('detail_cache_ttl_minutes', 15)) * 60
+            self.employee_detail_concurrency = int(employee_index.get('detail_concurrency', 8))
+
+            pto = config.get('pto') or {}
+
+            self.pto_page_size = int(pto.get('page_size', 50))
+            # requests returned to the model when the tool gives no limit
+            self.pto_default_limit = int(pto.get('default_limit', 25))
+            # requests per result whose details are fetched for shift counts and balances, 0 disables
+            self.pto_summary_max_requests = int(pto.get('summary_max_requests', 25))
+            self.pto_summary_concurrency = int(pto.get('summary_concurrency', 4))
+            self.pto_detail_cache_size = int(pto.get('detail_cache_size', 500))
+            self.pto_detail_cache_ttl = float(pto.get('detail_cache_ttl_minutes', 10)) * 60
+
+            inbox = config.get('inbox') or {}
+
+            self.inbox_enabled = bool(inbox.get('enabled', True))
+            self.inbox_window_days = int(inbox.get('window_days', 14))
+            self.inbox_refresh_seconds = float(inbox.get('refresh_seconds', 60))
+            # older inboxes are not read from, the tools go to the API
+            self.inbox_max_age = float(inbox.get('max_age_seconds', 180))
+            self.inbox_idle_minutes = float(inbox.get('idle_minutes', 30))
+            self.inbox_concurrency = int(inbox.get('concurrency', 4))
+
+            response_cache = config.get('response_cache') or {}
+
+            # answers are invalidated through the alias data version, which only reaches
+            # other workers and pods through a shared cache.backend; with the memory
+            # backend the cache is off when WEB_CONCURRENCY starts several workers
+            self.response_cache_enabled = bool(response_cache.get('enabled', True))
+            self.response_cache_size = int(response_cache.get('max_entries', 500))
+            self.response_cache_ttl = float(response_cache.get('ttl_seconds', 120))
+
+            cache = config.get('cache') or {}
+
+            # memory, shared_memory (workers of one host) or redis (all pods)
+            self.cache_backend = str(cache.get('backend', 'memory')).lower()
+            self.cache_redis_url = cache.get('redis_url') or 'redis://localhost:6379/0'
+            self.cache_redis_timeout = float(cache.get('redis_timeout_seconds', 0.5))
+            self.cache_shared_memory_dir = cache.get('shared_memory_dir') or '/dev/shm/slxx_agent'
+            self.cache_max_entries = int(cache.get('max_entries', 5000))
+            self.cache_settings_ttl = float(cache.get('settings_ttl_seconds', 300))
+
+            session_store = config.get('session_store') or {}
+
+            # used only for clients that ask for it on the message
+            self.session_store_enabled = bool(session_store.get('enabled', True))
+            self.session_store_size = int(session_store.get('max_entries', 2000))
+            self.session_store_ttl = float(session_store.get('ttl_minutes', 60)) * 60
+            # also keep sessions in cache.backend when it is shared, so any worker can continue them
+            self.session_store_persistent = bool(session_store.get('persistent', True))
+
+            transport = config.get('transport') or {}
+
+            # context data without indentation, any json client reads it
+            self.transport_compact_json = bool(transport.get('compact_json', True))
+            # gzip or none, offered to clients that list it in hasAcceptEncoding, see aimp_properties
+            self.transport_compression = str(transport.get('compression', 'gzip')).lower()
+            self.transport_compress_level = int(transport.get('compress_level', 6))
+            self.transport_compress_min_bytes = int(transport.get('compress_min_bytes', 1024))
+
+            dates = config.get('dates') or {}
+
+            # date phrases of the user message are resolved in code and listed in the system prompt
+            self.resolve_dates_in_prompt = bool(dates.get('resolve_in_prompt', True))
+
+            rendering = config.get('rendering') or {}
+
+            # request tools render their tables, the model answers with a placeholder for each
+            self.render_tables = bool(rendering.get('tables', True))
+
+            cpu_offload = config.get('cpu_offload') or {}
+
+            self.cpu_offload_enabled = bool(cpu_offload.get('enabled', True))
+            self.cpu_offload_processes = int(cpu_offload.get('processes', 2))
+            self.cpu_offload_start_method = str(cpu_offload.get('start_method', 'forkserver')).lower()
+            # payloads (characters) and employee lists (names) below these sizes are handled inline
+            self.cpu_offload_min_bytes = int(cpu_offload.get('min_bytes', 262144))
+            self.cpu_offload_min_names = int(cpu_offload.get('min_names', 20000))
+
+            executors = config.get('executors') or {}
+
+            # threads per class of blocking work, see slxx_agent/executors.py
+            self.executor_sizes = {
+                'slxx-read': int(executors.get('slxx_read_threads', 16)),
+                'slxx-write': int(executors.get('slxx_write_threads', 4)),
+                # every admitted turn runs its graph on an llm thread, fewer
+                # threads would queue turns admission already let through
+                'llm': max(int(executors.get('llm_threads', self.max_concurrent_turns)), self.max_concurrent_turns),
+                # one thread per offload process is enough to keep the pool busy
+                'cpu': int(executors.get('cpu_threads', self.cpu_offload_processes)),
+                'session': int(executors.get('session_threads', 4)),
+            }
+            # 0 disables the periodic queue depth and wait time log
+            self.executor_stats_log_seconds = float(executors.get('stats_log_seconds', 60))
+
+            startup = config.get('startup') or {}
+
+            # lazy: serve right away and prewarm in the background, eager: prewarm before serving
+            self.startup_mode = str(startup.get('mode', 'lazy')).lower()
+            self.prewarm_delay = float(startup.get('prewarm_delay_seconds', 1))
@@ -0,0 +1,118 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from slxx_agent.config.local_config import LocalConfig
+from slxx_agent.executors import get_executor
+
+# process pool for cpu-bound work that would otherwise hold the GIL on the
+# event loop thread: history container (de)serialization, context json and
+# MinHash signatures of large employee lists.
+#
+# work below its size threshold runs inline, the pool only pays off once
+# pickling the arguments is cheaper than the work itself. arguments are
+# plain python data pickled once on submit, functions must be importable
+# module-level functions.
+
+# imported by the fork server once, every pool worker starts with them loaded
+WORKER_MODULES = [
+    "slxx_agent.agent.chat_container",
+    "slxx_agent.manager.employee_directory",
+]
+
+_cpu_pool = None
+_cpu_pool_lock = threading.Lock()
+
+
+def _init_worker():
+    from vital_ai_vitalsigns.vitalsigns import VitalSigns
+    logging.basicConfig(
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        level=logging.INFO
+    )
+    VitalSigns()
+
+
+def get_cpu_pool(local_config: LocalConfig) -> ProcessPoolExecutor:
+    """
+    Process-wide pool, None when cpu_offload is disabled.
+    """
+    global _cpu_pool
+    if not local_config.cpu_offload_enabled or local_config.cpu_offload_processes < 1:
+        return None
+    if _cpu_pool is None:
+        with _cpu_pool_lock:
+            if _cpu_pool is None:
+                _cpu_pool = create_cpu_pool(local_config)
+    return _cpu_pool
+
+
+def create_cpu_pool(local_config: LocalConfig) -> ProcessPoolExecutor:
+    logger = logging.getLogger(__name__)
+    method = local_config.cpu_offload_start_method
+    if method not in multiprocessing.get_all_start_methods():
+        method = "spawn"
+    context = multiprocessing.get_context(method)
+    if method == "forkserver":
+        # workers fork from a clean server process, not from the threaded app
+        context.set_forkserver_preload(WORKER_MODULES)
+    logger.info(f"Starting cpu offload pool with {local_config.cpu_offload_processes} {method} processes")
+    return ProcessPoolExecutor(
+        max_workers=local_config.cpu_offload_processes,
+        mp_context=context,
+        initializer=_init_worker
+    )
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    global _cpu_pool
+    with _cpu_pool_lock:
+        if _cpu_pool is pool:
+            _cpu_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def offload_pool(local_config: LocalConfig, size: int, threshold: int = None) -> ProcessPoolExecutor:
+    """
+    Pool to run work of the given size on, None when it should run inline.
+    """
+    if threshold is None:
+        threshold = local_config.cpu_offload_min_bytes
+    if size < threshold:
+        return None
+    return get_cpu_pool(local_config)
+
+
+def _run_in_pool(pool: ProcessPoolExecutor, fn, args):
+    logger = logging.getLogger(__name__)
+    try:
+        return pool.submit(fn, *args).result()
+    except BrokenProcessPool as e:
+        logger.warning(f"CPU offload pool broke running {fn.__name__}, running inline: {e}")
+        _discard_pool(pool)
+        return fn(*args)
+
+
+def run_cpu(local_config: LocalConfig, fn, *args, size: int = 0, threshold: int = None):
+    """
+    fn(*args) in the pool when size reaches threshold, otherwise in the
+    calling thread. For callers off the event loop, e.g. index builds.
+    """
+    pool = offload_pool(local_config, size, threshold)
+    if pool is None:
+        return fn(*args)
+    # the cpu executor bounds and meters hand-offs, its thread waits on the process
+    return get_executor(local_config, "cpu").run(_run_in_pool, pool, fn, args)
+
+
+async def run_cpu_async(local_config: LocalConfig, fn, *args, size: int = 0, threshold: int = None):
+    """
+    Awaitable run_cpu for the event loop: large work goes to the pool, small
+    work runs inline since handing it over costs more than doing it.
+    """
+    pool = offload_pool(local_config, size, threshold)
+    if pool is None:
+        return fn(*args)
+    return await get_executor(local_config, "cpu").run_async(_run_in_pool, pool, fn, args)
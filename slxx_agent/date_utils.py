@@ -0,0 +1,29 @@
+from datetime import date, datetime
+
+# date parsing and display shared by the manager and agent layers
+# slxx sends and accepts MM-DD-YYYY, some payloads carry ISO dates or datetimes
+
+_DAY_FORMATS = ("%m-%d-%Y", "%Y-%m-%d", "%m/%d/%Y")
+
+
+def parse_day(value) -> date:
+    """
+    Date of an MM-DD-YYYY, YYYY-MM-DD or ISO datetime string, None when unknown.
+    """
+    if isinstance(value, date):
+        return value
+    if not value:
+        return None
+    for fmt in _DAY_FORMATS:
+        try:
+            return datetime.strptime(value[:10], fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def display(day: date) -> str:
+    """
+    MM-DD-YYYY, the format dates are shown to the user in.
+    """
+    return day.strftime('%m-%d-%Y')
@@ -0,0 +1,192 @@
+import asyncio
+import functools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from slxx_agent.config.local_config import LocalConfig
+
+# named thread pools, one per class of blocking work, each sized from
+# LocalConfig.executor_sizes:
+#
+#   slxx-read   idempotent (read-only) calls to the slxx API
+#   slxx-write  approve/deny and other non-idempotent slxx calls
+#   llm         the agent graph of a turn, which blocks on the llm
+#   cpu         hand-off to the cpu offload process pool
+#   session     session store and data version reads and writes to a shared cache backend
+#
+# every executor counts queue depth, running tasks and how long tasks waited
+# for a thread, so saturation shows up per class instead of in one shared pool
+
+EXECUTOR_NAMES = ("slxx-read", "slxx-write", "llm", "cpu", "session")
+
+# waits kept for percentiles
+RECENT_WAITS = 512
+
+_current = threading.local()
+
+
+class ExecutorSaturated(Exception):
+    def __init__(self, name, waited):
+        super().__init__(f"{name} executor queue wait exceeded {waited:.2f}s")
+        self.name = name
+
+
+class NamedExecutor:
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.submitted = 0
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.run_total = 0.0
+        self.recent_waits = deque(maxlen=RECENT_WAITS)
+
+    def submit(self, fn, *args, **kwargs):
+        submitted_at = time.monotonic()
+        with self.lock:
+            self.queued += 1
+            self.submitted += 1
+        future = self.pool.submit(self._run, submitted_at, fn, args, kwargs)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future):
+        if future.cancelled():
+            # dropped before a thread picked it up
+            with self.lock:
+                self.queued -= 1
+                self.cancelled += 1
+
+    def _run(self, submitted_at, fn, args, kwargs):
+        started_at = time.monotonic()
+        wait = started_at - submitted_at
+        with self.lock:
+            self.queued -= 1
+            self.active += 1
+            self.started += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self.recent_waits.append(wait)
+        _current.executor = self
+        failed = False
+        try:
+            return fn(*args, **kwargs)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            _current.executor = None
+            with self.lock:
+                self.active -= 1
+                self.completed += 1
+                self.failed += failed
+                self.run_total += time.monotonic() - started_at
+
+    def on_worker_thread(self) -> bool:
+        return getattr(_current, "executor", None) is self
+
+    def run(self, fn, *args, queue_timeout: float = None):
+        """
+        fn(*args) on this executor, blocking the caller until it returns.
+        Runs inline when called from one of the executor's own threads, so
+        nested calls cannot deadlock a saturated pool. Raises
+        ExecutorSaturated when the task did not start within queue_timeout.
+        """
+        if self.on_worker_thread():
+            return fn(*args)
+        future = self.submit(fn, *args)
+        try:
+            return future.result(timeout=queue_timeout)
+        except FutureTimeoutError:
+            if future.cancel():
+                with self.lock:
+                    self.rejected += 1
+                raise ExecutorSaturated(self.name, queue_timeout)
+            # started in time, the task's own timeouts bound it from here
+            return future.result()
+
+    async def run_async(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await asyncio.wrap_future(self.submit(fn, *args), loop=loop)
+
+    def stats(self) -> dict:
+        with self.lock:
+            waits = sorted(self.recent_waits)
+            completed = self.completed
+            return {
+                "max_workers": self.max_workers,
+                "queued": self.queued,
+                "active": self.active,
+                "submitted": self.submitted,
+                "completed": completed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "rejected": self.rejected,
+                "wait_avg_ms": round(1000 * self.wait_total / max(1, self.started), 1),
+                "wait_p95_ms": round(1000 * waits[int(0.95 * (len(waits) - 1))], 1) if waits else 0.0,
+                "wait_max_ms": round(1000 * self.wait_max, 1),
+                "run_avg_ms": round(1000 * self.run_total / max(1, completed), 1),
+            }
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+_stats_logger = None
+
+
+def get_executor(local_config: LocalConfig, name: str) -> NamedExecutor:
+    executor = _executors.get(name)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(name)
+            if executor is None:
+                executor = NamedExecutor(name, local_config.executor_sizes[name])
+                _executors[name] = executor
+    return executor
+
+
+async def run_in(local_config: LocalConfig, name: str, fn, *args, **kwargs):
+    """
+    Await fn on the named executor, the loop-side replacement for run_in_executor(None, ...).
+    """
+    if kwargs:
+        fn = functools.partial(fn, **kwargs)
+    return await get_executor(local_config, name).run_async(fn, *args)
+
+
+def executor_stats() -> dict:
+    return {name: executor.stats() for name, executor in sorted(_executors.items())}
+
+
+def start_stats_logger(local_config: LocalConfig):
+    """
+    Log executor_stats every executors.stats_log_seconds, 0 disables.
+    """
+    global _stats_logger
+    if _stats_logger is not None or local_config.executor_stats_log_seconds <= 0:
+        return
+
+    def run():
+        logger = logging.getLogger(__name__)
+        while True:
+            time.sleep(local_config.executor_stats_log_seconds)
+            for name, stats in executor_stats().items():
+                logger.info(f"Executor {name}: {stats}")
+
+    with _executors_lock:
+        if _stats_logger is None:
+            _stats_logger = threading.Thread(target=run, name="executor-stats", daemon=True)
+            _stats_logger.start()
@@ -0,0 +1,335 @@
+import hashlib
+import json
+import logging
+import os
+import socket
+import struct
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+try:
+    import fcntl
+except ImportError:
+    # no cross-process lock, counters stay per process
+    fcntl = None
+
+from slxx_agent.config.local_config import LocalConfig
+from slxx_agent.manager.lru_cache import LRUCache
+
+# cache tier shared by the agent's caches (app settings, employee shortInfo,
+# employee directory snapshots). memory keeps entries in this process,
+# shared_memory shares them between the workers of one host through tmpfs
+# files, redis shares them between pods. values are bytes, a failing backend
+# reads as a miss so the caller falls back to the slxx API
+#
+# counters (the alias data versions) never expire and are changed atomically,
+# counter() and incr() return None when the backend cannot be reached so the
+# caller can tell "unchanged" from "unknown"
+
+
+class CacheBackend:
+    # whether other processes see what this one stores
+    shared = False
+
+    def get(self, key: str) -> bytes:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: float):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def counter(self, key: str) -> int:
+        """
+        Current value of a counter, 0 when it was never incremented.
+        """
+        raise NotImplementedError
+
+    def incr(self, key: str) -> int:
+        """
+        Increment a counter and return its new value.
+        """
+        raise NotImplementedError
+
+    def get_json(self, key: str):
+        value = self.get(key)
+        if value is None:
+            return None
+        try:
+            return json.loads(value)
+        except ValueError:
+            return None
+
+    def set_json(self, key: str, value, ttl: float):
+        self.set(key, json.dumps(value).encode(), ttl)
+
+
+class MemoryBackend(CacheBackend):
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.entries = LRUCache(maxsize, ttl)
+        # counters are not cache entries, eviction would reset them
+        self.counters = {}
+        self.counters_lock = threading.Lock()
+
+    def get(self, key: str) -> bytes:
+        return self.entries.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self.entries.set(key, value, ttl)
+
+    def delete(self, key: str):
+        self.entries.delete(key)
+
+    def counter(self, key: str) -> int:
+        return self.counters.get(key, 0)
+
+    def incr(self, key: str) -> int:
+        with self.counters_lock:
+            value = self.counters[key] = self.counters.get(key, 0) + 1
+        return value
+
+
+class SharedMemoryBackend(CacheBackend):
+    """
+    One tmpfs file per key: an 8 byte expiry timestamp then the value.
+    Writers replace files atomically, so readers in other workers never see
+    a partial value. Counters are 8 byte files in counters/, read and
+    written in place under flock.
+    """
+    shared = True
+
+    SWEEP_EVERY = 256
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        self.counter_directory = os.path.join(directory, "counters")
+        os.makedirs(self.counter_directory, mode=0o700, exist_ok=True)
+        self.writes = 0
+        # fallback without fcntl
+        self.counters_lock = threading.Lock()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest())
+
+    def get(self, key: str) -> bytes:
+        try:
+            with open(self.path(key), "rb") as file:
+                data = file.read()
+        except OSError:
+            return None
+        if len(data) < 8 or struct.unpack_from("<d", data)[0] <= time.time():
+            return None
+        return data[8:]
+
+    def set(self, key: str, value: bytes, ttl: float):
+        logger = logging.getLogger(__name__)
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as file:
+                file.write(struct.pack("<d", time.time() + ttl))
+                file.write(value)
+            os.replace(tmp_path, self.path(key))
+        except OSError as e:
+            logger.warning(f"Shared memory cache write failed: {e}")
+            return
+        self.writes += 1
+        if self.writes % self.SWEEP_EVERY == 0:
+            self.sweep()
+
+    def delete(self, key: str):
+        try:
+            os.remove(self.path(key))
+        except OSError:
+            pass
+
+    def counter_path(self, key: str) -> str:
+        return os.path.join(self.counter_directory, hashlib.sha1(key.encode()).hexdigest())
+
+    def _update_counter(self, key: str, step: int) -> int:
+        logger = logging.getLogger(__name__)
+        try:
+            fd = os.open(self.counter_path(key), os.O_RDWR | os.O_CREAT, 0o600)
+        except OSError as e:
+            logger.warning(f"Shared memory counter {key} unavailable: {e}")
+            return None
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX if step else fcntl.LOCK_SH)
+            with self.counters_lock:
+                data = os.pread(fd, 8, 0)
+                value = struct.unpack("<Q", data)[0] if len(data) == 8 else 0
+                if step:
+                    value += step
+                    os.pwrite(fd, struct.pack("<Q", value), 0)
+            return value
+        except OSError as e:
+            logger.warning(f"Shared memory counter {key} failed: {e}")
+            return None
+        finally:
+            # closing the descriptor drops the flock
+            os.close(fd)
+
+    def counter(self, key: str) -> int:
+        return self._update_counter(key, 0)
+
+    def incr(self, key: str) -> int:
+        return self._update_counter(key, 1)
+
+    def sweep(self):
+        now = time.time()
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, "rb") as file:
+                    header = file.read(8)
+                if len(header) < 8 or struct.unpack("<d", header)[0] <= now:
+                    os.remove(path)
+            except OSError:
+                continue
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisBackend(CacheBackend):
+    """
+    Minimal RESP client for GET, SET PX and DEL, one connection per thread.
+    After a connection error the backend reads as empty for retry_seconds
+    instead of paying a connect timeout on every call.
+    """
+    shared = True
+
+    def __init__(self, url: str, timeout: float = 0.5, retry_seconds: float = 5.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self.retry_seconds = retry_seconds
+        self.down_until = 0.0
+        self.local = threading.local()
+
+    def connection(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            conn = (sock, sock.makefile("rb"))
+            self.local.conn = conn
+            if self.password:
+                self.command(b"AUTH", self.password)
+            if self.db:
+                self.command(b"SELECT", self.db)
+        return conn
+
+    def close(self):
+        conn = getattr(self.local, "conn", None)
+        self.local.conn = None
+        if conn is not None:
+            try:
+                conn[1].close()
+                conn[0].close()
+            except OSError:
+                pass
+
+    def command(self, *args):
+        sock, reader = self.connection()
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        sock.sendall(b"".join(parts))
+        return self.read_reply(reader)
+
+    def read_reply(self, reader):
+        line = reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("connection closed by redis")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest
+        if kind == b"-":
+            raise RedisError(rest.decode(errors="replace"))
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            if len(data) != length + 2:
+                raise ConnectionError("connection closed by redis")
+            return data[:-2]
+        if kind == b"*":
+            length = int(rest)
+            if length < 0:
+                return None
+            return [self.read_reply(reader) for _ in range(length)]
+        raise RedisError(f"unexpected reply {line[:20]!r}")
+
+    def call(self, *args):
+        logger = logging.getLogger(__name__)
+        if time.monotonic() < self.down_until:
+            return None
+        try:
+            return self.command(*args)
+        except (OSError, ConnectionError, RedisError) as e:
+            logger.warning(f"Redis cache {args[0].decode()} failed: {e}")
+            self.close()
+            if not isinstance(e, RedisError):
+                self.down_until = time.monotonic() + self.retry_seconds
+            return None
+
+    def get(self, key: str) -> bytes:
+        return self.call(b"GET", key)
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self.call(b"SET", key, value, b"PX", max(1, int(ttl * 1000)))
+
+    def delete(self, key: str):
+        self.call(b"DEL", key)
+
+    def counter(self, key: str) -> int:
+        # INCRBY 0 reads a missing key as 0, a plain GET could not tell it from a failure
+        return self.call(b"INCRBY", key, 0)
+
+    def incr(self, key: str) -> int:
+        return self.call(b"INCR", key)
+
+
+_cache_backend = None
+_cache_backend_lock = threading.Lock()
+
+
+def get_cache_backend(local_config: LocalConfig) -> CacheBackend:
+    """
+    Process-wide backend selected by cache.backend.
+    """
+    global _cache_backend
+    if _cache_backend is None:
+        with _cache_backend_lock:
+            if _cache_backend is None:
+                _cache_backend = create_cache_backend(local_config)
+    return _cache_backend
+
+
+def create_cache_backend(local_config: LocalConfig) -> CacheBackend:
+    logger = logging.getLogger(__name__)
+    backend = local_config.cache_backend
+    if backend == "redis":
+        redis = RedisBackend(local_config.cache_redis_url, timeout=local_config.cache_redis_timeout)
+        logger.info(f"Using redis cache backend at {redis.host}:{redis.port}")
+        return redis
+    if backend == "shared_memory":
+        try:
+            return SharedMemoryBackend(local_config.cache_shared_memory_dir)
+        except OSError as e:
+            logger.warning(f"Shared memory cache unavailable, using memory: {e}")
+    return MemoryBackend(local_config.cache_max_entries, local_config.cache_settings_ttl)
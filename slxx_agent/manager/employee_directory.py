@@ -0,0 +1,298 @@
+import sys
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from slxx_agent.manager.name_matching import name_tokens, token_keys
+
+NUM_PERM = 64
+LSH_THRESHOLD = 0.1
+NGRAM = 3
+
+
+@lru_cache(maxsize=None)
+def lsh_layout() -> tuple:
+    """
+    (bands, rows) datasketch picks for the threshold, used for the candidate stage.
+    datasketch pulls in scipy, so it is imported on first use rather than at startup.
+    """
+    from datasketch import MinHashLSH
+    params = MinHashLSH(threshold=LSH_THRESHOLD, num_perm=NUM_PERM)
+    return params.b, params.r
+
+
+def name_trigrams(lower_name: str) -> list:
+    return [lower_name[i:i + NGRAM].encode("utf8") for i in range(len(lower_name) - NGRAM + 1)]
+
+
+def minhash_signatures(lower_names) -> np.ndarray:
+    """
+    Trigram MinHash signatures, one row per name.
+    Same values as MinHash(num_perm=64) updated with each lowercased trigram,
+    but the permutations are set up once for the whole batch.
+    """
+    from datasketch import MinHash
+    minhashes = MinHash.generator((name_trigrams(n) for n in lower_names), num_perm=NUM_PERM)
+    signatures = np.array([m.hashvalues for m in minhashes], dtype=np.uint64).reshape(-1, NUM_PERM)
+    # hash values are 32 bit, halve the footprint
+    if not signatures.size or signatures.max() <= 0xFFFFFFFF:
+        signatures = signatures.astype(np.uint32)
+    return signatures
+
+
+class PackedNames:
+    """
+    Read-only name table over a utf8 blob and an offsets array, as stored in
+    snapshots. Names are decoded on access.
+    """
+
+    __slots__ = ("blob", "offsets")
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    @staticmethod
+    def pack(names):
+        encoded = [n.encode("utf8") for n in names]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return blob, offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row):
+        return bytes(self.blob[self.offsets[row]:self.offsets[row + 1]]).decode("utf8")
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self[row]
+
+    def nbytes(self) -> int:
+        return self.blob.nbytes + self.offsets.nbytes
+
+
+class EmployeeDirectory:
+    """
+    Compact name directory for one alias.
+
+    Rows are parallel: ids (int64), names (interned str) and MinHash signatures
+    (uint32 matrix). Exact id lookups go through a sorted copy of the ids, and
+    the LSH candidate stage is a vectorized band match over the signature matrix.
+    """
+
+    __slots__ = ("ids", "names", "lower_names", "signatures", "sorted_ids", "sorted_rows", "built_at",
+                 "phonetic_index")
+
+    def __init__(self, ids, names, signatures, lower_names=None, built_at=None,
+                 sorted_rows=None, sorted_ids=None):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.names = names
+        self.lower_names = lower_names
+        self.signatures = signatures
+        if sorted_rows is None:
+            sorted_rows = np.argsort(self.ids, kind="stable")
+        self.sorted_rows = sorted_rows
+        self.sorted_ids = sorted_ids if sorted_ids is not None else self.ids[sorted_rows]
+        self.built_at = built_at if built_at is not None else time.time()
+        # (keys, rows) sorted by key, built on first phonetic query
+        self.phonetic_index = None
+
+    @classmethod
+    def build(cls, ids, names, precompute_lower=False, signatures=None):
+        """
+        signatures, when given, are minhash_signatures() of the lowercased names.
+        """
+        names = [sys.intern(n or "") for n in names]
+        lower_names = [n.lower() for n in names]
+        if signatures is None:
+            signatures = minhash_signatures(lower_names)
+        return cls(ids, names, signatures, lower_names=lower_names if precompute_lower else None)
+
+    def __len__(self):
+        return len(self.names)
+
+    def lower_name(self, row) -> str:
+        if self.lower_names is not None:
+            return self.lower_names[row]
+        return self.names[row].lower()
+
+    def row_for(self, emp_id) -> int:
+        pos = np.searchsorted(self.sorted_ids, emp_id)
+        if pos < len(self.sorted_ids) and self.sorted_ids[pos] == emp_id:
+            return int(self.sorted_rows[pos])
+        return -1
+
+    def rows_for_ids(self, ids) -> np.ndarray:
+        """
+        Rows of the given ids, ids not in the directory are skipped.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        if not len(self) or not len(ids):
+            return np.empty(0, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.sorted_ids, ids), len(self) - 1)
+        found = self.sorted_ids[pos] == ids
+        return np.asarray(self.sorted_rows[pos[found]], dtype=np.int64)
+
+    def name_for(self, emp_id) -> str:
+        row = self.row_for(emp_id)
+        return self.names[row] if row >= 0 else None
+
+    def sync(self, ids, names):
+        """
+        Directory for a fresh (ids, names) list that reuses rows whose id and
+        name are unchanged. Only inserted and renamed employees get new
+        signatures, removed ones are dropped. self is left untouched so
+        readers holding it are not affected.
+
+        Returns:
+            (EmployeeDirectory, {"inserted": n, "removed": n, "renamed": n})
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        count = len(self)
+
+        if count:
+            pos = np.minimum(np.searchsorted(self.sorted_ids, ids), count - 1)
+            found = self.sorted_ids[pos] == ids
+            rows = np.where(found, self.sorted_rows[pos], 0)
+        else:
+            found = np.zeros(len(ids), dtype=bool)
+            rows = np.zeros(len(ids), dtype=np.int64)
+
+        new_names = []
+        changed = []
+        renamed = 0
+        for i, (is_found, row, name) in enumerate(zip(found.tolist(), rows.tolist(), names)):
+            name = name or ""
+            if is_found:
+                old_name = self.names[row]
+                if old_name == name:
+                    new_names.append(old_name)
+                    continue
+                renamed += 1
+            new_names.append(sys.intern(name))
+            changed.append(i)
+
+        changes = {
+            "inserted": int(len(ids) - found.sum()),
+            "removed": int(count - found.sum()),
+            "renamed": renamed
+        }
+
+        if not changed and changes["removed"] == 0 and len(ids) == count:
+            return EmployeeDirectory(self.ids, self.names, self.signatures, lower_names=self.lower_names,
+                                     sorted_rows=self.sorted_rows, sorted_ids=self.sorted_ids), changes
+
+        if count:
+            signatures = self.signatures[rows]
+        else:
+            signatures = np.empty((len(ids), NUM_PERM), dtype=np.uint32)
+        if changed:
+            fresh = minhash_signatures([new_names[i].lower() for i in changed])
+            if fresh.dtype != signatures.dtype:
+                signatures = signatures.astype(np.result_type(fresh.dtype, signatures.dtype))
+            signatures[changed] = fresh
+
+        lower_names = [n.lower() for n in new_names] if self.lower_names is not None else None
+        return EmployeeDirectory(ids, new_names, signatures, lower_names=lower_names), changes
+
+    def candidates(self, query: str, rows: np.ndarray = None) -> np.ndarray:
+        """
+        Rows sharing at least one LSH band with the query, same semantics as
+        MinHashLSH(threshold=0.1, num_perm=64).query.
+        When rows is given only those rows are considered.
+        """
+        count = len(self) if rows is None else len(rows)
+        if not count:
+            return np.empty(0, dtype=np.intp)
+        query_sig = minhash_signatures([query.lower()])[0]
+        bands, band_rows = lsh_layout()
+        width = bands * band_rows
+        signatures = self.signatures if rows is None else self.signatures[rows]
+        equal = signatures[:, :width] == query_sig[:width]
+        hits = equal.reshape(count, bands, band_rows).all(axis=2).any(axis=1)
+        if rows is None:
+            return np.flatnonzero(hits)
+        return rows[hits]
+
+    def get_phonetic_index(self):
+        if self.phonetic_index is None:
+            keys = []
+            rows = []
+            for row, name in enumerate(self.names):
+                for key in {k for token in name_tokens(name) for k in token_keys(token)}:
+                    keys.append(key)
+                    rows.append(row)
+            keys = np.asarray(keys, dtype=np.int32)
+            rows = np.asarray(rows, dtype=np.int32)
+            order = np.argsort(keys, kind="stable")
+            self.phonetic_index = (keys[order], rows[order])
+        return self.phonetic_index
+
+    def phonetic_candidates(self, query: str, rows: np.ndarray = None) -> np.ndarray:
+        """
+        Rows where every query token matches a name token by soundex, directly
+        or through a nickname ("Jon Smyth" -> "John Smith", "Bill" -> "William").
+        When rows is given only those rows are considered.
+        """
+        tokens = name_tokens(query)
+        if not tokens or not len(self):
+            return np.empty(0, dtype=np.int64)
+
+        keys, key_rows = self.get_phonetic_index()
+        matched = None
+        for token in tokens:
+            token_rows = [
+                key_rows[np.searchsorted(keys, key, "left"):np.searchsorted(keys, key, "right")]
+                for key in token_keys(token)
+            ]
+            token_rows = np.unique(np.concatenate(token_rows))
+            matched = token_rows if matched is None else np.intersect1d(matched, token_rows, assume_unique=True)
+            if not len(matched):
+                break
+
+        matched = matched.astype(np.int64)
+        if rows is not None:
+            matched = np.intersect1d(matched, rows)
+        return matched
+
+    def nbytes(self) -> int:
+        size = self.ids.nbytes + self.signatures.nbytes + self.sorted_ids.nbytes + self.sorted_rows.nbytes
+        if isinstance(self.names, PackedNames):
+            size += self.names.nbytes()
+        else:
+            size += sum(sys.getsizeof(n) for n in self.names)
+        if self.lower_names is not None:
+            size += sum(sys.getsizeof(n) for n in self.lower_names)
+        if self.phonetic_index is not None:
+            size += self.phonetic_index[0].nbytes + self.phonetic_index[1].nbytes
+        return size
+
+
+class EmployeeScope:
+    """
+    Subset of an alias directory, e.g. the employees of one department.
+    Holds only ids; the matching rows are resolved against whichever
+    directory is current, so scopes share the corporate directory's
+    names and signatures.
+    """
+
+    __slots__ = ("ids", "built_at", "_directory", "_rows")
+
+    def __init__(self, ids, built_at=None):
+        self.ids = np.unique(np.asarray(ids, dtype=np.int64))
+        self.built_at = built_at if built_at is not None else time.time()
+        self._directory = None
+        self._rows = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def rows(self, directory: EmployeeDirectory) -> np.ndarray:
+        if self._directory is not directory:
+            self._rows = directory.rows_for_ids(self.ids)
+            self._directory = directory
+        return self._rows
@@ -0,0 +1,157 @@
+import json
+import logging
+import os
+import re
+import struct
+import tempfile
+
+import numpy as np
+
+from slxx_agent.manager.employee_directory import (
+    EmployeeDirectory, PackedNames, NUM_PERM, lsh_layout
+)
+
+# on-disk snapshot of an EmployeeDirectory
+#
+#   MAGIC | uint32 header length | json header | arrays (each 64 byte aligned)
+#
+# the header carries the format version, alias, build timestamp and the
+# offset/dtype/shape of every array so they can be memory-mapped on load
+
+MAGIC = b"SLXXEMP\x00"
+SNAPSHOT_VERSION = 1
+ALIGN = 64
+
+
+def snapshot_path(snapshot_dir, alias) -> str:
+    safe_alias = re.sub(r"[^A-Za-z0-9_.-]", "_", alias)
+    return os.path.join(snapshot_dir, f"{safe_alias}.emp")
+
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def save_snapshot(directory: EmployeeDirectory, path, alias):
+    """
+    Write the directory atomically: a temp file in the same folder is renamed over path.
+    """
+    if isinstance(directory.names, PackedNames):
+        name_blob, name_offsets = directory.names.blob, directory.names.offsets
+    else:
+        name_blob, name_offsets = PackedNames.pack(directory.names)
+
+    arrays = {
+        "ids": directory.ids,
+        "sorted_rows": directory.sorted_rows.astype(np.int64),
+        "sorted_ids": directory.sorted_ids,
+        "signatures": directory.signatures,
+        "name_blob": name_blob,
+        "name_offsets": name_offsets,
+    }
+
+    header = {
+        "version": SNAPSHOT_VERSION,
+        "alias": alias,
+        "built_at": directory.built_at,
+        "count": len(directory),
+        "num_perm": NUM_PERM,
+        "lsh": list(lsh_layout()),
+        "arrays": {}
+    }
+
+    # offsets depend on the header size, so lay out with a generous reservation
+    entries = {name: [0, str(np.asarray(a).dtype), list(np.shape(a))] for name, a in arrays.items()}
+    header["arrays"] = entries
+    reserved = _align(len(MAGIC) + 4 + len(json.dumps(header)) + 256)
+    offset = reserved
+    for name, a in arrays.items():
+        entries[name][0] = offset
+        offset = _align(offset + np.asarray(a).nbytes)
+
+    header_bytes = json.dumps(header).encode("utf8")
+    if len(MAGIC) + 4 + len(header_bytes) > reserved:
+        raise ValueError("snapshot header does not fit its reservation")
+
+    folder = os.path.dirname(path) or "."
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<I", len(header_bytes)))
+            f.write(header_bytes)
+            for name, a in arrays.items():
+                f.seek(entries[name][0])
+                f.write(np.ascontiguousarray(a).tobytes())
+            f.truncate(offset)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_snapshot_bytes(data: bytes, path):
+    """
+    Store a snapshot received from the shared cache, atomically like save_snapshot.
+    """
+    if not data.startswith(MAGIC):
+        raise ValueError("not an employee snapshot")
+    folder = os.path.dirname(path) or "."
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_snapshot_header(path) -> dict:
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            return None
+        (length,) = struct.unpack("<I", f.read(4))
+        return json.loads(f.read(length).decode("utf8"))
+
+
+def load_snapshot(path) -> EmployeeDirectory:
+    """
+    Memory-map a snapshot. Returns None when it is missing, unreadable or
+    written by an incompatible version.
+    """
+    logger = logging.getLogger(__name__)
+
+    if not os.path.exists(path):
+        return None
+
+    try:
+        header = read_snapshot_header(path)
+    except (OSError, ValueError, struct.error) as e:
+        logger.warning(f"Unreadable employee snapshot {path}: {e}")
+        return None
+
+    if (not header or header.get("version") != SNAPSHOT_VERSION or
+            header.get("num_perm") != NUM_PERM or header.get("lsh") != list(lsh_layout())):
+        logger.info(f"Ignoring incompatible employee snapshot {path}")
+        return None
+
+    arrays = {}
+    for name, (offset, dtype, shape) in header["arrays"].items():
+        if int(np.prod(shape)) == 0:
+            arrays[name] = np.empty(shape, dtype=dtype)
+        else:
+            arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=tuple(shape))
+
+    return EmployeeDirectory(
+        arrays["ids"],
+        PackedNames(arrays["name_blob"], arrays["name_offsets"]),
+        arrays["signatures"],
+        built_at=header["built_at"],
+        sorted_rows=arrays["sorted_rows"],
+        sorted_ids=arrays["sorted_ids"]
+    )
@@ -0,0 +1,178 @@
+from dataclasses import dataclass
+
+from slxx_agent.manager.pto_summary import accruals_balance
+
+# typed records for slxx schedule results
+# each is decoded once from the API json and serialized once with to_dict(),
+# the same dict goes to the tool result and to agent_context.context_data
+
+_EMPTY = {}
+
+
+@dataclass(slots=True)
+class ShiftSlot:
+    """Open shift metadata shared by all request messages for that shift."""
+    date_on: str
+    shift_id: int
+    shift_name: str
+    shift_group_id: int
+    shift_group_name: str
+    position_id: int
+    position_name: str
+    unit_id: int
+    unit_name: str
+    _metadata: dict = None
+
+    @classmethod
+    def from_api(cls, date_on, details: dict):
+        shift = details.get("shift") or _EMPTY
+        shift_group = details.get("shiftGroup") or _EMPTY
+        position = details.get("position") or _EMPTY
+        unit = details.get("unit") or _EMPTY
+        return cls(
+            date_on,
+            shift.get("id"), shift.get("name"),
+            shift_group.get("id"), shift_group.get("name"),
+            position.get("id"), position.get("name"),
+            unit.get("id"), unit.get("name")
+        )
+
+    def metadata(self) -> dict:
+        # built once and shared by every request of the slot
+        if self._metadata is None:
+            self._metadata = {
+                "request date": self.date_on,
+                "shift_id": self.shift_id,
+                "shift_name": self.shift_name,
+                "shift_group_id": self.shift_group_id,
+                "shift_group_name": self.shift_group_name,
+                "position_id": self.position_id,
+                "position_name": self.position_name,
+                "unit_id": self.unit_id,
+                "unit_name": self.unit_name
+            }
+        return self._metadata
+
+
+@dataclass(slots=True)
+class ShiftRequest:
+    slot: ShiftSlot
+    message: dict
+
+    def to_dict(self) -> dict:
+        return {
+            "metadata": self.slot.metadata(),
+            "request messages": self.message
+        }
+
+
+@dataclass(slots=True)
+class PTORequest:
+    leave_request_id: int
+    employee_id: int
+    employee_name: str
+    department_id: int
+    department_name: str
+    position_id: int
+    position_name: str
+    start: str
+    end: str
+    reason: str
+    status: str
+    accruals: list
+    # aggregates over the request's detail days, see pto_summary
+    shift_count: int = None
+    remaining_balance: float = None
+
+    @classmethod
+    def from_api(cls, request: dict):
+        employee = request.get("employee") or _EMPTY
+        department = request.get("department") or _EMPTY
+        position = request.get("position") or _EMPTY
+        return cls(
+            request.get("id"),
+            employee.get("id"), employee.get("name"),
+            department.get("id"), department.get("name"),
+            position.get("id"), position.get("name"),
+            request.get("start"),
+            request.get("end"),
+            request.get("reason"),
+            request.get("status"),
+            request.get("accruals"),
+            remaining_balance=accruals_balance(request.get("accruals"), request.get("reason"))
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "leave_request_id": self.leave_request_id,
+            "employee_id": self.employee_id,
+            "employee_name": self.employee_name,
+            "department_id": self.department_id,
+            "department_name": self.department_name,
+            "position_id": self.position_id,
+            "position_name": self.position_name,
+            "start": self.start,
+            "end": self.end,
+            "reason": self.reason,
+            "status": self.status,
+            "accruals": self.accruals,
+            "shift_count": self.shift_count,
+            "remaining_balance": self.remaining_balance
+        }
+
+
+@dataclass(slots=True)
+class PTORequestDetail:
+    date: str
+    shift_id: int
+    shift_name: str
+    shift_start: str
+    shift_end: str
+    shift_duration: str
+    unit_id: int
+    unit_name: str
+    absence_code: str
+    absence_description: str
+    is_accrual_balance_available: bool
+    accrual_balance: float
+    approved_absences: int
+    submitted_absences: int
+
+    @classmethod
+    def from_api(cls, detail: dict):
+        shift = detail.get("shift") or _EMPTY
+        unit = detail.get("unit") or _EMPTY
+        absence_reason = detail.get("absenceReason") or _EMPTY
+        return cls(
+            detail.get("date"),
+            shift.get("id"), shift.get("name"), shift.get("start"), shift.get("end"), shift.get("duration"),
+            unit.get("id"), unit.get("name"),
+            absence_reason.get("code"), absence_reason.get("description"),
+            detail.get("isAccruaBalanceAvailable"),
+            detail.get("accrualBalance"),
+            detail.get("approvedAbsences"),
+            detail.get("submittedAbsences")
+        )
+
+    def to_dict(self) -> dict:
+        # keys as the tool has always returned them
+        return {
+            "date": self.date,
+            "shift_id": self.shift_id,
+            "shift_name": self.shift_name,
+            "shift_start": self.shift_start,
+            "shift_end": self.shift_end,
+            "shift_duration": self.shift_duration,
+            "unit_id": self.unit_id,
+            "unit_name": self.unit_name,
+            "absence_code": self.absence_code,
+            "absence_description": self.absence_description,
+            "isAccruaBalanceAvailable": self.is_accrual_balance_available,
+            "accrualBalance": self.accrual_balance,
+            "approvedAbsences": self.approved_absences,
+            "submittedAbsences": self.submitted_absences
+        }
+
+
+def to_dicts(records) -> list:
+    return [r.to_dict() for r in records]
@@ -0,0 +1,100 @@
+import re
+import unicodedata
+
+# phonetic and nickname keys for employee name search
+# each name token maps to the soundex code of the token itself and of the
+# formal names it is a nickname for, so "Jon Smyth" meets "John Smith" and
+# "Bill" meets "William"
+
+NICKNAMES = {
+    "abby": ("abigail",), "al": ("albert", "alan", "alfred"), "alex": ("alexander", "alexandra"),
+    "andy": ("andrew",), "angie": ("angela",), "barb": ("barbara",), "becky": ("rebecca",),
+    "ben": ("benjamin",), "beth": ("elizabeth",), "betty": ("elizabeth",), "bill": ("william",),
+    "billy": ("william",), "bob": ("robert",), "bobby": ("robert",), "cathy": ("catherine",),
+    "charlie": ("charles",), "chris": ("christopher", "christine", "christina"), "chuck": ("charles",),
+    "cindy": ("cynthia",), "dan": ("daniel",), "danny": ("daniel",), "dave": ("david",),
+    "deb": ("deborah",), "debbie": ("deborah",), "dick": ("richard",), "don": ("donald",),
+    "doug": ("douglas",), "ed": ("edward",), "eddie": ("edward",), "frank": ("francis",),
+    "fred": ("frederick",), "gabe": ("gabriel",), "greg": ("gregory",), "hank": ("henry",),
+    "jack": ("john",), "jake": ("jacob",), "jan": ("janet",), "jeff": ("jeffrey",), "jen": ("jennifer",),
+    "jenny": ("jennifer",), "jerry": ("gerald", "jerome"), "jim": ("james",), "jimmy": ("james",),
+    "joe": ("joseph",), "joey": ("joseph",), "johnny": ("john",), "jon": ("jonathan", "john"),
+    "josh": ("joshua",), "judy": ("judith",), "kate": ("katherine", "catherine"),
+    "kathy": ("katherine", "kathleen"), "katie": ("katherine",), "ken": ("kenneth",), "kim": ("kimberly",),
+    "larry": ("lawrence",), "liz": ("elizabeth",), "lou": ("louis",), "maggie": ("margaret",),
+    "matt": ("matthew",), "meg": ("margaret",), "mike": ("michael",), "mickey": ("michael",),
+    "nancy": ("ann", "anne"), "nate": ("nathan", "nathaniel"), "nick": ("nicholas",),
+    "pam": ("pamela",), "pat": ("patrick", "patricia"), "patty": ("patricia",), "peggy": ("margaret",),
+    "pete": ("peter",), "phil": ("philip",), "ray": ("raymond",), "rich": ("richard",),
+    "rick": ("richard",), "rob": ("robert",), "ron": ("ronald",), "russ": ("russell",),
+    "sam": ("samuel", "samantha"), "sandy": ("sandra",), "steve": ("steven", "stephen"),
+    "sue": ("susan",), "susie": ("susan",), "ted": ("edward", "theodore"), "terry": ("terrence", "teresa"),
+    "tim": ("timothy",), "tom": ("thomas",), "tommy": ("thomas",), "tony": ("anthony",),
+    "trish": ("patricia",), "vicky": ("victoria",), "will": ("william",), "zach": ("zachary",),
+}
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"), **dict.fromkeys("cgjkqsxz", "2"), **dict.fromkeys("dt", "3"),
+    "l": "4", **dict.fromkeys("mn", "5"), "r": "6",
+}
+
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+
+def name_tokens(name: str) -> list:
+    """
+    Lowercase ascii letter runs of a name, accents folded.
+    """
+    folded = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii").lower()
+    return _TOKEN_RE.findall(folded)
+
+
+def soundex(token: str) -> str:
+    first = token[0]
+    code = first.upper()
+    last = _SOUNDEX_CODES.get(first, "")
+    for ch in token[1:]:
+        digit = _SOUNDEX_CODES.get(ch, "")
+        if digit and digit != last:
+            code += digit
+            if len(code) == 4:
+                break
+        # h and w do not separate letters with the same code
+        if ch not in "hw":
+            last = digit
+    return code.ljust(4, "0")
+
+
+def soundex_key(token: str) -> int:
+    """
+    Soundex packed into an int: letter index * 1000 + digits.
+    """
+    code = soundex(token)
+    return (ord(code[0]) - ord("A")) * 1000 + int(code[1:])
+
+
+def token_keys(token: str) -> set:
+    keys = {soundex_key(token)}
+    for formal in NICKNAMES.get(token, ()):
+        keys.add(soundex_key(formal))
+    return keys
+
+
+def expand_nicknames(name: str) -> list:
+    """
+    Variants of name with nicknames replaced by their formal names, used to
+    rank nickname matches fairly.
+    """
+    tokens = name_tokens(name)
+    variants = [[]]
+    expanded = False
+    for token in tokens:
+        formals = NICKNAMES.get(token)
+        if formals:
+            expanded = True
+            variants = [v + [f] for v in variants for f in formals]
+        else:
+            variants = [v + [token] for v in variants]
+    if not expanded:
+        return []
+    return [" ".join(v) for v in variants]
@@ -0,0 +1,145 @@
+import threading
+import time
+from datetime import date
+
+from slxx_agent.date_utils import parse_day
+
+# pending PTO and open shift requests of one department, kept in memory
+# for a rolling window of days and refreshed in the background so the
+# common "what's pending?" questions never wait on the scheduling service
+
+
+def message_id_of(message: dict):
+    return message.get("id", message.get("messageId"))
+
+
+class PendingInbox:
+    """
+    Pending requests of one (alias, org_level_id) between start and end.
+    Readers get None whenever the inbox cannot answer for sure, and then go
+    to the API.
+    """
+
+    def __init__(self, alias, org_level_id):
+        self.alias = alias
+        self.org_level_id = org_level_id
+        self.start = None
+        self.end = None
+        # leave_request_id -> PTORequest
+        self.pto_requests = {}
+        # date -> [ShiftRequest]
+        self.shift_requests = {}
+        self.refreshed_at = 0.0
+        self.accessed_at = time.time()
+        self.last_changes = {}
+        # data version of the alias the contents reflect, None until the first
+        # refresh; readers go to the API once another worker moved the version
+        self.version = None
+        # jwt of the latest verified department reader, used by the background refresh
+        self.jwt = None
+        self.refreshing = False
+        self.lock = threading.Lock()
+
+    def age(self) -> float:
+        return time.time() - self.refreshed_at
+
+    def touch(self, jwt=None):
+        self.accessed_at = time.time()
+        if jwt is not None:
+            self.jwt = jwt
+
+    def advance_version(self, version):
+        """
+        Follow a change this worker applied itself. Any other change in
+        between leaves the inbox stale until the next refresh.
+        """
+        with self.lock:
+            if self.version is not None and version is not None and version == self.version + 1:
+                self.version = version
+            else:
+                self.version = None
+
+    def covers(self, start: date, end: date) -> bool:
+        return (
+            self.start is not None and start is not None and end is not None
+            and self.start <= start and end <= self.end
+        )
+
+    def replace(self, start: date, end: date, pto_requests: list, shift_requests: dict, version=None) -> dict:
+        """
+        Swap in a fresh window fetched at data version and return what changed
+        since the last refresh.
+        """
+        pto_by_id = {request.leave_request_id: request for request in pto_requests}
+        with self.lock:
+            old_pto = set(self.pto_requests)
+            old_shifts = {
+                (day, message_id_of(request.message))
+                for day, requests in self.shift_requests.items() for request in requests
+            }
+            new_shifts = {
+                (day, message_id_of(request.message))
+                for day, requests in shift_requests.items() for request in requests
+            }
+            changes = {
+                "pto_added": sorted(set(pto_by_id) - old_pto, key=str),
+                "pto_removed": sorted(old_pto - set(pto_by_id), key=str),
+                "shifts_added": len(new_shifts - old_shifts),
+                "shifts_removed": len(old_shifts - new_shifts),
+            }
+            self.start = start
+            self.end = end
+            self.pto_requests = pto_by_id
+            self.shift_requests = shift_requests
+            self.refreshed_at = time.time()
+            self.last_changes = changes
+            self.version = version
+        return changes
+
+    def pto_between(self, start: date, end: date) -> list:
+        """
+        Pending requests overlapping start..end, None when outside the window.
+        """
+        if not self.covers(start, end):
+            return None
+        matches = []
+        with self.lock:
+            requests = list(self.pto_requests.values())
+        for request in requests:
+            request_start = parse_day(request.start)
+            request_end = parse_day(request.end) or request_start
+            if request_start is None:
+                return None
+            if request_start <= end and request_end >= start:
+                matches.append(request)
+        matches.sort(key=lambda request: (parse_day(request.start), str(request.leave_request_id)))
+        return matches
+
+    def shifts_on(self, day: date) -> list:
+        with self.lock:
+            requests = self.shift_requests.get(day)
+        if requests is None:
+            return None
+        return list(requests)
+
+    def remove_pto(self, leave_request_id):
+        with self.lock:
+            self.pto_requests.pop(leave_request_id, None)
+            # ids may come back from the model as strings
+            self.pto_requests.pop(str(leave_request_id), None)
+            try:
+                self.pto_requests.pop(int(leave_request_id), None)
+            except (TypeError, ValueError):
+                pass
+
+    def remove_shift_message(self, day: date, message_id):
+        with self.lock:
+            requests = self.shift_requests.get(day)
+            if requests is None:
+                return
+            kept = [r for r in requests if str(message_id_of(r.message)) != str(message_id)]
+            if len(kept) == len(requests):
+                # message not recognized, let readers go to the API for that day
+                del self.shift_requests[day]
+            else:
+                self.shift_requests[day] = kept
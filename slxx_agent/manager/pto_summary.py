@@ -0,0 +1,86 @@
+from datetime import date
+
+import numpy as np
+
+from slxx_agent.date_utils import parse_day
+
+# per-request aggregates for the PTO summary table: the number of shifts a
+# leave request covers and the remaining balance after it. computed for all
+# requests of a result at once over flat arrays of their detail days, so the
+# model reads them off the request instead of fetching details to count rows.
+
+
+def accruals_balance(accruals, reason):
+    """
+    accrualBalance of the accrual for the request's own leave type, matched on
+    its absenceReason code or description, None when there is no such entry.
+    """
+    if not reason:
+        return None
+    reason = str(reason).lower()
+    for accrual in accruals or []:
+        if not isinstance(accrual, dict):
+            continue
+        absence_reason = accrual.get("absenceReason") or {}
+        if reason not in (str(absence_reason.get("code")).lower(), str(absence_reason.get("description")).lower()):
+            continue
+        balance = accrual.get("accrualBalance")
+        return balance if isinstance(balance, (int, float)) else None
+    return None
+
+
+def detail_aggregates(details_per_request: list):
+    """
+    Shift counts and remaining balances of several leave requests.
+
+    Args:
+        details_per_request: one list of PTORequestDetail per request
+
+    Returns:
+        (shift counts, remaining balances) arrays with one entry per request,
+        the balance is that of the request's last day with a balance, nan when none has one
+    """
+    n = len(details_per_request)
+    lengths = np.fromiter((len(details) for details in details_per_request), dtype=np.int64, count=n)
+    owners = np.repeat(np.arange(n), lengths)
+    days = [day for details in details_per_request for day in details]
+
+    shift_counts = np.bincount(owners, minlength=n)
+
+    ordinals = np.fromiter(
+        ((parse_day(day.date) or date.min).toordinal() for day in days),
+        dtype=np.int64, count=len(days)
+    )
+    balances = np.fromiter(
+        (
+            day.accrual_balance
+            if day.is_accrual_balance_available is not False and isinstance(day.accrual_balance, (int, float))
+            else np.nan
+            for day in days
+        ),
+        dtype=np.float64, count=len(days)
+    )
+
+    remaining = np.full(n, np.nan)
+    known = np.flatnonzero(~np.isnan(balances))
+    if known.size:
+        # known days ordered by request then date, the last one of each request wins
+        known = known[np.lexsort((ordinals[known], owners[known]))]
+        known_owners = owners[known]
+        last = np.append(known_owners[1:] != known_owners[:-1], True)
+        remaining[known_owners[last]] = balances[known[last]]
+    return shift_counts, remaining
+
+
+def apply_aggregates(pto_requests: list, details_per_request: list):
+    """
+    Set shift_count and remaining_balance on pto_requests from their details,
+    a request without a balance on any day keeps the one of its accruals.
+    """
+    shift_counts, remaining = detail_aggregates(details_per_request)
+    for request, shift_count, balance in zip(pto_requests, shift_counts.tolist(), remaining.tolist()):
+        request.shift_count = shift_count
+        if balance == balance:
+            request.remaining_balance = balance
+        elif request.remaining_balance is None:
+            request.remaining_balance = accruals_balance(request.accruals, request.reason)
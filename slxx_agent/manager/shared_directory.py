@@ -0,0 +1,107 @@
+import logging
+import os
+import re
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # no cross-process lock, every worker may build
+    fcntl = None
+
+from slxx_agent.manager.employee_directory import EmployeeDirectory
+from slxx_agent.manager.employee_snapshot import save_snapshot, load_snapshot
+
+# employee directories shared by the workers of one host
+#
+# each alias has one snapshot file on tmpfs (/dev/shm), every worker
+# memory-maps it so the names and signatures are held once per host.
+# a new version is written next to it and renamed over it, workers that
+# still map the old one keep reading it until they remap. the file's
+# (inode, mtime) is the version a worker compares against.
+#
+# builds are serialized per alias with a lock file so one worker builds
+# or syncs and the others map its result
+
+
+class SharedDirectoryStore:
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        os.makedirs(folder, mode=0o700, exist_ok=True)
+
+    def path(self, alias) -> str:
+        safe_alias = re.sub(r"[^A-Za-z0-9_.-]", "_", alias)
+        return os.path.join(self.folder, f"{safe_alias}.emp")
+
+    def version(self, alias):
+        """
+        Version of the published directory, None when there is none.
+        """
+        try:
+            stat = os.stat(self.path(alias))
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def load(self, alias):
+        """
+        Map the published directory.
+
+        Returns:
+            (EmployeeDirectory, version), (None, None) when nothing usable is published
+        """
+        # version first: a swap between the two reads only makes the next check remap
+        version = self.version(alias)
+        if version is None:
+            return None, None
+        directory = load_snapshot(self.path(alias))
+        if directory is None:
+            return None, None
+        return directory, version
+
+    def publish(self, directory: EmployeeDirectory, alias):
+        """
+        Write directory as the alias's new version and map it back, so the
+        publishing worker also drops its private copy.
+
+        Returns:
+            (EmployeeDirectory, version)
+        """
+        save_snapshot(directory, self.path(alias), alias)
+        shared, version = self.load(alias)
+        if shared is None:
+            return directory, None
+        return shared, version
+
+    @contextmanager
+    def build_lock(self, alias, wait=True):
+        """
+        Hold the alias's builder lock. Yields False when wait is False and
+        another worker holds it.
+        """
+        if fcntl is None:
+            yield True
+            return
+        with open(self.path(alias) + ".lock", "a") as lock_file:
+            flags = fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB
+            try:
+                fcntl.flock(lock_file, flags)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def create_shared_directory_store(folder: str) -> SharedDirectoryStore:
+    logger = logging.getLogger(__name__)
+    if not folder:
+        return None
+    try:
+        return SharedDirectoryStore(folder)
+    except OSError as e:
+        logger.warning(f"Shared employee directories unavailable, using per-process copies: {e}")
+        return None
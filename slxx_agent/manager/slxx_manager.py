@@ -2,15 +2,170 @@ import logging
 import time
 import json
 import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 from collections import defaultdict
 import datetime
 
 from slxx_agent.api.slxx_api import slxxAPI
-from datasketch import MinHash, MinHashLSH
-from rapidfuzz import fuzz
 from slxx_agent.config.local_config import LocalConfig
+from slxx_agent.cpu_offload import run_cpu
+from slxx_agent.manager.employee_directory import EmployeeDirectory, EmployeeScope, minhash_signatures
+from slxx_agent.manager.lru_cache import LRUCache
+from slxx_agent.manager.models import ShiftSlot, ShiftRequest, PTORequest, PTORequestDetail
+from slxx_agent.manager.name_matching import expand_nicknames
+from slxx_agent.date_utils import parse_day
+from slxx_agent.manager.pending_inbox import PendingInbox
+from slxx_agent.manager.pto_summary import apply_aggregates
+from slxx_agent.manager.cache_backend import get_cache_backend
+from slxx_agent.manager.shared_directory import SharedDirectoryStore, create_shared_directory_store
+from slxx_agent.manager.employee_snapshot import (
+    snapshot_path, save_snapshot, load_snapshot, read_snapshot_header, write_snapshot_bytes
+)
+
+# employee directories outlive the per-turn manager, keyed by alias
+_employee_directories = {}
+_employee_directories_lock = threading.Lock()
+_employee_refreshing = set()
+# version of the shared-memory directory each alias maps, and when it was last compared
+_employee_directory_versions = {}
+_employee_directory_checked = {}
+_shared_directory_store = None
+# department scopes over the alias directory, keyed by (alias, org_level_id)
+_employee_scopes = {}
+# shortInfo records, one LRU per alias so tenants do not evict each other
+_employee_details = {}
+# leave request detail days, one LRU per alias
+_pto_details = {}
+
+# leave requests in these statuses need no action from the manager
+CLOSED_PTO_STATUSES = ("Denied", "Approved")
+
+# users whose own request for a department succeeded, keyed by (alias, org_level_id);
+# only they are answered from data cached in memory for that department
+_department_readers = defaultdict(set)
+# bumped whenever the alias's requests change, cached answers carry it; these
+# are the versions of a memory cache backend, a shared backend holds them for
+# every worker and pod
+_data_versions = defaultdict(int)
+_data_versions_lock = threading.Lock()
+
+# pending request inboxes keyed by (alias, org_level_id)
+_pending_inboxes = {}
+_pending_inboxes_lock = threading.Lock()
+_inbox_refresher = None
+
+
+def get_shared_directory_store(local_config: LocalConfig) -> SharedDirectoryStore:
+    """
+    Store of the host's shared-memory employee directories, None when disabled.
+    """
+    global _shared_directory_store
+    if _shared_directory_store is None and local_config.employee_shared_memory_dir:
+        with _employee_directories_lock:
+            if _shared_directory_store is None:
+                _shared_directory_store = create_shared_directory_store(local_config.employee_shared_memory_dir)
+    return _shared_directory_store
+
+
+def preload_employee_snapshots(local_config: LocalConfig):
+    """
+    Map every snapshot in the snapshot folder so a new replica serves
+    searches without downloading the employee list first. Directories
+    already published in shared memory are mapped instead of the local copy.
+    """
+    logger = logging.getLogger(__name__)
+    store = get_shared_directory_store(local_config)
+    if store is not None:
+        for file_name in os.listdir(store.folder):
+            if not file_name.endswith(".emp"):
+                continue
+            alias = (read_snapshot_header(os.path.join(store.folder, file_name)) or {}).get("alias")
+            if not alias:
+                continue
+            directory, version = store.load(alias)
+            if directory is not None:
+                _employee_directories.setdefault(alias, directory)
+                _employee_directory_versions.setdefault(alias, version)
+                logger.info(f"Mapped shared employee directory for {alias} with {len(directory)} employees")
+
+    snapshot_dir = local_config.employee_snapshot_dir
+    if not snapshot_dir or not os.path.isdir(snapshot_dir):
+        return
+    for file_name in os.listdir(snapshot_dir):
+        if not file_name.endswith(".emp"):
+            continue
+        path = os.path.join(snapshot_dir, file_name)
+        try:
+            alias = (read_snapshot_header(path) or {}).get("alias")
+            directory = load_snapshot(path)
+        except Exception as e:
+            logger.warning(f"Skipping employee snapshot {path}: {e}")
+            continue
+        if alias and directory is not None:
+            _employee_directories.setdefault(alias, directory)
+            logger.info(f"Loaded employee snapshot for {alias} with {len(directory)} employees")
+
+
+def start_inbox_refresher(local_config: LocalConfig):
+    global _inbox_refresher
+    if _inbox_refresher is not None:
+        return
+    with _pending_inboxes_lock:
+        if _inbox_refresher is None:
+            _inbox_refresher = threading.Thread(
+                target=_run_inbox_refresher, args=(local_config,),
+                name="inbox-refresher", daemon=True
+            )
+            _inbox_refresher.start()
+
+
+def _run_inbox_refresher(local_config: LocalConfig):
+    """
+    Keep the inboxes someone read lately fresh, forget the idle ones.
+    """
+    logger = logging.getLogger(__name__)
+    idle_seconds = local_config.inbox_idle_minutes * 60
+    while True:
+        time.sleep(local_config.inbox_refresh_seconds)
+        now = time.time()
+        with _pending_inboxes_lock:
+            inboxes = list(_pending_inboxes.items())
+        for key, inbox in inboxes:
+            if now - inbox.accessed_at > idle_seconds:
+                with _pending_inboxes_lock:
+                    _pending_inboxes.pop(key, None)
+                logger.info(f"Dropped idle pending inbox {key}")
+                continue
+            if inbox.age() < local_config.inbox_refresh_seconds:
+                continue
+            try:
+                api = slxxAPI(local_config, inbox.jwt)
+            except Exception as e:
+                logger.warning(f"Pending inbox {key} has no usable token: {e}")
+                continue
+            if api.expiry is not None and api.expiry < now + local_config.inbox_refresh_seconds:
+                # the token would expire mid refresh, readers fetch live until one brings a fresh token
+                continue
+            with _pending_inboxes_lock:
+                if inbox.refreshing:
+                    continue
+                inbox.refreshing = True
+            _refresh_pending_inbox(local_config, api, inbox)
+
+
+def _refresh_pending_inbox(local_config: LocalConfig, api: slxxAPI, inbox: PendingInbox):
+    logger = logging.getLogger(__name__)
+    try:
+        slxxManager(local_config, api, None).load_pending_inbox(inbox)
+    except Exception as e:
+        logger.warning(f"Pending inbox refresh for {inbox.alias}/{inbox.org_level_id} failed: {e}")
+    finally:
+        with _pending_inboxes_lock:
+            inbox.refreshing = False
 
 class slxxManager:
     def __init__(self, local_config: LocalConfig, api: slxxAPI, user_prompt):
@@ -18,19 +173,19 @@ class slxxManager:
         self.local_config = local_config
         self.user_prompt = user_prompt
 
-        # For fuzzy search: a simple cache
-        self.ids_to_names = None
-        self.lsh_index = None
-        self.employee_data_timestamp = None
-        self.employee_data_ttl = timedelta(hours=1)
+        # For fuzzy search: directory cached per alias
+        self.employee_directory = None
+        self.employee_data_ttl = timedelta(minutes=local_config.employee_index_ttl_minutes)
 
     # --------------------------------------------------------------------------
     # Fuzzy Employee Searching
     # --------------------------------------------------------------------------
-    def find_employees(self, employee_query):
+    def find_employees(self, employee_query, org_level_id=None):
         """
         Uses a fuzzy-match index to find employees by name, or if the query
         looks like an ID (numeric), fetch that employee directly.
+        With org_level_id the department's employees are searched first and
+        the corporate directory only when no department match is good enough.
         """
 
         if employee_query.isdigit():
@@ -40,49 +195,302 @@ class slxxManager:
             candidate_name = single_emp["employee_name"]
             return [(100, employee_query, candidate_name)]
 
-        self.ids_to_names, self.lsh_index = self.build_employee_index()
+        self.employee_directory = self.get_employee_directory()
 
-        top_matches = self.find_closest_string(employee_query, self.lsh_index, self.ids_to_names)
+        if org_level_id is not None and self.local_config.employee_department_scope:
+            scope = self.get_employee_scope(org_level_id)
+            rows = scope.rows(self.employee_directory)
+            top_matches = self.find_closest_string(employee_query, self.employee_directory, rows)
+            if top_matches and top_matches[0][0] >= self.local_config.employee_scope_min_score:
+                return top_matches
+
+        top_matches = self.find_closest_string(employee_query, self.employee_directory)
         return top_matches
-    
-    def build_employee_index(self):
+
+    def get_employee_scope(self, org_level_id) -> EmployeeScope:
+        """
+        Employee ids of one org level, cached for employee_data_ttl.
+        """
         logger = logging.getLogger(__name__)
-        response = self.api.get_all_employee_list()
-        employees = response["data"]
-
-        ids_to_names = {}
-        for emp in employees:
-            emp_id = emp.get("id")
-            emp_name = emp.get("fullName")
-            ids_to_names[emp_id] = emp_name
-
-        lsh_index = MinHashLSH(threshold=0.1, num_perm=64)
-        for eid, name in ids_to_names.items():
-            mh = self.get_minhash(name)
-            lsh_index.insert(str(eid), mh)
-
-        logger.info(f"ids_to_names: {ids_to_names}")
-        return ids_to_names, lsh_index
-
-    def get_minhash(self, text):
-        m = MinHash(num_perm=64)
-        n = 3
-        for i in range(len(text) - n + 1):
-            m.update(text[i:i+n].lower().encode("utf8"))
-        return m
-
-    def find_closest_string(self, query_string, index, ids_to_names):
+        key = (self.api.alias, org_level_id)
+        scope = _employee_scopes.get(key)
+        if scope is not None and time.time() - scope.built_at < self.employee_data_ttl.total_seconds():
+            return scope
+
+        ids, _ = self.api.get_employee_names(org_level_id=org_level_id)
+        scope = EmployeeScope(ids)
+        _employee_scopes[key] = scope
+
+        missing = len(scope) - len(scope.rows(self.get_employee_directory()))
+        logger.info(f"Employee scope for org level {org_level_id}: {len(scope)} employees, {missing} not indexed")
+        if missing:
+            # new hires not in the corporate directory yet
+            self.refresh_employee_directory()
+        return scope
+
+    def get_employee_directory(self) -> EmployeeDirectory:
+        """
+        Cached directory for the alias. A cold cache is filled from the local
+        snapshot when there is one, otherwise built from the backend. Once the
+        directory is older than employee_data_ttl it keeps serving while a
+        background refresh rebuilds it.
+
+        With a shared-memory store the directory is mapped from the host's
+        published copy and remapped when another worker publishes a new one.
+        """
+        alias = self.api.alias
+        store = get_shared_directory_store(self.local_config)
+
+        directory = _employee_directories.get(alias)
+        if directory is not None and store is not None:
+            directory = self.check_shared_employee_directory(store, directory)
+        if directory is None:
+            with _employee_directories_lock:
+                directory = _employee_directories.get(alias)
+                if directory is None:
+                    if store is not None:
+                        directory = self.load_shared_employee_directory(store)
+                    else:
+                        directory = self.load_or_build_employee_directory()
+                    _employee_directories[alias] = directory
+
+        if time.time() - directory.built_at >= self.employee_data_ttl.total_seconds():
+            self.refresh_employee_directory()
+        return directory
+
+    def load_or_build_employee_directory(self) -> EmployeeDirectory:
+        directory = self.load_employee_snapshot()
+        if directory is None:
+            directory = self.load_shared_employee_snapshot()
+        if directory is None:
+            directory = self.build_employee_index()
+            self.save_employee_snapshot(directory)
+        return directory
+
+    def load_shared_employee_directory(self, store: SharedDirectoryStore) -> EmployeeDirectory:
+        """
+        Map the host's published directory. When there is none, the first
+        worker to take the builder lock publishes one and the others wait
+        and map it.
+        """
+        alias = self.api.alias
+        directory, version = store.load(alias)
+        if directory is None:
+            with store.build_lock(alias):
+                directory, version = store.load(alias)
+                if directory is None:
+                    directory, version = store.publish(self.load_or_build_employee_directory(), alias)
+        _employee_directory_versions[alias] = version
+        _employee_directory_checked[alias] = time.monotonic()
+        return directory
+
+    def check_shared_employee_directory(self, store: SharedDirectoryStore,
+                                        directory: EmployeeDirectory) -> EmployeeDirectory:
+        """
+        Remap the alias directory when another worker published a new version,
+        at most once per employee_shared_check_seconds.
+        """
+        logger = logging.getLogger(__name__)
+        alias = self.api.alias
+        now = time.monotonic()
+        if now - _employee_directory_checked.get(alias, 0) < self.local_config.employee_shared_check_seconds:
+            return directory
+        _employee_directory_checked[alias] = now
+
+        version = store.version(alias)
+        if version is None or version == _employee_directory_versions.get(alias):
+            return directory
+        shared, version = store.load(alias)
+        if shared is None:
+            return directory
+        _employee_directories[alias] = shared
+        _employee_directory_versions[alias] = version
+        logger.info(f"Remapped shared employee directory for {alias} with {len(shared)} employees")
+        return shared
+
+    def load_employee_snapshot(self) -> EmployeeDirectory:
+        snapshot_dir = self.local_config.employee_snapshot_dir
+        if not snapshot_dir:
+            return None
+        return load_snapshot(snapshot_path(snapshot_dir, self.api.alias))
+
+    def save_employee_snapshot(self, directory: EmployeeDirectory):
+        logger = logging.getLogger(__name__)
+        snapshot_dir = self.local_config.employee_snapshot_dir
+        if not snapshot_dir:
+            return
+        path = snapshot_path(snapshot_dir, self.api.alias)
+        try:
+            save_snapshot(directory, path, self.api.alias)
+        except OSError as e:
+            logger.warning(f"Could not write employee snapshot: {e}")
+            return
+
+        # publish for the other workers and pods so they skip the build
+        cache = get_cache_backend(self.local_config)
+        if cache.shared:
+            with open(path, "rb") as f:
+                cache.set(self.shared_snapshot_key(), f.read(), self.employee_data_ttl.total_seconds())
+
+    def shared_snapshot_key(self) -> str:
+        return f"slxx:{self.api.alias}:employee.snapshot"
+
+    def load_shared_employee_snapshot(self) -> EmployeeDirectory:
+        """
+        Directory another worker published to the shared cache, stored as the
+        local snapshot and memory-mapped from there.
+        """
+        logger = logging.getLogger(__name__)
+        snapshot_dir = self.local_config.employee_snapshot_dir
+        cache = get_cache_backend(self.local_config)
+        if not snapshot_dir or not cache.shared:
+            return None
+        data = cache.get(self.shared_snapshot_key())
+        if data is None:
+            return None
+        path = snapshot_path(snapshot_dir, self.api.alias)
+        try:
+            write_snapshot_bytes(data, path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not store shared employee snapshot: {e}")
+            return None
+        directory = load_snapshot(path)
+        if directory is not None:
+            logger.info(f"Loaded shared employee snapshot for {self.api.alias} with {len(directory)} employees")
+        return directory
+
+    def refresh_employee_directory(self):
+        """
+        Rebuild the alias directory in a background thread, one refresh per alias at a time.
+        """
+        alias = self.api.alias
+        with _employee_directories_lock:
+            if alias in _employee_refreshing:
+                return
+            _employee_refreshing.add(alias)
+
+        # own client so the refresh is not bound by this turn's deadline
+        api = slxxAPI(self.local_config, self.api.jwt)
+        threading.Thread(
+            target=self._refresh_employee_directory, args=(api,),
+            name=f"employee-refresh-{alias}", daemon=True
+        ).start()
+
+    def _refresh_employee_directory(self, api: slxxAPI):
+        logger = logging.getLogger(__name__)
+        alias = api.alias
+        try:
+            store = get_shared_directory_store(self.local_config)
+            if store is not None:
+                self._refresh_shared_employee_directory(store, api)
+                return
+            current = _employee_directories.get(alias)
+            if current is None:
+                directory = self.build_employee_index(api)
+                changed = True
+            else:
+                directory, changed = self.sync_employee_index(current, api)
+            _employee_directories[alias] = directory
+            if changed:
+                self.save_employee_snapshot(directory)
+        except Exception as e:
+            logger.warning(f"Employee directory refresh for {alias} failed: {e}")
+        finally:
+            with _employee_directories_lock:
+                _employee_refreshing.discard(alias)
+
+    def _refresh_shared_employee_directory(self, store: SharedDirectoryStore, api: slxxAPI):
+        """
+        Sync and publish the host's directory. Workers that find the builder
+        lock taken leave the refresh to its holder and pick up its result on
+        their next version check.
+        """
+        logger = logging.getLogger(__name__)
+        alias = api.alias
+        with store.build_lock(alias, wait=False) as building:
+            if not building:
+                return
+
+            current, version = store.load(alias)
+            if current is not None and version != _employee_directory_versions.get(alias):
+                _employee_directories[alias] = current
+                _employee_directory_versions[alias] = version
+                if time.time() - current.built_at < self.employee_data_ttl.total_seconds():
+                    # another worker refreshed it while this one was waiting
+                    return
+            current = current if current is not None else _employee_directories.get(alias)
+
+            if current is None:
+                directory, changed = self.build_employee_index(api), True
+            else:
+                directory, changed = self.sync_employee_index(current, api)
+            if changed:
+                self.save_employee_snapshot(directory)
+            # published even when unchanged, so the other workers see the new build time
+            directory, version = store.publish(directory, alias)
+            _employee_directories[alias] = directory
+            _employee_directory_versions[alias] = version
+            logger.info(f"Published employee directory for {alias} with {len(directory)} employees")
+
+    def build_employee_index(self, api: slxxAPI = None) -> EmployeeDirectory:
+        logger = logging.getLogger(__name__)
+        api = api or self.api
+        ids, names = api.get_employee_names()
+
+        # MinHash of a large tenant holds the GIL for seconds, build it in the cpu pool
+        signatures = run_cpu(
+            self.local_config, minhash_signatures, [(n or "").lower() for n in names],
+            size=len(names), threshold=self.local_config.cpu_offload_min_names
+        )
+        directory = EmployeeDirectory.build(ids, names, signatures=signatures)
+
+        logger.info(f"Employee index built with {len(directory)} employees ({directory.nbytes()} bytes)")
+        return directory
+
+    def sync_employee_index(self, directory: EmployeeDirectory, api: slxxAPI = None):
+        """
+        Apply only the hires, terminations and renames since directory was built.
+
+        Returns:
+            (EmployeeDirectory, bool changed)
+        """
+        logger = logging.getLogger(__name__)
+        api = api or self.api
+        ids, names = api.get_employee_names()
+
+        synced, changes = directory.sync(ids, names)
+
+        logger.info(f"Employee index synced with {len(synced)} employees: {changes}")
+        return synced, any(changes.values())
+
+    def find_closest_string(self, query_string, directory: EmployeeDirectory, scope_rows=None):
+        from rapidfuzz import fuzz, process
         logger = logging.getLogger(__name__)
         logger.info(f"Fuzzy searching for: {query_string}")
-        query_hash = self.get_minhash(query_string)
-        result_ids = index.query(query_hash)
-        logger.info(f"result_ids: {result_ids}")
-        scored = []
-        for rid in result_ids:
-            candidate_name = ids_to_names.get(int(rid), "")
-            score = fuzz.WRatio(candidate_name, query_string)
-            scored.append((score, rid, candidate_name))
-        top_matches = sorted(scored, reverse=True)[:10]
+        rows = directory.candidates(query_string, scope_rows)
+        logger.info(f"candidate count: {len(rows)}")
+        choices = {int(row): directory.names[row] for row in rows}
+        queries = [query_string]
+
+        if self.local_config.employee_phonetic_search:
+            phonetic_rows = directory.phonetic_candidates(query_string, scope_rows)
+            logger.info(f"phonetic candidate count: {len(phonetic_rows)}")
+            for row in phonetic_rows.tolist():
+                if row not in choices:
+                    choices[row] = directory.names[row]
+            # "Bill Gates" should rank "William Gates" as well as a literal match
+            queries.extend(expand_nicknames(query_string))
+
+        best = {}
+        for query in queries:
+            for candidate_name, score, row in process.extract(query, choices, scorer=fuzz.WRatio, limit=10):
+                if score > best.get(row, (-1,))[0]:
+                    best[row] = (score, candidate_name)
+
+        top_matches = sorted(
+            ((score, str(directory.ids[row]), candidate_name) for row, (score, candidate_name) in best.items()),
+            reverse=True
+        )[:10]
         return top_matches
 
     def rearrange_name(self, name):
@@ -92,8 +500,55 @@ class slxxManager:
             return f"{parts[1]} {parts[0]}"
         return name
     
+    def get_employee_detail_cache(self) -> LRUCache:
+        alias = self.api.alias
+        cache = _employee_details.get(alias)
+        if cache is None:
+            with _employee_directories_lock:
+                cache = _employee_details.setdefault(alias, LRUCache(
+                    self.local_config.employee_detail_cache_size,
+                    self.local_config.employee_detail_cache_ttl
+                ))
+        return cache
+
     def get_employee(self, employee_id):
-        # First, try to get the basic employee info (from vector cache or API)
+        # First, try to get the basic employee info (from cache or API)
+        cache = self.get_employee_detail_cache()
+        emp_map = cache.get(str(employee_id))
+        if emp_map is None:
+            emp_map = self.fetch_employee(employee_id)
+            if emp_map is not None:
+                cache.set(str(employee_id), emp_map)
+        return emp_map
+
+    def get_employees(self, employee_ids) -> dict:
+        """
+        Short info for many employees: cached records are served from the
+        alias LRU, the rest are fetched concurrently (bounded by
+        detail_concurrency) over the shared connection pool.
+
+        Returns:
+            Dict: employee id (str) -> employee map, or None when not found
+        """
+        cache = self.get_employee_detail_cache()
+        results = {}
+        missing = []
+        for employee_id in dict.fromkeys(str(e) for e in employee_ids):
+            emp_map = cache.get(employee_id)
+            if emp_map is None:
+                missing.append(employee_id)
+            results[employee_id] = emp_map
+
+        if missing:
+            workers = min(len(missing), self.local_config.employee_detail_concurrency)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="employee-detail") as executor:
+                for employee_id, emp_map in zip(missing, executor.map(self.fetch_employee, missing)):
+                    results[employee_id] = emp_map
+                    if emp_map is not None:
+                        cache.set(employee_id, emp_map)
+        return results
+
+    def fetch_employee(self, employee_id):
         logger = logging.getLogger(__name__)
         response = self.api.get_employee_short_info(employee_id=employee_id)
         logger.info(f"Employee info response: {response}")
@@ -117,7 +572,138 @@ class slxxManager:
             "employee_email": data.get("email"),
         }
         return emp_map
-    
+
+    # --------------------------------------------------------------------------
+    # Pending Inbox
+    # --------------------------------------------------------------------------
+
+    def get_pending_inbox(self, org_level_id) -> PendingInbox:
+        """
+        Department inbox when it is fresh enough to answer from, otherwise None.
+        Reading registers the department for periodic refresh and starts a
+        refresh right away when the inbox is stale, either by age or because
+        the data version moved since it was loaded (a change in any worker).
+        Only users who read the department with their own token are served
+        and lend their token to the refresh.
+        """
+        if not self.local_config.inbox_enabled or org_level_id is None:
+            return None
+        if not self.is_department_reader(org_level_id):
+            return None
+        key = (self.api.alias, org_level_id)
+        with _pending_inboxes_lock:
+            inbox = _pending_inboxes.get(key)
+            if inbox is None:
+                inbox = _pending_inboxes[key] = PendingInbox(*key)
+        inbox.touch(self.api.jwt)
+        start_inbox_refresher(self.local_config)
+
+        version = self.data_version()
+        if inbox.age() > self.local_config.inbox_max_age or version is None or version != inbox.version:
+            self.refresh_pending_inbox(inbox)
+            return None
+        return inbox
+
+    def add_department_reader(self, org_level_id):
+        # the user just read the department with their own token
+        _department_readers[(self.api.alias, org_level_id)].add(self.api.user_id)
+
+    def is_department_reader(self, org_level_id) -> bool:
+        readers = _department_readers.get((self.api.alias, org_level_id))
+        return readers is not None and self.api.user_id in readers
+
+    def data_version_key(self) -> str:
+        return f"slxx:{self.api.alias}:data_version"
+
+    def data_version(self) -> int:
+        """
+        Version of the alias's request data, None when the shared cache
+        backend cannot be read; nothing keyed by the version may be served then.
+        """
+        backend = get_cache_backend(self.local_config)
+        if backend.shared:
+            return backend.counter(self.data_version_key())
+        return _data_versions[self.api.alias]
+
+    def bump_data_version(self) -> int:
+        """
+        Invalidate what other workers cached for the alias, returns the new version.
+        """
+        logger = logging.getLogger(__name__)
+        backend = get_cache_backend(self.local_config)
+        if backend.shared:
+            version = backend.incr(self.data_version_key())
+            if version is None:
+                logger.warning(f"Data version of {self.api.alias} not bumped, the cache backend is unavailable")
+            return version
+        with _data_versions_lock:
+            _data_versions[self.api.alias] += 1
+            return _data_versions[self.api.alias]
+
+    def record_change(self, inboxes: list):
+        """
+        Bump the data version after a request changed, inboxes already had the
+        change applied in place and stay readable in this worker.
+        """
+        version = self.bump_data_version()
+        for inbox in inboxes:
+            inbox.advance_version(version)
+
+    def alias_pending_inboxes(self) -> list:
+        with _pending_inboxes_lock:
+            return [inbox for (alias, _), inbox in _pending_inboxes.items() if alias == self.api.alias]
+
+    def refresh_pending_inbox(self, inbox: PendingInbox):
+        with _pending_inboxes_lock:
+            if inbox.refreshing:
+                return
+            inbox.refreshing = True
+
+        # own client so the refresh is not bound by this turn's deadline
+        api = slxxAPI(self.local_config, self.api.jwt)
+        threading.Thread(
+            target=_refresh_pending_inbox, args=(self.local_config, api, inbox),
+            name=f"inbox-refresh-{inbox.alias}-{inbox.org_level_id}", daemon=True
+        ).start()
+
+    def load_pending_inbox(self, inbox: PendingInbox):
+        """
+        Fetch pending PTO and open shift requests from today through the
+        rolling window and swap them into inbox. Days whose fetch failed are
+        left out so readers go to the API for them.
+        """
+        logger = logging.getLogger(__name__)
+        # read before fetching, changes made during the fetch leave the inbox stale
+        version = self.data_version()
+        start = datetime.datetime.now(ZoneInfo('America/New_York')).date()
+        days = [start + timedelta(days=offset) for offset in range(self.local_config.inbox_window_days)]
+        end = days[-1]
+
+        pto_requests = self.fetch_pto_requests(
+            inbox.org_level_id, start.strftime('%m-%d-%Y'), end.strftime('%m-%d-%Y')
+        )
+        # details are fetched for the aggregates here in the background, never on the turn
+        self.summarize_pto_requests(inbox.org_level_id, pto_requests, fetch=True)
+
+        def fetch_day(day):
+            try:
+                return day, self.fetch_shift_requests(day.strftime('%m-%d-%Y'), inbox.org_level_id)
+            except Exception as e:
+                logger.warning(f"Pending inbox shift requests for {day} failed: {e}")
+                return day, None
+
+        workers = max(1, min(self.local_config.inbox_concurrency, len(days)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inbox") as pool:
+            shift_requests = {day: requests for day, requests in pool.map(fetch_day, days) if requests is not None}
+
+        changes = inbox.replace(start, end, pto_requests, shift_requests, version)
+        if any(changes.values()):
+            self.record_change([inbox])
+        logger.info(
+            f"Pending inbox {inbox.alias}/{inbox.org_level_id} refreshed: "
+            f"{len(pto_requests)} PTO, {sum(len(r) for r in shift_requests.values())} shift requests, {changes}"
+        )
+
     # --------------------------------------------------------------------------
     # Open Shift Requests
     # --------------------------------------------------------------------------
@@ -131,48 +717,38 @@ class slxxManager:
             org_level_id (int): Organization level ID
         
         Returns:
-            Dict: Open Shift Request Data
+            List[ShiftRequest]: Open Shift Request Data
         """
+        logger = logging.getLogger(__name__)
+        inbox = self.get_pending_inbox(org_level_id)
+        if inbox is not None:
+            shift_requests = inbox.shifts_on(parse_day(date_on))
+            if shift_requests is not None:
+                logger.info(f"Shift requests for {date_on} served from the pending inbox")
+                return shift_requests
+
+        shift_requests = self.fetch_shift_requests(date_on, org_level_id)
+        self.add_department_reader(org_level_id)
+        return shift_requests
+
+    def fetch_shift_requests(self, date_on, org_level_id):
         shift_request_response = self.api.get_shift_requests(date_on, org_level_id)
         shift_request_response_data = shift_request_response.get("data", {})
         if not shift_request_response_data:
-            return {}
+            return []
         
         shift_request_response_details = shift_request_response_data.get("details", [])
         if not shift_request_response_details:
-            return {}
+            return []
         
         shift_requests = []
         for shifts in shift_request_response_details:
             messages = shifts.get("messages", [])
             if not messages:
                 continue
-            shift_id = shifts.get("shift").get("id")
-            shift_name = shifts.get("shift").get("name")
-            shift_group_id = shifts.get("shiftGroup").get("id")
-            shift_group_name = shifts.get("shiftGroup").get("name")
-            position_id = shifts.get("position").get("id")
-            position_name = shifts.get("position").get("name")
-            unit_id = shifts.get("unit").get("id")
-            unit_name = shifts.get("unit").get("name")
-
-            for message in messages:
-                shift_requests.append(
-                    {
-                        "metadata": {
-                            "request date": date_on,
-                            "shift_id":shift_id,
-                            "shift_name": shift_name,
-                            "shift_group_id": shift_group_id,
-                            "shift_group_name": shift_group_name,
-                            "position_id": position_id,
-                            "position_name": position_name,
-                            "unit_id": unit_id,
-                            "unit_name": unit_name
-                        },
-                        "request messages": message
-                        }
-                )
+            # one slot per shift, shared by all of its request messages
+            slot = ShiftSlot.from_api(date_on, shifts)
+            shift_requests.extend(ShiftRequest(slot, message) for message in messages)
         return shift_requests
 
     # --------------------------------------------------------------------------
@@ -197,6 +773,11 @@ class slxxManager:
 
         if hasattr(response, "status_code"):
             if response.status_code in [200, 204]:
+                day = parse_day(date_on)
+                inboxes = self.alias_pending_inboxes()
+                for inbox in inboxes:
+                    inbox.remove_shift_message(day, message_id)
+                self.record_change(inboxes)
                 return {"status": "success", "data": response.json() if response.status_code == 200 else None}
             else:
                 return {
@@ -209,70 +790,154 @@ class slxxManager:
     # PTO Requests
     # --------------------------------------------------------------------------
     
-    def get_pto_requests(self, org_level_id, start_date, end_date):
+    def get_pto_requests(self, org_level_id, start_date, end_date, statuses=None,
+                         exclude_statuses=CLOSED_PTO_STATUSES, limit=None):
+        """
+        Leave requests in the date range, pending ones by default.
+        Filters are applied by the server and again here for servers that ignore them,
+        paging stops once limit requests matched.
+        Pending requests come from the department inbox when it is fresh and covers the range.
+        """
         logger = logging.getLogger(__name__)
-        response = self.api.get_pto_requests(org_level_id, start_date, end_date)
-        logger.info(f"PTO request API response: {response}")
-        response_data = response.get("data", {})
-        if not response_data:
-            return []
-        requests = response_data.get("requests", [])
-        if not requests:
-            return []
-        pto_requests = []
+        if statuses is None and tuple(exclude_statuses or ()) == CLOSED_PTO_STATUSES:
+            inbox = self.get_pending_inbox(org_level_id)
+            if inbox is not None:
+                pto_requests = inbox.pto_between(parse_day(start_date), parse_day(end_date))
+                if pto_requests is not None:
+                    logger.info(f"PTO requests {start_date}..{end_date} served from the pending inbox")
+                    pto_requests = pto_requests[:limit] if limit else pto_requests
+                    return self.summarize_pto_requests(org_level_id, pto_requests)
 
-        for request in requests:
-            if request.get("status") == "Denied" or request.get("status") == "Approved":
-                continue
-            pto_requests.append(
-                {
-                    "leave_request_id": request.get("id"),
-                    "employee_id": request.get("employee").get("id"),
-                    "employee_name": request.get("employee").get("name"),
-                    "department_id": request.get("department").get("id"),
-                    "department_name": request.get("department").get("name"),
-                    "position_id": request.get("position").get("id"),
-                    "position_name": request.get("position").get("name"),
-                    "start": request.get("start"),
-                    "end": request.get("end"),
-                    "reason": request.get("reason"),
-                    "status": request.get("status"),
-                    "accruals": request.get("accruals")
-                }
-            )
+        pto_requests = self.fetch_pto_requests(org_level_id, start_date, end_date, statuses, exclude_statuses, limit)
+        self.add_department_reader(org_level_id)
+        return self.summarize_pto_requests(org_level_id, pto_requests)
+
+    def fetch_pto_requests(self, org_level_id, start_date, end_date, statuses=None,
+                           exclude_statuses=CLOSED_PTO_STATUSES, limit=None):
+        logger = logging.getLogger(__name__)
+        pto_requests = []
+        scanned = 0
+        pages = self.api.iter_pto_requests(
+            org_level_id, start_date, end_date,
+            statuses=statuses,
+            exclude_statuses=exclude_statuses,
+            page_size=self.local_config.pto_page_size
+        )
+        try:
+            for request in pages:
+                scanned += 1
+                status = request.get("status")
+                if statuses and status not in statuses:
+                    continue
+                if exclude_statuses and status in exclude_statuses:
+                    continue
+                pto_requests.append(PTORequest.from_api(request))
+                if limit and len(pto_requests) >= limit:
+                    break
+        finally:
+            pages.close()
+        logger.info(f"PTO request API response: {scanned} requests, {len(pto_requests)} kept")
         return pto_requests
     
+    def summarize_pto_requests(self, org_level_id, pto_requests, fetch=False):
+        """
+        Fill in shift_count and remaining_balance of requests that have none
+        yet from their detail days.
+
+        List calls pass fetch=False and only use details already in the detail
+        cache, the other requests keep None. The inbox refresher passes
+        fetch=True to fetch the missing details concurrently (bounded by
+        pto.summary_concurrency) for at most pto.summary_max_requests requests.
+        Requests without details keep the balance of their accruals.
+        """
+        logger = logging.getLogger(__name__)
+        pending = [r for r in pto_requests if r.shift_count is None]
+        if not pending:
+            return pto_requests
+
+        if not fetch:
+            cache = self.get_pto_detail_cache()
+            cached = []
+            for request in pending:
+                key = self.pto_detail_key(org_level_id, request.leave_request_id)
+                details = cache.get(key) if key is not None else None
+                if details is not None:
+                    cached.append((request, details))
+            if cached:
+                apply_aggregates([r for r, _ in cached], [d for _, d in cached])
+            logger.info(f"PTO summary: {len(cached)} of {len(pending)} requests aggregated from cached details")
+            return pto_requests
+
+        pending = pending[:self.local_config.pto_summary_max_requests]
+
+        def fetch(request):
+            try:
+                return self.get_cached_pto_request_detail(org_level_id, request.leave_request_id)
+            except Exception as e:
+                logger.warning(f"PTO request {request.leave_request_id} details for the summary failed: {e}")
+                return None
+
+        workers = max(1, min(self.local_config.pto_summary_concurrency, len(pending)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pto-summary") as pool:
+            fetched = [(r, d) for r, d in zip(pending, pool.map(fetch, pending)) if d is not None]
+        if fetched:
+            apply_aggregates([r for r, _ in fetched], [d for _, d in fetched])
+        logger.info(f"PTO summary: {len(fetched)} of {len(pending)} requests aggregated")
+        return pto_requests
+
+    def get_pto_detail_cache(self) -> LRUCache:
+        alias = self.api.alias
+        cache = _pto_details.get(alias)
+        if cache is None:
+            with _employee_directories_lock:
+                cache = _pto_details.setdefault(alias, LRUCache(
+                    self.local_config.pto_detail_cache_size,
+                    self.local_config.pto_detail_cache_ttl
+                ))
+        return cache
+
+    def pto_detail_key(self, org_level_id, leave_request_id) -> str:
+        # a change to any of the alias's requests can move balances, the version drops older days
+        version = self.data_version()
+        if version is None:
+            return None
+        return f"{org_level_id}:{leave_request_id}:{version}"
+
+    def get_cached_pto_request_detail(self, org_level_id, leave_request_id):
+        cache = self.get_pto_detail_cache()
+        key = self.pto_detail_key(org_level_id, leave_request_id)
+        pto_details = cache.get(key) if key is not None else None
+        if pto_details is None:
+            pto_details = self.fetch_pto_request_detail(org_level_id, leave_request_id)
+            if key is not None:
+                cache.set(key, pto_details)
+        return pto_details
+
     def get_pto_request_detail(self, org_level_id, leave_request_id):
+        cache = self.get_pto_detail_cache()
+        key = self.pto_detail_key(org_level_id, leave_request_id)
+        # days cached for the summary are only served to readers of the department
+        if key is not None and self.is_department_reader(org_level_id):
+            pto_details = cache.get(key)
+            if pto_details is not None:
+                return pto_details
+        pto_details = self.fetch_pto_request_detail(org_level_id, leave_request_id)
+        if key is not None:
+            cache.set(key, pto_details)
+        self.add_department_reader(org_level_id)
+        return pto_details
+
+    def fetch_pto_request_detail(self, org_level_id, leave_request_id):
         response = self.api.get_pto_request_detail(org_level_id, leave_request_id)
         logger = logging.getLogger(__name__)
-        logger.info(f"PTO request Detail API response: {response}")
         response_data = response.get("data")
         if not response_data:
             return []
         details = response_data.get("details")
-        pto_details = []
         if not details:
             return []
-        for pto in details:
-            pto_details.append(
-                {
-                    "date": pto.get("date"),
-                    "shift_id": pto.get("shift").get("id"),
-                    "shift_name": pto.get("shift").get("name"),
-                    "shift_start": pto.get("shift").get("start"),
-                    "shift_end": pto.get("shift").get("end"),
-                    "shift_duration": pto.get("shift").get("duration"),
-                    "unit_id": pto.get("unit").get("id"),
-                    "unit_name": pto.get("unit").get("name"),
-                    "absence_code": pto.get("absenceReason").get("code"),
-                    "absence_description": pto.get("absenceReason").get("description"),
-                    "isAccruaBalanceAvailable": pto.get("isAccruaBalanceAvailable"),
-                    "accrualBalance": pto.get("accrualBalance"),
-                    "approvedAbsences": pto.get("approvedAbsences"),
-                    "submittedAbsences": pto.get("submittedAbsences"),
-
-                }
-            )
+        pto_details = [PTORequestDetail.from_api(pto) for pto in details]
+        logger.info(f"PTO request Detail API response: {len(pto_details)} days")
         return pto_details
         
     
@@ -292,6 +957,10 @@ class slxxManager:
 
         if hasattr(response, "status_code"):
             if response.status_code in [200, 204]:
+                inbox = _pending_inboxes.get((self.api.alias, org_level_id))
+                if inbox is not None:
+                    inbox.remove_pto(leave_request_id)
+                self.record_change([inbox] if inbox is not None else [])
                 return {"status": "success", "data": response.json() if response.status_code == 200 else None}
             else:
                 return {
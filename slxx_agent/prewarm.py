@@ -0,0 +1,63 @@
+import importlib
+import logging
+import threading
+import time
+
+from slxx_agent.config.local_config import LocalConfig
+from slxx_agent.manager.slxx_manager import preload_employee_snapshots
+
+# imported on first use by the chat path, loaded here ahead of the first turn
+HEAVY_MODULES = (
+    "langchain_core.messages",
+    "langchain.callbacks.base",
+    "langchain_openai",
+    "kgraphplanner.agent.kg_planning_agent",
+    "kgraphplanner.tool_manager.tool_manager",
+    "opik",
+    "opik.integrations.langchain",
+    "slxx_agent.agent.logging_handler",
+    "slxx_agent.tools.get_shift_requests",
+    "slxx_agent.tools.search_employees_tool",
+    "slxx_agent.tools.approve_deny_shift_request",
+    "slxx_agent.tools.get_pto_requests",
+    "slxx_agent.tools.approve_deny_pto_request",
+    "slxx_agent.tools.get_pto_request_detail",
+    "slxx_agent.tools.get_employee_details",
+    "slxx_agent.tools.resolve_dates",
+    "datasketch",
+    "rapidfuzz",
+)
+
+
+def prewarm(local_config: LocalConfig):
+    """
+    Import the deferred modules and map the employee snapshots.
+    A module that fails to import is logged and left to fail on first use.
+    """
+    logger = logging.getLogger(__name__)
+    started = time.perf_counter()
+    for module_name in HEAVY_MODULES:
+        module_started = time.perf_counter()
+        try:
+            importlib.import_module(module_name)
+        except Exception as e:
+            logger.warning(f"Prewarm import of {module_name} failed: {e}")
+            continue
+        logger.debug(f"Prewarmed {module_name} in {time.perf_counter() - module_started:.3f}s")
+
+    preload_employee_snapshots(local_config)
+    logger.info(f"Prewarm finished in {time.perf_counter() - started:.2f}s")
+
+
+def start_prewarm(local_config: LocalConfig) -> threading.Thread:
+    """
+    Prewarm in a background thread once the server is up, so /health answers
+    before the heavy imports are done.
+    """
+    def run():
+        time.sleep(local_config.prewarm_delay)
+        prewarm(local_config)
+
+    thread = threading.Thread(target=run, name="prewarm", daemon=True)
+    thread.start()
+    return thread
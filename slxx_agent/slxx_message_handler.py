@@ -11,9 +11,14 @@ from starlette.websockets import WebSocket
 from vital_agent_container.handler.aimp_message_handler_inf import AIMPMessageHandlerInf
 from vital_ai_vitalsigns.utils.uri_generator import URIGenerator
 from vital_ai_vitalsigns.vitalsigns import VitalSigns
+from slxx_agent.aimp_properties import (
+    TURN_TIMEOUT_PROPERTY, SESSION_STATE_PROPERTY, ACCEPT_ENCODING_PROPERTY, message_property
+)
+from slxx_agent.agent.admission_controller import AdmissionController, AdmissionRejected
 from slxx_agent.agent.agent_context import AgentContext
 from slxx_agent.agent.agent_impl import AgentImpl
 from slxx_agent.agent.agent_state_impl import AgentStateImpl
+from slxx_agent.agent.turn_deadline import TurnDeadline
 from slxx_agent.api.slxx_api import slxxAPI
 from slxx_agent.config.local_config import LocalConfig
 from slxx_agent.manager.slxx_manager import slxxManager
@@ -28,8 +33,34 @@ class slxxMessageHandler(AIMPMessageHandlerInf):
         self.app_home = app_home
 
         self.local_config = LocalConfig(app_home)
-        self.api = None
-        self.manager = None
+
+        # shared across all websocket connections handled by this worker
+        self.admission = AdmissionController.from_config(self.local_config)
+
+    def get_turn_timeout(self, message_json: dict) -> float:
+        logger = logging.getLogger(__name__)
+        timeout = self.local_config.turn_timeout
+        value = message_property(message_json, TURN_TIMEOUT_PROPERTY)
+        if value is not None:
+            try:
+                timeout = float(value)
+            except ValueError:
+                logger.warning(f"Ignoring invalid turn timeout: {value}")
+        return max(1.0, min(timeout, self.local_config.turn_max_timeout))
+
+    def wants_server_session(self, message_json: dict) -> bool:
+        value = message_property(message_json, SESSION_STATE_PROPERTY)
+        return (
+            self.local_config.session_store_enabled and value is not None
+            and value.lower() == "server"
+        )
+
+    def get_accept_encoding(self, message_json: dict) -> tuple:
+        value = message_property(message_json, ACCEPT_ENCODING_PROPERTY)
+        if value is None or self.local_config.transport_compression == "none":
+            return ()
+        offered = {e.strip().lower() for e in value.split(",")}
+        return tuple(e for e in (self.local_config.transport_compression,) if e in offered)
 
     async def process_message(self, config, client: httpx.AsyncClient, websocket: WebSocket, data: str,
                               started_event: asyncio.Event):
@@ -57,6 +88,8 @@ class slxxMessageHandler(AIMPMessageHandlerInf):
             if len(message_list) > 0:
 
                 aimp_message: AIMPMessage = message_list[0]
+                # protocol extension properties are read from the message as sent
+                message_json = json_list[0]
 
                 if not aimp_message.jwtEncodedString:
                     await websocket.close(code=1011, reason=json.dumps({'code': 401, 'error': 'Unauthenticated.'}))
@@ -86,9 +119,13 @@ class slxxMessageHandler(AIMPMessageHandlerInf):
                         user_text = go.text
                         message_text = str(user_text)
 
-                self.api = slxxAPI(self.local_config, jwt_token)
+                deadline = TurnDeadline(self.get_turn_timeout(message_json))
+
+                # per turn, the handler is shared by concurrent connections
+                api = slxxAPI(self.local_config, jwt_token)
+                api.deadline = deadline
 
-                self.manager = slxxManager(self.local_config, self.api, message_text)
+                manager = slxxManager(self.local_config, api, message_text)
 
                 # these come from message
                 # account_id = "urn:account_123"
@@ -120,7 +157,10 @@ class slxxMessageHandler(AIMPMessageHandlerInf):
                     username=username,
                     org_level_id=org_level_id,
                     orgleveltype=orgleveltype,
-                    context_data=[]
+                    context_data=[],
+                    deadline=deadline,
+                    server_session=self.wants_server_session(message_json),
+                    accept_encoding=self.get_accept_encoding(message_json)
                 )
 
                 agent_state = AgentStateImpl(message_list)
@@ -130,8 +170,15 @@ class slxxMessageHandler(AIMPMessageHandlerInf):
                     intent_type = str(aimp_message.aIMPIntentType)
 
                     if intent_type == "http://vital.ai/ontology/vital-aimp#AIMPIntentType_CHAT":
-                        await self.agent.handle_chat_message(self.manager, websocket, started_event,
-                                                             agent_context, message_list)
+                        try:
+                            async with self.admission.admit(alias, timeout=min(self.local_config.turn_queue_timeout,
+                                                                               deadline.remaining())):
+                                await self.agent.handle_chat_message(manager, websocket, started_event,
+                                                                     agent_context, message_list)
+                        except AdmissionRejected as e:
+                            logger.warning(f"Chat turn rejected for alias {alias}: {e.reason}")
+                            busy_message = "The agent is busy handling other requests right now. Please retry in a few seconds."
+                            await self.agent.handle_error_message(websocket, started_event, busy_message)
                         return
 
             # handle unknown type
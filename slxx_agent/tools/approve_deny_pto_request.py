@@ -7,6 +7,7 @@ from kgraphplanner.tool_manager.tool_response import ToolResponse
 from langchain_core.tools import tool
 
 from slxx_agent.agent.agent_context import AgentContext
+from slxx_agent.api.resilience import slxxAPIError
 from slxx_agent.manager.slxx_manager import slxxManager
 
 class PtoRequestResponse(TypedDict):
@@ -35,12 +36,16 @@ class ApproveDenyPTORequest(AbstractTool):
         org_level_id = self.agent_context.org_level_id
 
         # Fetch schedule hours data with optional filters
-        response = self.manager.approve_deny_pto_request(
-            org_level_id=org_level_id,
-            leave_request_id=leave_request_id,
-            request_for=request_for, 
-            comment=comment
-        )
+        try:
+            response = self.manager.approve_deny_pto_request(
+                org_level_id=org_level_id,
+                leave_request_id=leave_request_id,
+                request_for=request_for,
+                comment=comment
+            )
+        except slxxAPIError as e:
+            logger.error(f"Approve Deny failed: {e}")
+            return ToolResponse(parameters={"results": e.to_tool_error()})
         logger.info(f"Approve Deny Response: {response}")
         # Build the ToolResponse
         tool_response = ToolResponse()
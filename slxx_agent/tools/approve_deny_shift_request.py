@@ -7,6 +7,7 @@ from kgraphplanner.tool_manager.tool_response import ToolResponse
 from langchain_core.tools import tool
 
 from slxx_agent.agent.agent_context import AgentContext
+from slxx_agent.api.resilience import slxxAPIError
 from slxx_agent.manager.slxx_manager import slxxManager
 
 class ShiftRequestResponse(TypedDict):
@@ -56,15 +57,19 @@ class ApproveDenyShiftRequest(AbstractTool):
             )
 
         # Fetch schedule hours data with optional filters
-        response = self.manager.approve_deny_shift_request(
-            date_on=date_on,
-            request_for=request_for, 
-            employee_id=employee_id, 
-            shift_id=shift_id, 
-            unit_id=unit_id, 
-            position_id=position_id, 
-            message_id=message_id
-        )
+        try:
+            response = self.manager.approve_deny_shift_request(
+                date_on=date_on,
+                request_for=request_for,
+                employee_id=employee_id,
+                shift_id=shift_id,
+                unit_id=unit_id,
+                position_id=position_id,
+                message_id=message_id
+            )
+        except slxxAPIError as e:
+            logger.error(f"Approve Deny failed: {e}")
+            return ToolResponse(parameters={"results": e.to_tool_error()})
         logger.info(f"Approve Deny Response: {response}")
         # Build the ToolResponse
         tool_response = ToolResponse()
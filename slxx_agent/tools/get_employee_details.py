@@ -0,0 +1,84 @@
+import logging
+from typing import Callable, TypedDict, Optional, List, Dict, Any
+from kgraphplanner.tool_manager.abstract_tool import AbstractTool
+from kgraphplanner.tool_manager.tool_request import ToolRequest
+from kgraphplanner.tool_manager.tool_response import ToolResponse
+from langchain_core.tools import tool
+
+from slxx_agent.agent.agent_context import AgentContext
+from slxx_agent.api.resilience import slxxAPIError
+from slxx_agent.manager.slxx_manager import slxxManager
+
+class EmployeeDetail(TypedDict):
+    """Short info of an employee."""
+    employee_id: str
+    employee_name: str
+    employee_type: str
+    hire_date: str
+    employee_email: str
+
+class GetEmployeeDetails(AbstractTool):
+
+    def __init__(self, config, manager: slxxManager, agent_context: AgentContext):
+        super().__init__(config)
+        self.manager = manager
+        self.agent_context = agent_context
+
+    def handle_request(self, tool_request: ToolRequest) -> ToolResponse:
+        logger = logging.getLogger(__name__)
+
+        # Get parameters from the request
+        employee_ids = tool_request.get_parameter('employee_ids') or []
+
+        # Fetch all employees in one batch
+        try:
+            employees = self.manager.get_employees(employee_ids)
+        except slxxAPIError as e:
+            logger.error(f"Employee Details failed: {e}")
+            return ToolResponse(parameters={"results": e.to_tool_error()})
+
+        employee_details = [
+            emp_map if emp_map is not None else {"employee_id": employee_id, "error": "Employee not found"}
+            for employee_id, emp_map in employees.items()
+        ]
+        logger.info(f"Employee Details Response: {employee_details}")
+        # Build the ToolResponse
+        tool_response = ToolResponse()
+        tool_response.add_parameter("results", employee_details)
+        employee_details_tool_data = {
+            "type": "Employee Details Data",
+            "Data": employee_details
+        }
+        self.agent_context.context_data.append(employee_details_tool_data)
+        return tool_response
+
+    def get_sample_text(self) -> str:
+        return "Get Employee Details"
+
+    def get_tool_function(self) -> Callable:
+
+        @tool
+        def get_employee_details(
+            employee_ids: List[int]
+        ) -> List[EmployeeDetail]:
+            """
+            Use this tool to retrieve short info (name, type, hire date, email) for one or more employees.
+            Pass all employee ids you need in a single call instead of calling the tool once per employee.
+
+            Args:
+                employee_ids: List of employee ids - REQUIRED
+
+            Returns:
+                List[EmployeeDetail]
+            """
+            params = {
+                'employee_ids': employee_ids
+            }
+
+            tool_request = ToolRequest(parameters=params)
+            tool_response = self.handle_request(tool_request)
+            results = tool_response.get_parameter("results")
+
+            return results
+
+        return get_employee_details
@@ -6,6 +6,9 @@ from kgraphplanner.tool_manager.tool_response import ToolResponse
 from langchain_core.tools import tool
 
 from slxx_agent.agent.agent_context import AgentContext
+from slxx_agent.agent.table_renderer import render_pto_request_detail, table_ref
+from slxx_agent.api.resilience import slxxAPIError
+from slxx_agent.manager.models import to_dicts
 from slxx_agent.manager.slxx_manager import slxxManager
 
 class PTORequestDetailMetadata(TypedDict):
@@ -59,11 +62,15 @@ class GetPTORequestDetail(AbstractTool):
         org_level_id = self.agent_context.org_level_id
 
         # Fetch schedule hours data with optional filters
-        pto_requests = self.manager.get_pto_request_detail(
-            org_level_id=org_level_id,
-            leave_request_id=leave_request_id
-        )
-        logger.info(f"PTO Requests Details Response: {pto_requests}")
+        try:
+            pto_requests = to_dicts(self.manager.get_pto_request_detail(
+                org_level_id=org_level_id,
+                leave_request_id=leave_request_id
+            ))
+        except slxxAPIError as e:
+            logger.error(f"PTO Request Details failed: {e}")
+            return ToolResponse(parameters={"results": e.to_tool_error()})
+        logger.info(f"PTO Requests Details Response: {len(pto_requests)} days")
 
         pto_request_detail = {
               "metadata": {
@@ -77,7 +84,11 @@ class GetPTORequestDetail(AbstractTool):
         }
         # Build the ToolResponse
         tool_response = ToolResponse()
-        tool_response.add_parameter("results", pto_request_detail)
+        if self.manager.local_config.render_tables:
+            table_id = self.agent_context.add_table(render_pto_request_detail(pto_request_detail))
+            tool_response.add_parameter("results", {"table": table_ref(table_id), **pto_request_detail})
+        else:
+            tool_response.add_parameter("results", pto_request_detail)
         pto_requests_tool_data = {
             "type": "PTO Request Details Data",
             "Data": pto_request_detail
@@ -6,7 +6,10 @@ from kgraphplanner.tool_manager.tool_response import ToolResponse
 from langchain_core.tools import tool
 
 from slxx_agent.agent.agent_context import AgentContext
-from slxx_agent.manager.slxx_manager import slxxManager
+from slxx_agent.agent.table_renderer import render_pto_requests, table_ref
+from slxx_agent.api.resilience import slxxAPIError
+from slxx_agent.manager.models import to_dicts
+from slxx_agent.manager.slxx_manager import slxxManager, CLOSED_PTO_STATUSES
 
 class PTORequests(TypedDict):
     """Structure for schedule data grouped by position, shift, and unit."""
@@ -22,6 +25,8 @@ class PTORequests(TypedDict):
     reason: str
     status: str
     accruals: list
+    shift_count: Optional[int]
+    remaining_balance: Optional[float]
 
 class GetPTORequests(AbstractTool):
 
@@ -36,20 +41,41 @@ class GetPTORequests(AbstractTool):
         # Get parameters from the request
         start_date = tool_request.get_parameter('start_date')
         end_date = tool_request.get_parameter('end_date')
+        status = tool_request.get_parameter('status') or 'pending'
+        limit = tool_request.get_parameter('limit') or self.manager.local_config.pto_default_limit
+
+        # pending means anything not yet approved or denied
+        if status.lower() == 'pending':
+            statuses, exclude_statuses = None, CLOSED_PTO_STATUSES
+        elif status.lower() == 'all':
+            statuses, exclude_statuses = None, None
+        else:
+            statuses, exclude_statuses = (status.capitalize(),), None
 
         # Get the current org level ID from context
         org_level_id = self.agent_context.org_level_id
 
         # Fetch schedule hours data with optional filters
-        pto_requests = self.manager.get_pto_requests(
-            org_level_id=org_level_id,
-            start_date=start_date,
-            end_date=end_date
-        )
-        logger.info(f"PTO Requests Response: {pto_requests}")
+        try:
+            pto_requests = to_dicts(self.manager.get_pto_requests(
+                org_level_id=org_level_id,
+                start_date=start_date,
+                end_date=end_date,
+                statuses=statuses,
+                exclude_statuses=exclude_statuses,
+                limit=limit
+            ))
+        except slxxAPIError as e:
+            logger.error(f"PTO Requests failed: {e}")
+            return ToolResponse(parameters={"results": e.to_tool_error()})
+        logger.info(f"PTO Requests Response: {len(pto_requests)} requests")
         # Build the ToolResponse
         tool_response = ToolResponse()
-        tool_response.add_parameter("results", pto_requests)
+        if self.manager.local_config.render_tables:
+            table_id = self.agent_context.add_table(render_pto_requests(pto_requests))
+            tool_response.add_parameter("results", {"table": table_ref(table_id), "requests": pto_requests})
+        else:
+            tool_response.add_parameter("results", pto_requests)
         pto_requests_tool_data = {
             "type": "PTO Requests Response Data",
             "Data": pto_requests
@@ -64,22 +90,27 @@ class GetPTORequests(AbstractTool):
 
         @tool
         def get_pto_requests(
-            start_date: str, end_date: str
+            start_date: str, end_date: str, status: Optional[str] = None, limit: Optional[int] = None
         ) -> List[PTORequests]:
             """
             Use this tool to retrieve PTO requests submitted by employees(This will return just the list of PTO requests, details can be taken from another tool). If only one date is given then start date and end date will be the same.
+            shift_count (shifts it covers) and remaining_balance are filled in when known and null otherwise, do not fetch details just to count shifts.
             Always use date in MM-DD-YYYY format
             
             Args:
                 start_date: Start date for PTO requests (MM-DD-YYYY) - REQUIRED
                 end_date: End date for PTO requests (MM-DD-YYYY) - REQUIRED
+                status: "pending" (default), "approved", "denied" or "all"
+                limit: Maximum number of requests to return, only pass a larger value when the user asks for more
 
             Returns:
                 List[PTORequests]
             """
             params = {
                 'start_date': start_date,
-                'end_date': end_date
+                'end_date': end_date,
+                'status': status,
+                'limit': limit
             }
             
             # Filter out None values
@@ -6,6 +6,9 @@ from kgraphplanner.tool_manager.tool_response import ToolResponse
 from langchain_core.tools import tool
 
 from slxx_agent.agent.agent_context import AgentContext
+from slxx_agent.agent.table_renderer import render_shift_requests, table_ref
+from slxx_agent.api.resilience import slxxAPIError
+from slxx_agent.manager.models import to_dicts
 from slxx_agent.manager.slxx_manager import slxxManager
 
 class ShiftRequests(TypedDict):
@@ -38,14 +41,22 @@ class GetShiftRequests(AbstractTool):
         org_level_id = self.agent_context.org_level_id
 
         # Fetch schedule hours data with optional filters
-        schedule_data = self.manager.get_shift_requests(
-            date_on=date_on,
-            org_level_id=org_level_id
-        )
-        logger.info(f"Shift Request Response: {schedule_data}")
+        try:
+            schedule_data = to_dicts(self.manager.get_shift_requests(
+                date_on=date_on,
+                org_level_id=org_level_id
+            ))
+        except slxxAPIError as e:
+            logger.error(f"Shift Requests failed: {e}")
+            return ToolResponse(parameters={"results": e.to_tool_error()})
+        logger.info(f"Shift Request Response: {len(schedule_data)} requests")
         # Build the ToolResponse
         tool_response = ToolResponse()
-        tool_response.add_parameter("results", schedule_data)
+        if self.manager.local_config.render_tables:
+            table_id = self.agent_context.add_table(render_shift_requests(schedule_data))
+            tool_response.add_parameter("results", {"table": table_ref(table_id), "requests": schedule_data})
+        else:
+            tool_response.add_parameter("results", schedule_data)
         schedule_tool_data = {
             "type": "Staff Request Response Data",
             "Data": schedule_data
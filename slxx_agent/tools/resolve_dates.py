@@ -0,0 +1,75 @@
+import logging
+from typing import Callable, TypedDict, Optional, List, Dict, Any
+from kgraphplanner.tool_manager.abstract_tool import AbstractTool
+from kgraphplanner.tool_manager.tool_request import ToolRequest
+from kgraphplanner.tool_manager.tool_response import ToolResponse
+from langchain_core.tools import tool
+
+from slxx_agent.agent.agent_context import AgentContext
+from slxx_agent.agent.date_resolver import resolve_date_phrases
+from slxx_agent.manager.slxx_manager import slxxManager
+
+class ResolvedDates(TypedDict):
+    """A date phrase resolved against the current shift week."""
+    phrase: str
+    start_date: str
+    end_date: str
+    day: Optional[str]
+
+class ResolveDates(AbstractTool):
+
+    def __init__(self, config, manager: slxxManager, agent_context: AgentContext):
+        super().__init__(config)
+        self.manager = manager
+        self.agent_context = agent_context
+
+    def handle_request(self, tool_request: ToolRequest) -> ToolResponse:
+        logger = logging.getLogger(__name__)
+
+        # Get parameters from the request
+        phrases = tool_request.get_parameter('phrases') or []
+
+        # no slxx calls, the phrases resolve in code against today's shift week
+        resolved_dates = []
+        for phrase in phrases:
+            resolved = resolve_date_phrases(phrase)
+            if resolved:
+                resolved_dates.extend(r.to_dict() for r in resolved)
+            else:
+                resolved_dates.append({"phrase": phrase, "error": "Not a date phrase this tool can resolve"})
+        logger.info(f"Resolved Dates: {resolved_dates}")
+        # Build the ToolResponse
+        tool_response = ToolResponse()
+        tool_response.add_parameter("results", resolved_dates)
+        return tool_response
+
+    def get_sample_text(self) -> str:
+        return "Resolve Dates"
+
+    def get_tool_function(self) -> Callable:
+
+        @tool
+        def resolve_dates(
+            phrases: List[str]
+        ) -> List[ResolvedDates]:
+            """
+            Use this tool to turn relative date phrases ("tomorrow", "next Monday", "last week", "this month", "May 20") into concrete dates using the Sunday to Saturday shift week.
+            Pass every phrase you need in a single call. Dates in the user's current message are already resolved in the system prompt; use this tool for other phrases.
+
+            Args:
+                phrases: List of date phrases - REQUIRED
+
+            Returns:
+                List[ResolvedDates] with dates in MM-DD-YYYY format, start_date equals end_date for a single day
+            """
+            params = {
+                'phrases': phrases
+            }
+
+            tool_request = ToolRequest(parameters=params)
+            tool_response = self.handle_request(tool_request)
+            results = tool_response.get_parameter("results")
+
+            return results
+
+        return resolve_dates
@@ -6,6 +6,7 @@ from kgraphplanner.tool_manager.tool_response import ToolResponse
 from langchain_core.tools import tool
 
 from slxx_agent.agent.agent_context import AgentContext
+from slxx_agent.api.resilience import slxxAPIError
 from slxx_agent.manager.slxx_manager import slxxManager
 
 
@@ -43,7 +44,13 @@ class SearchEmployeesTool(AbstractTool):
         tool_response = ToolResponse()
 
 
-        top_matches = self.manager.find_employees(employee_search_string)
+        try:
+            top_matches = self.manager.find_employees(employee_search_string,
+                                                      org_level_id=self.agent_context.org_level_id)
+        except slxxAPIError as e:
+            logger.error(f"Employee search failed: {e}")
+            tool_response.add_parameter("results", e.to_tool_error())
+            return tool_response
 
         if top_matches:
             employee_search_list = []
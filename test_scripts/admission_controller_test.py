@@ -0,0 +1,112 @@
+import asyncio
+import os
+import sys
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+from slxx_agent.agent.admission_controller import AdmissionController, AdmissionRejected
+
+
+async def turn(admission, alias, order, release: asyncio.Event, timeout=None):
+    async with admission.admit(alias, timeout):
+        order.append(alias)
+        await release.wait()
+
+
+async def test_fairness():
+    admission = AdmissionController(max_concurrent=1, max_per_alias=1, max_queued_per_alias=8)
+    order = []
+    releases = []
+
+    def start(alias):
+        releases.append(asyncio.Event())
+        return asyncio.create_task(turn(admission, alias, order, releases[-1]))
+
+    # a busy tenant queues four turns before a quiet one queues two
+    tasks = [start("busy")]
+    await asyncio.sleep(0)
+    tasks += [start("busy") for _ in range(4)] + [start("quiet") for _ in range(2)]
+    await asyncio.sleep(0)
+    assert admission.stats()["queued"] == 6
+
+    for release in releases:
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    assert order == ["busy", "quiet", "busy", "quiet", "busy", "busy", "busy"], order
+    assert admission.stats() == {"active": 0, "queued": 0, "active_by_alias": {}, "queued_by_alias": {}}
+    print("fair dispatch: ok")
+
+
+async def test_rejection():
+    admission = AdmissionController(max_concurrent=1, max_per_alias=1, max_queued_per_alias=1, queue_timeout=0.05)
+    release = asyncio.Event()
+    running = asyncio.create_task(turn(admission, "a", [], release))
+    await asyncio.sleep(0)
+    waiting = asyncio.create_task(turn(admission, "a", [], release))
+    await asyncio.sleep(0)
+
+    try:
+        await turn(admission, "a", [], release)
+        raise AssertionError("a full alias queue must reject")
+    except AdmissionRejected as e:
+        assert e.reason == "queue full"
+
+    try:
+        await waiting
+        raise AssertionError("the waiter must time out")
+    except AdmissionRejected as e:
+        assert e.reason == "queue timeout"
+    assert admission.stats()["queued"] == 0, "timed out waiters leave the queue"
+
+    release.set()
+    await running
+    assert admission.stats()["active"] == 0
+    print("rejection: ok")
+
+
+async def test_cancellation():
+    admission = AdmissionController(max_concurrent=1, max_per_alias=1)
+    release = asyncio.Event()
+    running = asyncio.create_task(turn(admission, "a", [], release))
+    await asyncio.sleep(0)
+
+    # a client that goes away while queued gives up its place
+    waiting = asyncio.create_task(turn(admission, "b", [], release))
+    await asyncio.sleep(0)
+    waiting.cancel()
+    await asyncio.gather(waiting, return_exceptions=True)
+    assert admission.stats()["queued"] == 0
+
+    # a waiter cancelled in the tick its slot was granted hands the slot back,
+    # or runs its turn when asyncio.wait_for already took the grant (3.11)
+    release.set()
+    await running
+    holder = admission.admit("a")
+    await holder.__aenter__()
+    granted_release = asyncio.Event()
+    granted = asyncio.create_task(turn(admission, "c", [], granted_release))
+    await asyncio.sleep(0)
+    await holder.__aexit__(None, None, None)
+    granted.cancel()
+    granted_release.set()
+    await asyncio.gather(granted, return_exceptions=True)
+    assert admission.stats() == {"active": 0, "queued": 0, "active_by_alias": {}, "queued_by_alias": {}}, admission.stats()
+
+    order = []
+    done = asyncio.Event()
+    done.set()
+    await turn(admission, "b", order, done)
+    assert order == ["b"], "slots of cancelled turns are free again"
+    print("cancellation cleanup: ok")
+
+
+def main():
+    print('Test admission controller')
+    asyncio.run(test_fairness())
+    asyncio.run(test_rejection())
+    asyncio.run(test_cancellation())
+
+
+if __name__ == "__main__":
+    main()
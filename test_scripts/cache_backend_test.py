@@ -0,0 +1,142 @@
+import multiprocessing
+import os
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+from slxx_agent.manager.cache_backend import MemoryBackend, SharedMemoryBackend, RedisBackend
+
+
+class RedisStandIn(socketserver.ThreadingTCPServer):
+    """
+    Local stand-in speaking enough RESP for the cache backend: GET, SET [PX], DEL, PING, SELECT.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+        super().__init__(("127.0.0.1", 0), RedisHandler)
+
+
+class RedisHandler(socketserver.StreamRequestHandler):
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        count = int(line[1:-2])
+        args = []
+        for _ in range(count):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        store = self.server
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+            name = args[0].upper()
+            with store.lock:
+                if name == b"GET":
+                    value, expires_at = store.data.get(args[1], (None, None))
+                    if value is None or (expires_at and expires_at <= time.time()):
+                        reply = b"$-1\r\n"
+                    else:
+                        reply = b"$%d\r\n%s\r\n" % (len(value), value)
+                elif name == b"SET":
+                    expires_at = None
+                    if len(args) > 3 and args[3].upper() == b"PX":
+                        expires_at = time.time() + int(args[4]) / 1000
+                    store.data[args[1]] = (args[2], expires_at)
+                    reply = b"+OK\r\n"
+                elif name in (b"INCR", b"INCRBY"):
+                    value = int(store.data.get(args[1], (b"0", None))[0])
+                    value += int(args[2]) if name == b"INCRBY" else 1
+                    store.data[args[1]] = (str(value).encode(), None)
+                    reply = b":%d\r\n" % value
+                elif name == b"DEL":
+                    reply = b":%d\r\n" % int(store.data.pop(args[1], None) is not None)
+                elif name in (b"PING", b"SELECT", b"AUTH"):
+                    reply = b"+OK\r\n"
+                else:
+                    reply = b"-ERR unknown command\r\n"
+            self.wfile.write(reply)
+
+
+def check_backend(name, backend):
+    backend.set("k", b"value", 60)
+    assert backend.get("k") == b"value", name
+    backend.set_json("j", {"a": [1, 2]}, 60)
+    assert backend.get_json("j") == {"a": [1, 2]}, name
+    backend.set("short", b"x", 0.05)
+    time.sleep(0.1)
+    assert backend.get("short") is None, name
+    backend.delete("k")
+    assert backend.get("k") is None, name
+    big = os.urandom(3 * 1024 * 1024)
+    backend.set("big", big, 60)
+    assert backend.get("big") == big, name
+    assert backend.counter("version") == 0, name
+    assert [backend.incr("version") for _ in range(3)] == [1, 2, 3], name
+    assert backend.counter("version") == 3, name
+    print(f"{name}: ok")
+
+
+def incr_many(folder, count):
+    backend = SharedMemoryBackend(folder)
+    for _ in range(count):
+        backend.incr("workers")
+
+
+def main():
+    print('Test cache backends')
+
+    check_backend("memory", MemoryBackend(100, 60))
+
+    with tempfile.TemporaryDirectory() as folder:
+        check_backend("shared_memory", SharedMemoryBackend(folder))
+        # a second instance stands in for another worker
+        SharedMemoryBackend(folder).set("shared", b"1", 60)
+        assert SharedMemoryBackend(folder).get("shared") == b"1"
+        # counters stay exact when several workers increment at once
+        workers = [multiprocessing.Process(target=incr_many, args=(folder, 200)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert SharedMemoryBackend(folder).counter("workers") == 800
+        print("shared_memory counters across processes: ok")
+
+    server = RedisStandIn()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"redis://127.0.0.1:{server.server_address[1]}/1"
+    redis = RedisBackend(url)
+    check_backend("redis", redis)
+
+    # values written by one worker are read by another
+    RedisBackend(url).set("shared", b"1", 60)
+    assert redis.get("shared") == b"1"
+    RedisBackend(url).incr("version")
+    assert redis.counter("version") == 4
+
+    # a dead server reads as a miss without raising
+    server.shutdown()
+    server.server_close()
+    redis.close()
+    down = RedisBackend(f"redis://127.0.0.1:{server.server_address[1]}")
+    assert down.get("k") is None
+    down.set("k", b"v", 60)
+    # an unreachable backend reports an unknown counter, not 0
+    assert down.counter("version") is None and down.incr("version") is None
+    print("redis down: ok")
+
+
+if __name__ == "__main__":
+    main()
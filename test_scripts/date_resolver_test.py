@@ -0,0 +1,48 @@
+import os
+import sys
+from datetime import date
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+from slxx_agent.agent.date_resolver import resolve_date_phrases, shift_week
+
+# Monday of the shift week Sunday 10-18-2026 .. Saturday 10-24-2026
+TODAY = date(2026, 10, 19)
+
+
+def resolved(text):
+    return [(r.phrase, r.start, r.end) for r in resolve_date_phrases(text, TODAY)]
+
+
+def main():
+    print('Test date resolver')
+    assert shift_week(TODAY) == (date(2026, 10, 18), date(2026, 10, 24))
+    assert shift_week(date(2026, 10, 18)) == (date(2026, 10, 18), date(2026, 10, 24)), "Sunday opens the week"
+    assert shift_week(date(2026, 10, 24)) == (date(2026, 10, 18), date(2026, 10, 24)), "Saturday closes it"
+
+    assert resolved("tomorrow") == [("tomorrow", date(2026, 10, 20), date(2026, 10, 20))]
+    assert resolved("the day after tomorrow") == [("the day after tomorrow", date(2026, 10, 21), date(2026, 10, 21))]
+    assert resolved("sunday")[0][1] == date(2026, 10, 18), "a bare day name stays in the current shift week"
+    assert resolved("next monday")[0][1] == date(2026, 10, 26)
+    assert resolved("last saturday")[0][1] == date(2026, 10, 17)
+    assert resolved("next week") == [("next week", date(2026, 10, 25), date(2026, 10, 31))]
+    assert resolved("last month") == [("last month", date(2026, 9, 1), date(2026, 9, 30))]
+    assert resolved("3 days ago")[0][1] == date(2026, 10, 16)
+    print("relative phrases: ok")
+
+    # dates already absolute resolve to themselves
+    for text in ("2026-05-20", "05-20-2026", "5/20/2026", "5/20/26", "May 20th, 2026", "5/20"):
+        assert [r[1] for r in resolved(text)] == [date(2026, 5, 20)], text
+    assert resolved("Dec 31")[0][1] == date(2026, 12, 31)
+    assert resolved("2/30") == [], "impossible dates are dropped"
+    assert [r[0] for r in resolved("approve 10/19 and 10/20, deny 10/19")] == ["10/19", "10/20"]
+    print("absolute dates: ok")
+
+    # fractions and longer numbers are not dates
+    for text in ("1/2 day requests", "1/2 a day", "3/4 of a shift", "1/2 shift", "2/3 of the team",
+                 "1/2 PTO", "8/10 hours", "1.5/2", "1/2/3/4", "5-20 request"):
+        assert resolved(text) == [], text
+    print("fractions: ok")
+
+
+if __name__ == "__main__":
+    main()
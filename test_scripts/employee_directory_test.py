@@ -0,0 +1,98 @@
+import os
+import random
+import sys
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+import numpy as np
+from datasketch import MinHash, MinHashLSH
+from slxx_agent.manager.employee_directory import (
+    EmployeeDirectory, LSH_THRESHOLD, NUM_PERM, minhash_signatures, name_trigrams
+)
+
+FIRST = ["John", "Jon", "Joan", "Maria", "Mariah", "Mario", "Li", "Lee", "Anne", "Ann", "Jose", "Josefina", "Wei"]
+LAST = ["Smith", "Smyth", "Garcia", "Garza", "O'Neil", "ONeill", "Nguyen", "Ng", "Johnson", "Jonsson", "Li"]
+QUERIES = ["john smith", "Jon Smyth", "maria garcia", "garza", "Ng", "anne o neil", "josefina nguyen", "Wei Li",
+           "jhon smiht", "x", ""]
+
+
+def employees(count, seed=7):
+    rng = random.Random(seed)
+    ids = rng.sample(range(1, 10 * count), count)
+    names = [f"{rng.choice(FIRST)} {rng.choice(LAST)}" for _ in ids]
+    return ids, names
+
+
+def lsh_for(ids, names) -> MinHashLSH:
+    lsh = MinHashLSH(threshold=LSH_THRESHOLD, num_perm=NUM_PERM)
+    for emp_id, name in zip(ids, names):
+        minhash = MinHash(num_perm=NUM_PERM)
+        for trigram in name_trigrams(name.lower()):
+            minhash.update(trigram)
+        lsh.insert(emp_id, minhash)
+    return lsh
+
+
+def lsh_query(lsh, query):
+    minhash = MinHash(num_perm=NUM_PERM)
+    for trigram in name_trigrams(query.lower()):
+        minhash.update(trigram)
+    return set(lsh.query(minhash))
+
+
+def test_candidates():
+    ids, names = employees(400)
+    directory = EmployeeDirectory.build(ids, names)
+    lsh = lsh_for(ids, names)
+    for query in QUERIES:
+        got = {int(directory.ids[row]) for row in directory.candidates(query)}
+        assert got == lsh_query(lsh, query), query
+
+    # restricted to a scope, candidates are the scope's share of the full result
+    scope = directory.rows_for_ids(ids[::3])
+    for query in QUERIES:
+        full = set(directory.candidates(query).tolist())
+        assert set(directory.candidates(query, scope).tolist()) == full & set(scope.tolist()), query
+    print("candidates match MinHashLSH: ok")
+
+
+def test_sync():
+    ids, names = employees(200)
+    directory = EmployeeDirectory.build(ids, names)
+
+    # drop 10, rename 5, insert 7
+    kept_ids, kept_names = ids[10:], names[10:]
+    renamed = {kept_ids[i]: f"Renamed Person {i}" for i in range(5)}
+    kept_names = [renamed.get(i, n) for i, n in zip(kept_ids, kept_names)]
+    new_ids = [max(ids) + 1 + i for i in range(7)]
+    fresh_ids = kept_ids + new_ids
+    fresh_names = kept_names + [f"New Hire {i}" for i in range(7)]
+
+    synced, changes = directory.sync(fresh_ids, fresh_names)
+    assert changes == {"inserted": 7, "removed": 10, "renamed": 5}, changes
+    assert len(directory) == 200, "the old directory is left as it was"
+    rebuilt = EmployeeDirectory.build(fresh_ids, fresh_names)
+    assert np.array_equal(synced.signatures, rebuilt.signatures)
+    assert synced.name_for(kept_ids[0]) == "Renamed Person 0"
+    assert synced.name_for(new_ids[0]) == "New Hire 0"
+    assert synced.name_for(ids[0]) is None
+    for query in ("renamed person", "new hire", "john smith"):
+        assert np.array_equal(synced.candidates(query), rebuilt.candidates(query)), query
+
+    unchanged, changes = synced.sync(fresh_ids, fresh_names)
+    assert changes == {"inserted": 0, "removed": 0, "renamed": 0}
+    assert unchanged.signatures is synced.signatures, "unchanged rows keep their signatures"
+
+    empty, changes = EmployeeDirectory.build([], []).sync(ids[:3], names[:3])
+    assert changes == {"inserted": 3, "removed": 0, "renamed": 0}
+    assert np.array_equal(empty.signatures, minhash_signatures([n.lower() for n in names[:3]]))
+    print("sync counts: ok")
+
+
+def main():
+    print('Test employee directory')
+    test_candidates()
+    test_sync()
+
+
+if __name__ == "__main__":
+    main()
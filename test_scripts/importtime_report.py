@@ -0,0 +1,58 @@
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def collect(module: str) -> list:
+    """
+    Run `python -X importtime -c "import <module>"` and return
+    (self_us, cumulative_us, depth, name) for every import.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=project_root, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        raise SystemExit(f"import {module} failed")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize -X importtime for the agent entry point")
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    rows = collect(args.module)
+
+    # self time summed per top level package
+    by_package = defaultdict(int)
+    for self_us, cumulative_us, depth, name in rows:
+        by_package[name.split(".")[0]] += self_us
+    total_us = sum(self_us for self_us, _, _, _ in rows)
+
+    print(f"import {args.module}: {total_us / 1e6:.3f}s over {len(rows)} modules\n")
+    print(f"{'package':40} {'seconds':>8} {'share':>6}")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{package:40} {self_us / 1e6:8.3f} {self_us / total_us:6.1%}")
+
+    print("\nslowest single imports (cumulative)")
+    for self_us, cumulative_us, depth, name in sorted(rows, key=lambda row: -row[1])[:args.top]:
+        print(f"{name:60} {cumulative_us / 1e6:8.3f}")
+
+
+if __name__ == "__main__":
+    main()
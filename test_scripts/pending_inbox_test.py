@@ -0,0 +1,103 @@
+import datetime
+import os
+import sys
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+from slxx_agent.config.local_config import LocalConfig
+from slxx_agent.manager import slxx_manager
+from slxx_agent.manager.models import PTORequest
+from slxx_agent.manager.slxx_manager import slxxManager
+
+ORG_LEVEL_ID = 12
+TODAY = datetime.datetime.now(ZoneInfo('America/New_York')).date()
+
+
+def leave_request(request_id):
+    day = (TODAY + datetime.timedelta(days=1)).strftime('%m-%d-%Y')
+    return PTORequest.from_api({"id": request_id, "start": day, "end": day, "reason": "Vacation", "status": "Pending"})
+
+
+class Worker:
+    """
+    A manager for user_id with the slxx calls replaced, counting the live PTO fetches.
+    """
+
+    def __init__(self, local_config, user_id, jwt):
+        api = SimpleNamespace(
+            alias="acme", user_id=user_id, jwt=jwt,
+            approve_pto_request=lambda **kwargs: SimpleNamespace(status_code=204)
+        )
+        self.manager = slxxManager(local_config, api, None)
+        self.pending = [leave_request(1), leave_request(2)]
+        self.live_fetches = 0
+        self.refreshes = []
+        self.during_fetch = None
+        self.manager.fetch_pto_requests = self.fetch_pto_requests
+        self.manager.fetch_shift_requests = lambda date_on, org_level_id: []
+        self.manager.fetch_pto_request_detail = lambda org_level_id, leave_request_id: []
+        self.manager.refresh_pending_inbox = self.refreshes.append
+
+    def fetch_pto_requests(self, org_level_id, start_date, end_date, *args, **kwargs):
+        self.live_fetches += 1
+        if self.during_fetch is not None:
+            self.during_fetch()
+        return list(self.pending)
+
+    def pto_ids(self):
+        day = TODAY.strftime('%m-%d-%Y')
+        end = (TODAY + datetime.timedelta(days=2)).strftime('%m-%d-%Y')
+        return [r.leave_request_id for r in self.manager.get_pto_requests(ORG_LEVEL_ID, day, end)]
+
+
+def main():
+    print('Test pending inbox')
+    local_config = LocalConfig(project_root)
+    slxx_manager.start_inbox_refresher = lambda local_config: None
+    worker = Worker(local_config, "manager-1", "jwt-1")
+
+    # users who never read the department themselves are not served from the inbox
+    assert worker.manager.get_pending_inbox(ORG_LEVEL_ID) is None
+    assert not worker.refreshes and ("acme", ORG_LEVEL_ID) not in slxx_manager._pending_inboxes
+    assert worker.pto_ids() == [1, 2] and worker.live_fetches == 1
+
+    # the first read as a department reader starts a refresh and still goes live
+    assert worker.manager.get_pending_inbox(ORG_LEVEL_ID) is None
+    inbox = worker.refreshes[0]
+    assert inbox.jwt == "jwt-1"
+    worker.manager.load_pending_inbox(inbox)
+    fetches = worker.live_fetches
+    assert worker.pto_ids() == [1, 2] and worker.live_fetches == fetches, "served from the inbox"
+    print("department readers: ok")
+
+    # an approval in this worker removes the request and keeps the inbox readable
+    worker.manager.approve_deny_pto_request(ORG_LEVEL_ID, 1, "Approve", "")
+    worker.pending = [leave_request(2)]
+    assert worker.pto_ids() == [2] and worker.live_fetches == fetches
+
+    # an approval in another worker moves the shared version, readers go live and refresh
+    worker.refreshes.clear()
+    Worker(local_config, "manager-2", "jwt-2").manager.bump_data_version()
+    worker.pending = []
+    assert worker.pto_ids() == [] and worker.live_fetches == fetches + 1
+    assert worker.refreshes == [inbox]
+    print("invalidation: ok")
+
+    # a change while the refresh was fetching leaves the inbox stale
+    worker.during_fetch = worker.manager.bump_data_version
+    worker.manager.load_pending_inbox(inbox)
+    worker.during_fetch = None
+    assert worker.manager.get_pending_inbox(ORG_LEVEL_ID) is None
+    worker.manager.load_pending_inbox(inbox)
+    assert worker.manager.get_pending_inbox(ORG_LEVEL_ID) is inbox
+
+    # a user who is not a reader of the department never lends their token
+    stranger = Worker(local_config, "manager-3", "jwt-3")
+    assert stranger.manager.get_pending_inbox(ORG_LEVEL_ID) is None
+    assert inbox.jwt == "jwt-1"
+    print("refresh tokens: ok")
+
+
+if __name__ == "__main__":
+    main()
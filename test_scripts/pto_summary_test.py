@@ -0,0 +1,98 @@
+import os
+import sys
+from types import SimpleNamespace
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+from slxx_agent.config.local_config import LocalConfig
+from slxx_agent.manager.models import PTORequest, PTORequestDetail
+from slxx_agent.manager.pto_summary import accruals_balance, apply_aggregates, detail_aggregates
+from slxx_agent.manager.slxx_manager import slxxManager
+
+ACCRUALS = [
+    {"absenceReason": {"code": "VAC", "description": "Vacation"}, "accrualBalance": 40.0},
+    {"absenceReason": {"code": "SICK", "description": "Sick"}, "accrualBalance": 16.0},
+]
+
+
+def leave_request(request_id, reason="Vacation", accruals=ACCRUALS):
+    return PTORequest.from_api({
+        "id": request_id, "start": "10-20-2026", "end": "10-22-2026",
+        "reason": reason, "status": "Pending", "accruals": accruals
+    })
+
+
+def day(date, balance=None, available=True):
+    return PTORequestDetail.from_api({"date": date, "accrualBalance": balance, "isAccruaBalanceAvailable": available})
+
+
+def test_accruals_balance():
+    assert accruals_balance(ACCRUALS, "Vacation") == 40.0
+    assert accruals_balance(ACCRUALS, "sick") == 16.0, "matched on description, any case"
+    assert accruals_balance(ACCRUALS, "VAC") == 40.0, "or on code"
+    assert accruals_balance(ACCRUALS, "Jury Duty") is None, "other leave types are not summed in"
+    assert accruals_balance(ACCRUALS, None) is None
+    assert accruals_balance([{"absenceReason": {"code": "VAC"}, "balance": 8}], "VAC") is None
+    assert leave_request(1).remaining_balance == 40.0
+    print("accruals_balance: ok")
+
+
+def test_aggregates():
+    details = [
+        # out of date order, the last day's balance is the remaining one
+        [day("10-22-2026", 16.0), day("10-20-2026", 32.0), day("10-21-2026", 24.0)],
+        [],
+        [day("10-20-2026", 99.0, available=False), day("10-21-2026")],
+        [day("2026-10-21", 7.5), day("10-20-2026", 15.5)],
+    ]
+    shift_counts, remaining = detail_aggregates(details)
+    assert shift_counts.tolist() == [3, 0, 2, 2]
+    assert remaining[0] == 16.0 and remaining[3] == 7.5
+    assert remaining[1] != remaining[1] and remaining[2] != remaining[2], "unknown balances are nan"
+
+    requests = [leave_request(1), leave_request(2, "Sick"), leave_request(3, "Jury Duty"), leave_request(4)]
+    apply_aggregates(requests, details)
+    assert [r.shift_count for r in requests] == [3, 0, 2, 2]
+    assert [r.remaining_balance for r in requests] == [16.0, 16.0, None, 7.5], "without day balances the accrual stays"
+    print("detail_aggregates: ok")
+
+
+def test_summarize():
+    local_config = LocalConfig(project_root)
+    manager = slxxManager(local_config, SimpleNamespace(alias="acme", user_id="manager-1", jwt=None), None)
+    fetched = []
+
+    def fetch_detail(org_level_id, leave_request_id):
+        fetched.append(leave_request_id)
+        return [day("10-20-2026", 32.0), day("10-21-2026", 24.0)]
+
+    manager.fetch_pto_request_detail = fetch_detail
+
+    # list calls never fetch details, only what is cached fills in
+    manager.get_pto_request_detail(12, 2)
+    requests = [leave_request(1), leave_request(2)]
+    manager.summarize_pto_requests(12, requests)
+    assert fetched == [2]
+    assert requests[0].shift_count is None and requests[0].remaining_balance == 40.0
+    assert requests[1].shift_count == 2 and requests[1].remaining_balance == 24.0
+
+    # the inbox refresher fetches the missing ones
+    manager.summarize_pto_requests(12, requests, fetch=True)
+    assert fetched == [2, 1] and requests[0].shift_count == 2
+
+    # a change to the alias's requests drops the cached days
+    manager.bump_data_version()
+    later = [leave_request(2)]
+    manager.summarize_pto_requests(12, later)
+    assert later[0].shift_count is None and fetched == [2, 1]
+    print("summarize_pto_requests: ok")
+
+
+def main():
+    print('Test PTO summary')
+    test_accruals_balance()
+    test_aggregates()
+    test_summarize()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import email.utils
+import os
+import sys
+import threading
+import time
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+import requests
+from slxx_agent.api.resilience import CircuitBreaker, get_endpoint_guard, parse_retry_after, slxxAPIError
+from slxx_agent.api.slxx_api import slxxAPI
+from slxx_agent.config.local_config import LocalConfig
+
+
+class FakeResponse:
+    def __init__(self, status_code, retry_after=None):
+        self.status_code = status_code
+        self.headers = {"Retry-After": retry_after} if retry_after is not None else {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    """
+    Returns or raises the planned outcomes in order.
+    """
+    def __init__(self, *plan):
+        self.plan = list(plan)
+
+    def request(self, method, url, **kwargs):
+        outcome = self.plan.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def fake_api(local_config, *plan) -> slxxAPI:
+    api = object.__new__(slxxAPI)
+    api.local_config = local_config
+    api.headers = {}
+    api.deadline = None
+    api.session = FakeSession(*plan)
+    return api
+
+
+def half_open(endpoint, local_config):
+    guard = get_endpoint_guard(endpoint, local_config)
+    guard.breaker.state = CircuitBreaker.OPEN
+    guard.breaker.opened_at = time.monotonic() - guard.breaker.reset_timeout
+    return guard
+
+
+def test_breaker():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow(), "below the threshold the circuit stays closed"
+    breaker.record_failure()
+    assert breaker.is_open() and not breaker.allow()
+    assert 0 < breaker.retry_after() <= 0.05
+
+    time.sleep(0.06)
+    assert not breaker.is_open()
+    assert breaker.allow(), "the first call after the reset timeout probes"
+    assert not breaker.allow(), "a single probe at a time"
+
+    # only the thread holding the probe can give it back
+    other = threading.Thread(target=breaker.release)
+    other.start()
+    other.join()
+    assert breaker.probing
+    breaker.release()
+    assert breaker.allow(), "a released probe can be taken again"
+    breaker.record_failure()
+    assert breaker.is_open(), "a failed probe opens the circuit again"
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+    print("breaker: ok")
+
+
+def test_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("-3") == 0.0
+    assert parse_retry_after("soon") is None
+    http_date = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert 25 < parse_retry_after(http_date) <= 30
+    print("parse_retry_after: ok")
+
+
+def test_request(local_config):
+    local_config.slxx_max_retries = 2
+    local_config.slxx_backoff_factor = 0.0
+
+    # a 429 says nothing about the backend, the probe goes back and the retry probes again
+    guard = half_open("test.probe.429", local_config)
+    api = fake_api(local_config, FakeResponse(429, "0"), FakeResponse(200))
+    assert api._request("GET", "test.probe.429", "http://slxx", idempotent=True).status_code == 200
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+    assert guard.bucket.rate < guard.bucket.max_rate, "429 throttles the endpoint"
+
+    # errors that are not the backend's fault release the probe too
+    for endpoint, outcome in (("test.probe.redirects", requests.TooManyRedirects("loop")),
+                              ("test.probe.write429", FakeResponse(429))):
+        guard = half_open(endpoint, local_config)
+        try:
+            fake_api(local_config, outcome)._request("POST", endpoint, "http://slxx", idempotent=False)
+        except requests.TooManyRedirects:
+            pass
+        assert not guard.breaker.probing and guard.breaker.state == CircuitBreaker.HALF_OPEN, endpoint
+
+    # a failed probe opens the circuit and callers are told when to come back
+    guard = half_open("test.probe.503", local_config)
+    try:
+        fake_api(local_config, FakeResponse(503))._request("POST", "test.probe.503", "http://slxx", idempotent=False)
+    except slxxAPIError:
+        pass
+    try:
+        fake_api(local_config)._request("GET", "test.probe.503", "http://slxx", idempotent=True)
+        raise AssertionError("an open circuit fails fast")
+    except slxxAPIError as e:
+        assert e.status_code == 503 and 0 < e.retry_after <= guard.breaker.reset_timeout
+
+    # a Retry-After beyond the wait budget ends the retries, retried responses are closed
+    first = FakeResponse(503, "3600")
+    api = fake_api(local_config, first, FakeResponse(200))
+    try:
+        api._request("GET", "test.retry_after", "http://slxx", idempotent=True)
+        raise AssertionError("Retry-After over the budget is not waited for")
+    except slxxAPIError as e:
+        assert e.status_code == 503 and e.retry_after > 3500
+    assert first.closed and len(api.session.plan) == 1
+    print("request probe release and Retry-After: ok")
+
+
+def main():
+    print('Test resilience')
+    test_breaker()
+    test_retry_after()
+    test_request(LocalConfig(project_root))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import multiprocessing
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+from slxx_agent.agent.response_cache import ResponseCache, normalize_intent
+from slxx_agent.config.local_config import LocalConfig
+from slxx_agent.manager.cache_backend import get_cache_backend
+from slxx_agent.manager.slxx_manager import slxxManager
+
+
+def message(content="", tool_calls=None, type="ai"):
+    return SimpleNamespace(content=content, tool_calls=tool_calls or [], type=type)
+
+
+# a read-only turn: one tool call, its result and the answer
+READ_TURN = [
+    message(tool_calls=[{"name": "get_pto_requests", "args": {}}]),
+    message('{"status": "success", "data": []}', type="tool"),
+    message("No PTO requests found."),
+]
+
+
+def manager(local_config, alias="acme") -> slxxManager:
+    api = SimpleNamespace(alias=alias, user_id="manager-1", jwt=None)
+    return slxxManager(local_config, api, None)
+
+
+def key(cache, manager_, text="Show me the PTO requests for today?"):
+    return cache.key(
+        message_text=text, today="10-19-2026", alias=manager_.api.alias, org_level_id=12,
+        data_version=manager_.data_version(), context_data=[], history=[]
+    )
+
+
+def bump_in_other_worker(local_config):
+    manager(local_config).bump_data_version()
+
+
+def test_store():
+    cache = ResponseCache(10, 60)
+    assert normalize_intent("Show me the open shift requests for today?") == normalize_intent("open shift requests today")
+    assert cache.store("read", READ_TURN, [])
+    write_turn = [message(tool_calls=[{"name": "approve_deny_pto_request", "args": {}}])] + READ_TURN[1:]
+    assert not cache.store("write", write_turn, []), "a turn that changed data is never replayed"
+    failed_turn = READ_TURN[:1] + [message('{"status": "error", "message": "503"}', type="tool")] + READ_TURN[2:]
+    assert not cache.store("failed", failed_turn, [])
+    assert not cache.store("ungrounded", [message("Hello!")], []), "answers without slxx data are not cached"
+    assert cache.get("read").messages[-1].content == "No PTO requests found."
+    print("store: ok")
+
+
+def test_invalidation(local_config):
+    cache = ResponseCache(10, 60)
+    reader = manager(local_config)
+    before = key(cache, reader)
+    assert before == key(cache, reader, "pto requests today"), "rephrased questions share the answer"
+    assert cache.store(before, READ_TURN, [])
+
+    # an approval in another worker bumps the shared version, the old answer is unreachable
+    worker = multiprocessing.get_context("fork").Process(target=bump_in_other_worker, args=(local_config,))
+    worker.start()
+    worker.join()
+    after = key(cache, reader)
+    assert after != before and cache.get(after) is None
+
+    # other aliases keep their answers
+    other = manager(local_config, "globex")
+    other_key = key(cache, other)
+    assert cache.store(other_key, READ_TURN, [])
+    reader.bump_data_version()
+    assert cache.get(key(cache, other)) is not None
+    print("invalidation across workers: ok")
+
+
+def main():
+    print('Test response cache')
+    local_config = LocalConfig(project_root)
+    local_config.cache_backend = "shared_memory"
+    local_config.cache_shared_memory_dir = tempfile.mkdtemp(prefix="slxx_response_cache_test_")
+    assert get_cache_backend(local_config).shared
+    test_store()
+    test_invalidation(local_config)
+
+
+if __name__ == "__main__":
+    main()
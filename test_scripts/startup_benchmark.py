@@ -0,0 +1,65 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+baseline_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_baseline.json")
+
+# time from interpreter start until the app object exists, in a fresh process each run
+PROBE = (
+    "import time; started = time.perf_counter(); "
+    "import {module}; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def measure(module: str, runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module)],
+            cwd=project_root, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            print(result.stderr[-2000:])
+            raise SystemExit(f"import {module} failed")
+        samples.append(float(result.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup time benchmark, fails when slower than the baseline")
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown over the baseline")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    samples = measure(args.module, args.runs)
+    median = statistics.median(samples)
+    print(f"import {args.module}: median {median:.3f}s, min {min(samples):.3f}s, max {max(samples):.3f}s")
+
+    if args.update_baseline:
+        with open(baseline_path, "w") as file:
+            json.dump({"module": args.module, "median_seconds": round(median, 3)}, file, indent=4)
+        print(f"Baseline written to {baseline_path}")
+        return
+
+    if not os.path.exists(baseline_path):
+        print("No baseline yet, run with --update-baseline")
+        return
+
+    with open(baseline_path) as file:
+        baseline = json.load(file)["median_seconds"]
+    limit = baseline * (1 + args.tolerance)
+    if median > limit:
+        print(f"FAIL: {median:.3f}s is over the {limit:.3f}s budget (baseline {baseline:.3f}s)")
+        sys.exit(1)
+    print(f"OK: within the {limit:.3f}s budget (baseline {baseline:.3f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import os
+import sys
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+from langchain_core.messages import AIMessage
+from slxx_agent.agent.table_renderer import render_pto_requests, table_ref, expand_message_tables
+
+
+def main():
+    print('Test table rendering')
+    table = render_pto_requests([{
+        "employee_name": "John Smith", "start": "2025-05-20", "end": "2025-05-30",
+        "reason": "PTO", "status": "Pending", "shift_count": 9, "remaining_balance": 10.0
+    }])
+    tables = {"T1": table}
+
+    # the answer message of a turn, as the graph leaves it in messages_out
+    message = AIMessage(content=f"Here are the requests:\n{table_ref('T1')}\nWhich one?", id="run-1")
+    expanded = expand_message_tables(message, tables)
+    assert isinstance(expanded, AIMessage)
+    assert expanded.id == "run-1"
+    assert table in expanded.content and "[[table:" not in expanded.content
+    assert "[[table:T1]]" in message.content, "the original message is left as it was"
+    print(expanded.content)
+
+    # nothing to expand returns the message itself
+    plain = AIMessage(content="No PTO requests found.")
+    assert expand_message_tables(plain, tables) is plain
+    tool_call = AIMessage(content=[{"type": "text", "text": "[[table:T1]]"}])
+    assert expand_message_tables(tool_call, tables) is tool_call
+    print("expand_message_tables: ok")
+
+
+if __name__ == "__main__":
+    main()